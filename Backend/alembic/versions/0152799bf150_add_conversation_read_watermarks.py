@@ -0,0 +1,38 @@
+"""Add conversation read watermarks
+
+Revision ID: 0152799bf150
+Revises: 408db7b246c7, 002_add_messaging
+Create Date: 2026-10-19 09:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0152799bf150'
+down_revision: Union[str, None] = ('408db7b246c7', '002_add_messaging')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('conversation_reads',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('last_read_message_id', sa.UUID(), nullable=True),
+    sa.Column('last_read_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['last_read_message_id'], ['messages.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('conversation_id', 'user_id', name='uq_conversation_reads_participant')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('conversation_reads')
@@ -0,0 +1,133 @@
+"""Partition messages by month on created_at
+
+Revision ID: 34761925588b
+Revises: 66671134dccd
+Create Date: 2026-10-19 13:48:09.270613
+
+The rebuild runs in the migration's single transaction: `messages` is renamed
+aside at the start, so reads and writes of messages block (or fail) until every
+month has been copied and the indexes are rebuilt, and a failure rolls the whole
+thing back. Copying is one INSERT per month, so the time is roughly one pass
+over the table plus index builds. Run it in a maintenance window with the API
+stopped.
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '34761925588b'
+down_revision: Union[str, None] = '66671134dccd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions pre-created past the current month; scripts/manage_message_partitions.py keeps this topped up
+MONTHS_AHEAD = 3
+
+MESSAGE_COLUMNS = "id, conversation_id, sender_id, content, is_read, created_at"
+
+MESSAGE_INDEXES = [
+    ('ix_messages_conversation_id', ['conversation_id']),
+    ('ix_messages_sender_id', ['sender_id']),
+    ('ix_messages_created_at', ['created_at']),
+    ('ix_messages_conversation_created', ['conversation_id', 'created_at']),
+]
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    # Partitioned tables can't be the target of a single-column FK on id
+    op.drop_constraint('conversation_reads_last_read_message_id_fkey', 'conversation_reads', type_='foreignkey')
+    
+    op.execute("DROP INDEX IF EXISTS ix_messages_content_tsv")
+    for name, _ in MESSAGE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute("ALTER TABLE messages_unpartitioned RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey")
+    op.execute("UPDATE messages_unpartitioned SET created_at = (now() AT TIME ZONE 'utc') WHERE created_at IS NULL")
+    
+    op.execute("""
+        CREATE TABLE messages (
+            id UUID NOT NULL,
+            conversation_id UUID NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+            sender_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            is_read BOOLEAN,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # Safety net for rows outside the pre-created range; should stay empty
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+    
+    # Message.created_at is naive UTC, so month boundaries follow the UTC date
+    today = datetime.utcnow().date().replace(day=1)
+    oldest = conn.execute(sa.text("SELECT min(created_at) FROM messages_unpartitioned")).scalar()
+    month = oldest.date().replace(day=1) if oldest else today
+    last = today
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    
+    # One partition and one bounded copy per month keeps each statement small
+    while month <= last:
+        upper = _next_month(month)
+        name = f"messages_p{month:%Y%m}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF messages "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        conn.execute(sa.text(f"""
+            INSERT INTO messages ({MESSAGE_COLUMNS})
+            SELECT {MESSAGE_COLUMNS} FROM messages_unpartitioned
+            WHERE created_at >= :lower AND created_at < :upper
+        """), {"lower": month, "upper": upper})
+        month = upper
+    
+    for name, columns in MESSAGE_INDEXES:
+        op.create_index(name, 'messages', columns)
+    op.execute("CREATE INDEX ix_messages_content_tsv ON messages USING GIN (content_tsv)")
+    
+    op.drop_table('messages_unpartitioned')
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_messages_content_tsv")
+    for name, _ in MESSAGE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('conversation_id', sa.UUID(), nullable=False),
+        sa.Column('sender_id', sa.UUID(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"INSERT INTO messages ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages_partitioned")
+    op.execute("DROP TABLE messages_partitioned CASCADE")
+    
+    op.execute(
+        "ALTER TABLE messages ADD COLUMN content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+    )
+    for name, columns in MESSAGE_INDEXES:
+        op.create_index(name, 'messages', columns)
+    op.execute("CREATE INDEX ix_messages_content_tsv ON messages USING GIN (content_tsv)")
+    op.create_foreign_key(
+        'conversation_reads_last_read_message_id_fkey', 'conversation_reads', 'messages',
+        ['last_read_message_id'], ['id'], ondelete='SET NULL'
+    )
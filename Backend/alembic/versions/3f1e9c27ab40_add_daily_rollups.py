@@ -0,0 +1,46 @@
+"""Add daily_rollups and rollup_watermarks
+
+Revision ID: 3f1e9c27ab40
+Revises: aeae7bcd2ca2
+Create Date: 2026-10-19 20:05:31.772615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1e9c27ab40'
+down_revision: Union[str, None] = 'aeae7bcd2ca2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'category')
+    )
+    op.create_index('ix_daily_rollups_category_day', 'daily_rollups', ['category', 'day'])
+    op.create_table('rollup_watermarks',
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('processed_until', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+    # Range scans for the incremental job
+    op.create_index('ix_matches_created_at', 'matches', ['created_at'])
+    op.create_index('ix_sessions_updated_at', 'sessions', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_updated_at', table_name='sessions')
+    op.drop_index('ix_matches_created_at', table_name='matches')
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_daily_rollups_category_day', table_name='daily_rollups')
+    op.drop_table('daily_rollups')
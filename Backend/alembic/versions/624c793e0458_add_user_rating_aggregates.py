@@ -0,0 +1,46 @@
+"""Replace users.rating with incremental rating aggregates
+
+Revision ID: 624c793e0458
+Revises: 34761925588b
+Create Date: 2026-10-19 15:31:02.771840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '624c793e0458'
+down_revision: Union[str, None] = '34761925588b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    
+    # One-time backfill from the ratings each user received
+    op.execute("""
+        UPDATE users SET rating_sum = agg.rating_sum, rating_count = agg.rating_count
+        FROM (
+            SELECT CASE WHEN rated_by = user_id THEN participant_id ELSE user_id END AS rated_user_id,
+                   SUM(rating) AS rating_sum,
+                   COUNT(rating) AS rating_count
+            FROM sessions
+            WHERE rating IS NOT NULL AND rated_by IS NOT NULL
+            GROUP BY 1
+        ) agg
+        WHERE users.id = agg.rated_user_id
+    """)
+    
+    op.drop_column('users', 'rating')
+
+
+def downgrade() -> None:
+    op.add_column('users', sa.Column('rating', sa.Float(), nullable=True))
+    op.execute("UPDATE users SET rating = rating_sum / rating_count WHERE rating_count > 0")
+    op.drop_column('users', 'rating_count')
+    op.drop_column('users', 'rating_sum')
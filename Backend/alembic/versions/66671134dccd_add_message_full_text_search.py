@@ -0,0 +1,31 @@
+"""Add full-text search column to messages
+
+Revision ID: 66671134dccd
+Revises: cd66bacfdfbe
+Create Date: 2026-10-19 11:26:50.331872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '66671134dccd'
+down_revision: Union[str, None] = 'cd66bacfdfbe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_messages_content_tsv ON messages USING GIN (content_tsv)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_messages_content_tsv")
+    op.execute("ALTER TABLE messages DROP COLUMN IF EXISTS content_tsv")
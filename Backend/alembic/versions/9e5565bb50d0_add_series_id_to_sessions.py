@@ -0,0 +1,29 @@
+"""Add series_id to sessions for recurring series
+
+Revision ID: 9e5565bb50d0
+Revises: c0591853ec68
+Create Date: 2026-10-19 17:58:03.274119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5565bb50d0'
+down_revision: Union[str, None] = 'c0591853ec68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('series_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_index('ix_sessions_series_id', 'sessions', ['series_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_series_id', table_name='sessions')
+    op.drop_column('sessions', 'series_id')
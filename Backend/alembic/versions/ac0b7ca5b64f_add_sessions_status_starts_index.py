@@ -0,0 +1,26 @@
+"""Add (status, starts_at) index for the reminder scheduler reload
+
+Revision ID: ac0b7ca5b64f
+Revises: b07aee5ff0e1
+Create Date: 2026-10-19 18:49:17.530862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac0b7ca5b64f'
+down_revision: Union[str, None] = 'b07aee5ff0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sessions_status_starts', 'sessions', ['status', 'starts_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_status_starts', table_name='sessions')
@@ -0,0 +1,78 @@
+"""Add starts_at/ends_at timestamps and calendar indexes to sessions
+
+Revision ID: adad4e687812
+Revises: 624c793e0458
+Create Date: 2026-10-19 16:40:55.102947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.scheduling import parse_session_start, session_end
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'adad4e687812'
+down_revision: Union[str, None] = '624c793e0458'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows parsed and updated per batch
+BACKFILL_BATCH_SIZE = 2000
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('sessions', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # Parse the legacy strings in Python with the same rules the app uses,
+    # walking the table by id so unparsable rows (left NULL) aren't revisited
+    conn = op.get_bind()
+    sessions = sa.table(
+        'sessions',
+        sa.column('id', sa.UUID()),
+        sa.column('date', sa.String()),
+        sa.column('time', sa.String()),
+        sa.column('duration', sa.Integer()),
+        sa.column('starts_at', sa.DateTime(timezone=True)),
+        sa.column('ends_at', sa.DateTime(timezone=True)),
+    )
+    last_id = None
+    while True:
+        query = sa.select(sessions.c.id, sessions.c.date, sessions.c.time, sessions.c.duration)
+        if last_id is not None:
+            query = query.where(sessions.c.id > last_id)
+        rows = conn.execute(query.order_by(sessions.c.id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not rows:
+            break
+        
+        updates = []
+        for row in rows:
+            starts_at = parse_session_start(row.date, row.time)
+            if starts_at is not None:
+                updates.append({
+                    "b_id": row.id,
+                    "starts_at": starts_at,
+                    "ends_at": session_end(starts_at, row.duration),
+                })
+        if updates:
+            conn.execute(
+                sessions.update().where(sessions.c.id == sa.bindparam('b_id')).values(
+                    starts_at=sa.bindparam('starts_at'),
+                    ends_at=sa.bindparam('ends_at')
+                ),
+                updates
+            )
+        last_id = rows[-1].id
+    
+    op.create_index('ix_sessions_user_status_starts', 'sessions', ['user_id', 'status', 'starts_at'])
+    op.create_index('ix_sessions_participant_status_starts', 'sessions', ['participant_id', 'status', 'starts_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_participant_status_starts', table_name='sessions')
+    op.drop_index('ix_sessions_user_status_starts', table_name='sessions')
+    op.drop_column('sessions', 'ends_at')
+    op.drop_column('sessions', 'starts_at')
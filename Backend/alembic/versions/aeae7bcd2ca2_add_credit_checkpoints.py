@@ -0,0 +1,35 @@
+"""Add credit_checkpoints for incremental ledger reconciliation
+
+Revision ID: aeae7bcd2ca2
+Revises: 603729e0d15f
+Create Date: 2026-10-19 19:40:06.581943
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aeae7bcd2ca2'
+down_revision: Union[str, None] = '603729e0d15f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('credit_checkpoints',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('balance', sa.Integer(), nullable=False),
+    sa.Column('last_transaction_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('last_transaction_at', sa.DateTime(), nullable=True),
+    sa.Column('verified_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('credit_checkpoints')
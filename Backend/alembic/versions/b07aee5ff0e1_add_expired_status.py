@@ -0,0 +1,41 @@
+"""Add 'expired' to session and match statuses
+
+Revision ID: b07aee5ff0e1
+Revises: 9e5565bb50d0
+Create Date: 2026-10-19 18:21:40.913527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b07aee5ff0e1'
+down_revision: Union[str, None] = '9e5565bb50d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block on older Postgres
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE sessionstatus ADD VALUE IF NOT EXISTS 'expired'")
+        op.execute("ALTER TYPE matchstatus ADD VALUE IF NOT EXISTS 'expired'")
+    op.create_index(
+        'ix_sessions_pending_starts', 'sessions', ['starts_at'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.create_index(
+        'ix_matches_pending_created', 'matches', ['created_at'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matches_pending_created', table_name='matches')
+    op.drop_index('ix_sessions_pending_starts', table_name='sessions')
+    # Postgres cannot drop enum values; move rows back to pending instead
+    op.execute("UPDATE sessions SET status = 'pending' WHERE status = 'expired'")
+    op.execute("UPDATE matches SET status = 'pending' WHERE status = 'expired'")
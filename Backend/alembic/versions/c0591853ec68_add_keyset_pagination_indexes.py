@@ -0,0 +1,35 @@
+"""Add composite (sort key, id) indexes for keyset pagination
+
+Revision ID: c0591853ec68
+Revises: adad4e687812
+Create Date: 2026-10-19 17:25:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0591853ec68'
+down_revision: Union[str, None] = 'adad4e687812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_id', 'users', ['created_at', 'id'])
+    op.create_index('ix_sessions_user_created_id', 'sessions', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_sessions_participant_created_id', 'sessions', ['participant_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_credit_transactions_user_created_id', 'credit_transactions',
+        ['user_id', 'created_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_credit_transactions_user_created_id', table_name='credit_transactions')
+    op.drop_index('ix_sessions_participant_created_id', table_name='sessions')
+    op.drop_index('ix_sessions_user_created_id', table_name='sessions')
+    op.drop_index('ix_users_created_id', table_name='users')
@@ -0,0 +1,100 @@
+"""Add canonical user pair keys to conversations and matches
+
+Revision ID: cd66bacfdfbe
+Revises: 0152799bf150
+Create Date: 2026-10-19 10:03:17.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cd66bacfdfbe'
+down_revision: Union[str, None] = '0152799bf150'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows updated per backfill statement, keeps each UPDATE short
+BACKFILL_BATCH_SIZE = 5000
+
+# (table, first user column, second user column)
+PAIR_TABLES = [
+    ('conversations', 'user1_id', 'user2_id'),
+    ('matches', 'user_id', 'matched_user_id'),
+]
+
+
+def _backfill_pairs(conn, table: str, user_a: str, user_b: str) -> None:
+    while True:
+        result = conn.execute(sa.text(f"""
+            UPDATE {table}
+            SET user_low_id = LEAST({user_a}, {user_b}),
+                user_high_id = GREATEST({user_a}, {user_b})
+            WHERE id IN (
+                SELECT id FROM {table}
+                WHERE user_low_id IS NULL
+                LIMIT :batch_size
+            )
+        """), {"batch_size": BACKFILL_BATCH_SIZE})
+        if result.rowcount == 0:
+            break
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    
+    for table, user_a, user_b in PAIR_TABLES:
+        op.add_column(table, sa.Column('user_low_id', sa.UUID(), nullable=True))
+        op.add_column(table, sa.Column('user_high_id', sa.UUID(), nullable=True))
+        _backfill_pairs(conn, table, user_a, user_b)
+    
+    # Fold duplicate conversations into the oldest one per pair
+    conn.execute(sa.text("""
+        WITH ranked AS (
+            SELECT id, FIRST_VALUE(id) OVER (
+                PARTITION BY user_low_id, user_high_id ORDER BY created_at, id
+            ) AS keep_id
+            FROM conversations
+        )
+        UPDATE messages SET conversation_id = ranked.keep_id
+        FROM ranked
+        WHERE messages.conversation_id = ranked.id AND ranked.id <> ranked.keep_id
+    """))
+    conn.execute(sa.text("""
+        DELETE FROM conversations WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_low_id, user_high_id ORDER BY created_at, id
+                ) AS rn
+                FROM conversations
+            ) dup WHERE rn > 1
+        )
+    """))
+    
+    # Keep one match per pair, preferring an accepted connection
+    conn.execute(sa.text("""
+        DELETE FROM matches WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_low_id, user_high_id
+                    ORDER BY (status = 'accepted') DESC, created_at, id
+                ) AS rn
+                FROM matches
+            ) dup WHERE rn > 1
+        )
+    """))
+    
+    for table, _, _ in PAIR_TABLES:
+        op.alter_column(table, 'user_low_id', nullable=False)
+        op.alter_column(table, 'user_high_id', nullable=False)
+        op.create_index(f'uq_{table}_user_pair', table, ['user_low_id', 'user_high_id'], unique=True)
+
+
+def downgrade() -> None:
+    for table, _, _ in PAIR_TABLES:
+        op.drop_index(f'uq_{table}_user_pair', table_name=table)
+        op.drop_column(table, 'user_high_id')
+        op.drop_column(table, 'user_low_id')
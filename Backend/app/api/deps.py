@@ -1,9 +1,17 @@
 from typing import Generator
-from fastapi import Depends, HTTPException, status, Security
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response, status, Security
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from config import get_settings
+from app.core.cache import TTLCache
 from app.core.security import auth
 from app.models.database import User
+from app.services.resource_versions import resource_etag, etag_matches
+from app.services.user_cards import UserCardLoader
+
+# auth0 sub -> user id, so conditional GETs can check versions without a query
+_user_ids = TTLCache(ttl=3600, maxsize=50000)
 
 
 async def get_current_user(
@@ -27,3 +35,58 @@ async def get_current_user(
         )
     
     return user
+
+
+async def get_admin_user(
+    current_user: User = Depends(get_current_user)
+) -> User:
+    if current_user.auth0_id not in get_settings().admin_auth0_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+def get_user_cards(db: Session = Depends(get_db)) -> UserCardLoader:
+    """One batching user-card loader per request, shared by everything the route calls"""
+    return UserCardLoader(db)
+
+
+def ensure_modified(request: Request, response: Response, user_id: UUID, resources) -> None:
+    """Set the ETag for `user_id`'s `resources` and raise 304 if the client already has it"""
+    etag = resource_etag(user_id, resources)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def conditional_get(*resources: str):
+    """
+    Route dependency for GETs whose body only changes when the current user's
+    `resources` do (see app/services/resource_versions.py). Add it with
+    `dependencies=[...]` so it runs before get_current_user and the route's queries.
+    Routes returning a Response themselves must pass the injected `response` to
+    rows_response so the ETag is kept.
+    """
+    async def check_not_modified(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        token_payload: dict = Security(auth.verify)
+    ) -> None:
+        auth0_id = token_payload.get("sub")
+        user_id = _user_ids.get(auth0_id)
+        if user_id is None:
+            user_id = db.query(User.id).filter(User.auth0_id == auth0_id).scalar()
+            if user_id is None:
+                # get_current_user reports the error
+                return
+            _user_ids.set(auth0_id, user_id)
+        ensure_modified(request, response, user_id, resources)
+
+    return check_not_modified
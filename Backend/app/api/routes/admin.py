@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.api.deps import get_admin_user
+from app.models.database import User
+from app.schemas.schemas import DailyRollupResponse, RollupRunResponse
+from app.services.rollups import CATEGORIES, read_rollups, run_rollups
+
+router = APIRouter()
+
+# Longest range the daily stats endpoint will return in one call
+MAX_STATS_RANGE = timedelta(days=366)
+
+
+@router.get("/stats/daily", response_model=List[DailyRollupResponse])
+async def get_daily_stats(
+    from_: date = Query(..., alias="from"),
+    to: date = Query(...),
+    category: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Platform stats per UTC day from the rollup tables, both ends inclusive"""
+    if to < from_:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    if to - from_ > MAX_STATS_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_STATS_RANGE.days} days"
+        )
+    unknown = set(category or []) - set(CATEGORIES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown categories: {', '.join(sorted(unknown))}. Valid: {', '.join(CATEGORIES)}"
+        )
+    return read_rollups(db, from_, to, category)
+
+
+@router.post("/rollups/refresh", response_model=RollupRunResponse)
+async def refresh_rollups(
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Process rows added since the last rollup run"""
+    return RollupRunResponse(windows_processed=run_rollups(db))
@@ -0,0 +1,95 @@
+"""
+Everything the dashboard needs on page load, in one request.
+
+The token is verified and the user looked up once, and that request session is
+closed before fanning out. The remaining reads then run concurrently in the
+threadpool, each on its own session and so its own pooled connection: a request
+holds up to four connections at once, so size the pool (DB_POOL_SIZE,
+DB_MAX_OVERFLOW) for that at peak load.
+"""
+import asyncio
+import time
+from typing import Callable, Dict
+from uuid import UUID
+from fastapi import APIRouter, Depends, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from config import get_settings
+from app.db.session import SessionLocal, get_db
+from app.api.deps import get_current_user, conditional_get
+from app.api.routes.matches import user_match_rows
+from app.api.routes.messages import count_unread
+from app.api.routes.sessions import user_sessions_query, DEFAULT_PAGE_SIZE
+from app.core.pagination import paginate, NEXT_CURSOR_HEADER
+from app.core.serialization import rows_response, row_dicts
+from app.models.database import User, Skill, Session as DBSession
+from app.schemas.schemas import BootstrapResponse, UserResponse, SkillResponse
+from app.services.resource_versions import RESOURCES
+
+router = APIRouter()
+
+
+def _skills(db: Session, user_id: UUID) -> dict:
+    skills = db.query(Skill).filter(Skill.user_id == user_id).all()
+    return {"skills": [SkillResponse.model_validate(skill).model_dump() for skill in skills]}
+
+
+def _matches(db: Session, user_id: UUID) -> dict:
+    return {"matches": row_dicts(user_match_rows(db, user_id))}
+
+
+def _sessions(db: Session, user_id: UUID) -> dict:
+    # First page, exactly as GET /api/sessions/ returns it
+    page = Response()
+    sessions = paginate(user_sessions_query(db, user_id), DBSession.created_at, DBSession.id, None, DEFAULT_PAGE_SIZE, page)
+    return {"sessions": row_dicts(sessions), "sessions_next_cursor": page.headers.get(NEXT_CURSOR_HEADER)}
+
+
+def _unread(db: Session, user_id: UUID) -> dict:
+    return {"unread_count": count_unread(db, user_id)}
+
+
+SECTIONS: Dict[str, Callable[[Session, UUID], dict]] = {
+    "skills": _skills,
+    "matches": _matches,
+    "sessions": _sessions,
+    "unread_count": _unread,
+}
+
+
+def _run_section(section: Callable[[Session, UUID], dict], user_id: UUID):
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        return section(db, user_id), (time.perf_counter() - started) * 1000
+    finally:
+        db.close()
+
+
+@router.get("", response_model=BootstrapResponse, dependencies=[Depends(conditional_get(*RESOURCES))])
+async def get_bootstrap(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """User, skills, matches, first page of sessions, credit balance and unread count in one document"""
+    started = time.perf_counter()
+    document = {
+        "user": UserResponse.model_validate(current_user).model_dump(),
+        "credits": {"user_id": current_user.id, "credits": current_user.credits},
+    }
+    # Same session get_current_user used; hand its connection back before taking four more
+    db.close()
+
+    results = await asyncio.gather(*(
+        run_in_threadpool(_run_section, section, current_user.id) for section in SECTIONS.values()
+    ))
+    for part, _ in results:
+        document.update(part)
+    if get_settings().debug:
+        document["timings_ms"] = {
+            name: round(elapsed, 2) for name, (_, elapsed) in zip(SECTIONS, results)
+        }
+        document["timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 2)
+    # Validated once here, since rows_response bypasses response_model
+    return rows_response(BootstrapResponse.model_validate(document).model_dump(), response)
@@ -1,17 +1,23 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from app.db.session import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, conditional_get
+from app.core.pagination import paginate
 from app.models.database import User, CreditTransaction
-from app.schemas.schemas import CreditTransactionResponse, CreditTransactionCreate, CreditBalanceResponse
+from app.schemas.schemas import CreditTransactionResponse, CreditTransactionCreate, CreditBalanceResponse, CreditLedgerSummaryResponse
+from app.services import credit_ledger, idempotency
+from app.services.credit_reconciliation import ledger_position
+from app.services.exports import export_response
+from app.services.session_summary import invalidate_session_summary
+from app.services.resource_versions import bump_versions
 
 router = APIRouter()
 
 
-@router.get("/balance", response_model=CreditBalanceResponse)
+@router.get("/balance", response_model=CreditBalanceResponse, dependencies=[Depends(conditional_get("credits"))])
 async def get_credit_balance(
     current_user: User = Depends(get_current_user)
 ):
@@ -21,23 +27,70 @@ async def get_credit_balance(
     )
 
 
-@router.get("/history", response_model=List[CreditTransactionResponse])
+@router.get("/history", response_model=List[CreditTransactionResponse], dependencies=[Depends(conditional_get("credits"))])
 async def get_credit_history(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    transactions = db.query(CreditTransaction).filter(
+    """Newest first. Pass X-Next-Cursor back as `cursor` for the next page; `skip` is kept for older clients."""
+    query = db.query(CreditTransaction).filter(
         CreditTransaction.user_id == current_user.id
-    ).order_by(desc(CreditTransaction.created_at)).offset(skip).limit(limit).all()
-    
-    return transactions
+    )
+    return paginate(
+        query, CreditTransaction.created_at, CreditTransaction.id,
+        cursor, limit, response, skip=skip
+    )
+
+
+@router.get("/export")
+async def export_credit_history(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full credit history as a streamed CSV or NDJSON download, oldest first"""
+    statement = select(
+        CreditTransaction.id,
+        CreditTransaction.created_at,
+        CreditTransaction.transaction_type,
+        CreditTransaction.amount,
+        CreditTransaction.balance_after,
+        CreditTransaction.description,
+        CreditTransaction.session_id
+    ).where(
+        CreditTransaction.user_id == current_user.id
+    ).order_by(CreditTransaction.created_at, CreditTransaction.id)
+    return export_response(db.get_bind(), statement, fmt, "credit-history")
+
+
+@router.get("/history/summary", response_model=CreditLedgerSummaryResponse, dependencies=[Depends(conditional_get("credits"))])
+async def get_credit_history_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Balance from the last reconciliation checkpoint plus the transactions since, without scanning the full history"""
+    position = ledger_position(db, current_user.id)
+    checkpoint = position.checkpoint
+    return CreditLedgerSummaryResponse(
+        balance=position.balance,
+        stored_balance=position.stored_balance,
+        consistent=position.balance == position.stored_balance,
+        checkpoint_balance=checkpoint.balance if checkpoint else None,
+        checkpoint_transaction_id=checkpoint.last_transaction_id if checkpoint else None,
+        checkpoint_at=checkpoint.last_transaction_at if checkpoint else None,
+        transactions_since_checkpoint=position.transactions_since_checkpoint
+    )
 
 
 @router.post("/earn", response_model=CreditTransactionResponse, status_code=status.HTTP_201_CREATED)
 async def earn_credits(
     transaction_data: CreditTransactionCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.IDEMPOTENCY_HEADER),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -47,21 +100,23 @@ async def earn_credits(
             detail="Amount must be positive for earning credits"
         )
     
-    current_user.credits += transaction_data.amount
-    balance_after = current_user.credits
+    guard = idempotency.claim(db, current_user.id, idempotency_key, request, transaction_data)
+    if guard.replay:
+        return guard.replay
     
-    transaction = CreditTransaction(
-        user_id=current_user.id,
-        session_id=transaction_data.session_id,
-        amount=transaction_data.amount,
+    transaction = credit_ledger.earn(
+        db,
+        current_user.id,
+        transaction_data.amount,
         transaction_type=transaction_data.transaction_type,
         description=transaction_data.description,
-        balance_after=balance_after
+        session_id=transaction_data.session_id
     )
-    
-    db.add(transaction)
+    guard.save(CreditTransactionResponse.model_validate(transaction), status.HTTP_201_CREATED)
     db.commit()
     db.refresh(transaction)
+    invalidate_session_summary(current_user.id)
+    bump_versions([current_user.id], "credits")
     
     return transaction
 
@@ -69,37 +124,47 @@ async def earn_credits(
 @router.post("/spend", response_model=CreditTransactionResponse)
 async def spend_credits(
     transaction_data: CreditTransactionCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.IDEMPOTENCY_HEADER),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     amount = abs(transaction_data.amount)
     
-    if current_user.credits < amount:
+    if amount == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Insufficient credits. You have {current_user.credits} credits but need {amount}"
+            detail="Amount must be non-zero for spending credits"
         )
     
-    current_user.credits -= amount
-    balance_after = current_user.credits
-    
-    transaction = CreditTransaction(
-        user_id=current_user.id,
-        session_id=transaction_data.session_id,
-        amount=-amount,
-        transaction_type="spent",
-        description=transaction_data.description,
-        balance_after=balance_after
-    )
+    guard = idempotency.claim(db, current_user.id, idempotency_key, request, transaction_data)
+    if guard.replay:
+        return guard.replay
     
-    db.add(transaction)
+    try:
+        transaction = credit_ledger.spend(
+            db,
+            current_user.id,
+            amount,
+            description=transaction_data.description,
+            session_id=transaction_data.session_id
+        )
+    except credit_ledger.InsufficientCreditsError as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient credits. You have {error.available} credits but need {amount}"
+        )
+    guard.save(CreditTransactionResponse.model_validate(transaction))
     db.commit()
     db.refresh(transaction)
+    invalidate_session_summary(current_user.id)
+    bump_versions([current_user.id], "credits")
     
     return transaction
 
 
-@router.get("/transactions/{transaction_id}", response_model=CreditTransactionResponse)
+@router.get("/transactions/{transaction_id}", response_model=CreditTransactionResponse, dependencies=[Depends(conditional_get("credits"))])
 async def get_transaction(
     transaction_id: UUID,
     db: Session = Depends(get_db),
@@ -1,18 +1,30 @@
+from datetime import datetime
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.database import User, Match, MatchStatus, Skill, SkillType
+from app.api.deps import get_current_user, conditional_get, get_user_cards
+from app.models.database import User, Match, MatchStatus, canonical_pair
 from app.schemas.schemas import MatchResponse, MatchCreate
+from app.core.serialization import rows_response
+from app.services.resource_versions import bump_versions
+from app.services.user_cards import UserCardLoader
+from app.services import match_suggestions
 
 router = APIRouter()
 
+# Every MatchResponse field, so list endpoints can serialize rows without loading ORM objects
+MATCH_COLUMNS = [
+    Match.id, Match.user_id, Match.matched_user_id, Match.match_score,
+    Match.common_skills, Match.status, Match.created_at, Match.updated_at,
+]
+
 
 @router.get("/find", response_model=List[dict])
-async def find_potential_matches(
+def find_potential_matches(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -20,160 +32,82 @@ async def find_potential_matches(
     Find potential matches based on skill compatibility.
     Excludes users who already have a match request (sent or received).
     """
-    # Get current user's skills
-    user_teaching = db.query(Skill).filter(
-        and_(Skill.user_id == current_user.id, Skill.type == SkillType.teaching)
-    ).all()
-    user_learning = db.query(Skill).filter(
-        and_(Skill.user_id == current_user.id, Skill.type == SkillType.learning)
-    ).all()
-    
-    teaching_names = {s.name.lower() for s in user_teaching}
-    learning_names = {s.name.lower() for s in user_learning}
-    
-    # Get all other users
-    other_users = db.query(User).filter(User.id != current_user.id).all()
-    
-    # Get existing matches (both sent and received) to exclude
-    existing_matches = db.query(Match).filter(
-        or_(
-            Match.user_id == current_user.id,
-            Match.matched_user_id == current_user.id
-        )
-    ).all()
-    
-    # Users we already have a connection with (either direction)
-    connected_user_ids = set()
-    for m in existing_matches:
-        connected_user_ids.add(m.user_id)
-        connected_user_ids.add(m.matched_user_id)
-    connected_user_ids.discard(current_user.id)
-    
-    potential_matches = []
-    
-    for other_user in other_users:
-        if other_user.id in connected_user_ids:
-            continue
-            
-        # Get other user's skills
-        other_teaching = db.query(Skill).filter(
-            and_(Skill.user_id == other_user.id, Skill.type == SkillType.teaching)
-        ).all()
-        other_learning = db.query(Skill).filter(
-            and_(Skill.user_id == other_user.id, Skill.type == SkillType.learning)
-        ).all()
-        
-        other_teaching_names = {s.name.lower() for s in other_teaching}
-        other_learning_names = {s.name.lower() for s in other_learning}
-        
-        # They teach what I want to learn
-        they_teach_i_learn = other_teaching_names & learning_names
-        # I teach what they want to learn
-        i_teach_they_learn = teaching_names & other_learning_names
-        
-        common_skills = list(they_teach_i_learn | i_teach_they_learn)
-        
-        if common_skills:
-            total_possible = len(learning_names) + len(teaching_names)
-            if total_possible > 0:
-                match_score = min(100, (len(common_skills) / total_possible) * 100 * 2)
-            else:
-                match_score = 50
-            
-            potential_matches.append({
-                "user": {
-                    "id": str(other_user.id),
-                    "name": other_user.name,
-                    "email": other_user.email,
-                    "avatar": other_user.avatar,
-                    "bio": other_user.bio,
-                    "rating": other_user.rating,
-                },
-                "match_score": round(match_score, 1),
-                "common_skills": common_skills,
-                "they_can_teach": list(they_teach_i_learn),
-                "they_want_to_learn": list(i_teach_they_learn),
-            })
-    
-    potential_matches.sort(key=lambda x: x["match_score"], reverse=True)
-    return potential_matches[:20]
+    return match_suggestions.find_potential_matches(db, current_user)
 
 
-@router.get("/sent")
+@router.get("/sent", dependencies=[Depends(conditional_get("matches"))])
 async def get_sent_requests(
+    response: Response,
     db: Session = Depends(get_db),
+    cards: UserCardLoader = Depends(get_user_cards),
     current_user: User = Depends(get_current_user)
 ):
     """Get match requests I sent (waiting for others to accept)"""
-    matches = db.query(Match).filter(
+    matches = db.query(
+        Match.id, Match.matched_user_id, Match.match_score, Match.common_skills, Match.status, Match.created_at
+    ).filter(
         and_(
             Match.user_id == current_user.id,
             Match.status == MatchStatus.pending
         )
     ).all()
     
+    users = cards.load_many(match.matched_user_id for match in matches)
     result = []
     for match in matches:
-        other_user = db.query(User).filter(User.id == match.matched_user_id).first()
         result.append({
-            "id": str(match.id),
-            "matched_user": {
-                "id": str(other_user.id),
-                "name": other_user.name,
-                "email": other_user.email,
-                "avatar": other_user.avatar,
-                "bio": other_user.bio,
-                "rating": other_user.rating,
-            } if other_user else None,
+            "id": match.id,
+            "matched_user": users[str(match.matched_user_id)],
             "match_score": match.match_score,
             "common_skills": match.common_skills,
-            "status": match.status.value,
-            "created_at": match.created_at.isoformat(),
+            "status": match.status,
+            "created_at": match.created_at,
         })
-    return result
+    return rows_response(result, response)
 
 
-@router.get("/received")
+@router.get("/received", dependencies=[Depends(conditional_get("matches"))])
 async def get_received_requests(
+    response: Response,
     db: Session = Depends(get_db),
+    cards: UserCardLoader = Depends(get_user_cards),
     current_user: User = Depends(get_current_user)
 ):
     """Get match requests I received (I need to accept/reject)"""
-    matches = db.query(Match).filter(
+    matches = db.query(
+        Match.id, Match.user_id, Match.match_score, Match.common_skills, Match.status, Match.created_at
+    ).filter(
         and_(
             Match.matched_user_id == current_user.id,
             Match.status == MatchStatus.pending
         )
     ).all()
     
+    users = cards.load_many(match.user_id for match in matches)
     result = []
     for match in matches:
-        sender = db.query(User).filter(User.id == match.user_id).first()
         result.append({
-            "id": str(match.id),
-            "sender": {
-                "id": str(sender.id),
-                "name": sender.name,
-                "email": sender.email,
-                "avatar": sender.avatar,
-                "bio": sender.bio,
-                "rating": sender.rating,
-            } if sender else None,
+            "id": match.id,
+            "sender": users[str(match.user_id)],
             "match_score": match.match_score,
             "common_skills": match.common_skills,
-            "status": match.status.value,
-            "created_at": match.created_at.isoformat(),
+            "status": match.status,
+            "created_at": match.created_at,
         })
-    return result
+    return rows_response(result, response)
 
 
-@router.get("/connections")
+@router.get("/connections", dependencies=[Depends(conditional_get("matches"))])
 async def get_accepted_connections(
+    response: Response,
     db: Session = Depends(get_db),
+    cards: UserCardLoader = Depends(get_user_cards),
     current_user: User = Depends(get_current_user)
 ):
     """Get all accepted connections (can message these users)"""
-    matches = db.query(Match).filter(
+    matches = db.query(
+        Match.id, Match.user_id, Match.matched_user_id, Match.match_score, Match.common_skills, Match.updated_at
+    ).filter(
         and_(
             or_(
                 Match.user_id == current_user.id,
@@ -183,43 +117,45 @@ async def get_accepted_connections(
         )
     ).all()
     
+    # The other user of each connection
+    other_ids = [
+        match.matched_user_id if match.user_id == current_user.id else match.user_id
+        for match in matches
+    ]
+    users = cards.load_many(other_ids)
+    
     result = []
-    for match in matches:
-        # Get the other user
-        other_user_id = match.matched_user_id if match.user_id == current_user.id else match.user_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
-        
+    for match, other_user_id in zip(matches, other_ids):
+        other_user = users[str(other_user_id)]
         if other_user:
             result.append({
-                "id": str(match.id),
-                "user": {
-                    "id": str(other_user.id),
-                    "name": other_user.name,
-                    "email": other_user.email,
-                    "avatar": other_user.avatar,
-                    "bio": other_user.bio,
-                    "rating": other_user.rating,
-                },
+                "id": match.id,
+                "user": other_user,
                 "match_score": match.match_score,
                 "common_skills": match.common_skills,
-                "connected_at": match.updated_at.isoformat(),
+                "connected_at": match.updated_at,
             })
-    return result
+    return rows_response(result, response)
 
 
-@router.get("/", response_model=List[MatchResponse])
+def user_match_rows(db: Session, user_id: UUID):
+    """MatchResponse-shaped rows for every match the user sent or received"""
+    return db.query(*MATCH_COLUMNS).filter(
+        or_(
+            Match.user_id == user_id,
+            Match.matched_user_id == user_id
+        )
+    ).all()
+
+
+@router.get("/", response_model=List[MatchResponse], dependencies=[Depends(conditional_get("matches"))])
 async def get_user_matches(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all matches involving current user"""
-    matches = db.query(Match).filter(
-        or_(
-            Match.user_id == current_user.id,
-            Match.matched_user_id == current_user.id
-        )
-    ).all()
-    return matches
+    return rows_response(user_match_rows(db, current_user.id), response)
 
 
 @router.post("/", response_model=MatchResponse, status_code=status.HTTP_201_CREATED)
@@ -229,23 +165,69 @@ async def create_match(
     current_user: User = Depends(get_current_user)
 ):
     """Send a connection request to another user"""
+    user_low_id, user_high_id = canonical_pair(current_user.id, match_data.matched_user_id)
+    
     # Check if match already exists in either direction
     existing = db.query(Match).filter(
-        or_(
-            and_(Match.user_id == current_user.id, Match.matched_user_id == match_data.matched_user_id),
-            and_(Match.user_id == match_data.matched_user_id, Match.matched_user_id == current_user.id)
-        )
+        Match.user_low_id == user_low_id,
+        Match.user_high_id == user_high_id
     ).first()
     
-    if existing:
+    if existing and existing.status in (MatchStatus.pending, MatchStatus.accepted):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Connection request already exists"
         )
     
-    new_match = Match(**match_data.dict(), user_id=current_user.id)
+    if existing:
+        # An expired or rejected request doesn't block the pair forever: reopen the row
+        # as a fresh request from this user. Conditional on status so a concurrent
+        # request for the same pair can't reopen it twice.
+        now = datetime.utcnow()
+        reopened = db.execute(
+            update(Match).where(
+                Match.id == existing.id,
+                Match.status.in_([MatchStatus.expired, MatchStatus.rejected])
+            ).values(
+                user_id=current_user.id,
+                matched_user_id=match_data.matched_user_id,
+                match_score=match_data.match_score,
+                common_skills=match_data.common_skills,
+                status=MatchStatus.pending,
+                created_at=now,
+                updated_at=now
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        if not reopened:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Connection request already exists"
+            )
+        db.commit()
+        bump_versions([current_user.id, match_data.matched_user_id], "matches")
+        match_suggestions.invalidate_match_suggestions(current_user.id, match_data.matched_user_id)
+        db.refresh(existing)
+        return existing
+    
+    new_match = Match(
+        **match_data.dict(),
+        user_id=current_user.id,
+        user_low_id=user_low_id,
+        user_high_id=user_high_id
+    )
     db.add(new_match)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent request for the same pair
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Connection request already exists"
+        )
+    bump_versions([new_match.user_id, new_match.matched_user_id], "matches")
+    match_suggestions.invalidate_match_suggestions(new_match.user_id, new_match.matched_user_id)
     db.refresh(new_match)
     return new_match
 
@@ -272,6 +254,7 @@ async def accept_match(
     
     match.status = MatchStatus.accepted
     db.commit()
+    bump_versions([match.user_id, match.matched_user_id], "matches")
     db.refresh(match)
     return match
 
@@ -297,6 +280,7 @@ async def reject_match(
     
     match.status = MatchStatus.rejected
     db.commit()
+    bump_versions([match.user_id, match.matched_user_id], "matches")
     db.refresh(match)
     return match
 
@@ -320,6 +304,9 @@ async def cancel_match_request(
             detail="Match request not found or you cannot cancel it"
         )
     
+    participants = [match.user_id, match.matched_user_id]
     db.delete(match)
     db.commit()
+    bump_versions(participants, "matches")
+    match_suggestions.invalidate_match_suggestions(*participants)
     return {"message": "Request cancelled"}
@@ -1,81 +1,100 @@
 from typing import List
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy import or_, and_, func, desc, case, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.database import User
-from app.models.messaging import Conversation, Message
+from app.api.deps import get_current_user, conditional_get, get_user_cards
+from app.models.database import User, Match, MatchStatus, canonical_pair
+from app.models.messaging import Conversation, Message, ConversationRead
+from app.services.message_search import search_messages
+from app.services.message_partitions import hot_window_start
+from app.core.serialization import rows_response
+from app.services.resource_versions import bump_versions
+from app.services.user_cards import UserCardLoader
 from app.schemas.messaging import (
-    MessageCreate, MessageResponse, MessageWithSender,
+    MessageCreate, MessageResponse, MessageWithSender, MessageSearchResult,
     ConversationResponse, ConversationWithMessages, 
-    StartConversationRequest, ConversationParticipant
+    StartConversationRequest, ConversationParticipant,
+    MarkReadRequest, ReadReceiptResponse
 )
 
 router = APIRouter()
 
 
-@router.get("/conversations", response_model=List[ConversationResponse])
+@router.get("/conversations", response_model=List[ConversationResponse], dependencies=[Depends(conditional_get("conversations"))])
 async def get_conversations(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all conversations for the current user"""
-    conversations = db.query(Conversation).filter(
+    other_user_id = case(
+        (Conversation.user1_id == current_user.id, Conversation.user2_id),
+        else_=Conversation.user1_id
+    )
+    # Last message and unread count as correlated subqueries, both served by ix_messages_conversation_created
+    since = hot_window_start()
+    last_message = select(Message.content).where(
+        Message.conversation_id == Conversation.id,
+        Message.created_at >= since
+    ).order_by(desc(Message.created_at)).limit(1).correlate(Conversation)
+    unread = select(func.count(Message.id)).where(
+        Message.conversation_id == Conversation.id,
+        Message.sender_id != current_user.id,
+        Message.is_read == False,
+        Message.created_at >= since
+    ).correlate(Conversation).scalar_subquery()
+
+    rows = db.query(
+        Conversation.id,
+        Conversation.created_at,
+        Conversation.updated_at,
+        User.id.label("other_id"),
+        User.name,
+        User.email,
+        User.avatar,
+        last_message.scalar_subquery().label("last_message"),
+        last_message.with_only_columns(Message.created_at).scalar_subquery().label("last_message_time"),
+        unread.label("unread_count")
+    ).join(User, User.id == other_user_id).filter(
         or_(
             Conversation.user1_id == current_user.id,
             Conversation.user2_id == current_user.id
         )
     ).order_by(desc(Conversation.updated_at)).all()
-    
-    result = []
-    for conv in conversations:
-        # Determine the other user
-        other_user = conv.user2 if conv.user1_id == current_user.id else conv.user1
-        
-        # Get last message
-        last_msg = db.query(Message).filter(
-            Message.conversation_id == conv.id
-        ).order_by(desc(Message.created_at)).first()
-        
-        # Count unread messages
-        unread = db.query(func.count(Message.id)).filter(
-            and_(
-                Message.conversation_id == conv.id,
-                Message.sender_id != current_user.id,
-                Message.is_read == False
-            )
-        ).scalar()
-        
-        result.append(ConversationResponse(
-            id=conv.id,
-            other_user=ConversationParticipant(
-                id=other_user.id,
-                name=other_user.name,
-                email=other_user.email,
-                avatar=other_user.avatar
-            ),
-            last_message=last_msg.content if last_msg else None,
-            last_message_time=last_msg.created_at if last_msg else None,
-            unread_count=unread or 0,
-            created_at=conv.created_at or datetime.utcnow(),
-            updated_at=conv.updated_at or conv.created_at or datetime.utcnow()
-        ))
-    
-    return result
+
+    now = datetime.utcnow()
+    return rows_response([
+        {
+            "id": row.id,
+            "other_user": {
+                "id": row.other_id,
+                "name": row.name,
+                "email": row.email,
+                "avatar": row.avatar,
+            },
+            "last_message": row.last_message,
+            "last_message_time": row.last_message_time,
+            "unread_count": row.unread_count or 0,
+            "created_at": row.created_at or now,
+            "updated_at": row.updated_at or row.created_at or now,
+        }
+        for row in rows
+    ], response)
 
 
 @router.post("/conversations", response_model=ConversationResponse)
 async def start_conversation(
     request: StartConversationRequest,
     db: Session = Depends(get_db),
+    cards: UserCardLoader = Depends(get_user_cards),
     current_user: User = Depends(get_current_user)
 ):
     """Start a new conversation with another user (must be connected)"""
-    from app.models.database import Match, MatchStatus
-    
     target_user_id = request.user_id
     
     if str(target_user_id) == str(current_user.id):
@@ -85,29 +104,20 @@ async def start_conversation(
         )
     
     # Check if other user exists
-    other_user = db.query(User).filter(User.id == target_user_id).first()
+    other_user = cards.load(target_user_id)
     if not other_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User not found: {target_user_id}"
         )
     
-    # Check if users are connected (accepted match)
-    # Get all matches involving both users
-    all_matches = db.query(Match).filter(
-        or_(
-            Match.user_id == current_user.id,
-            Match.matched_user_id == current_user.id
-        )
-    ).all()
+    user_low_id, user_high_id = canonical_pair(current_user.id, target_user_id)
     
-    # Find the connection between these two users
-    connection = None
-    for m in all_matches:
-        if (str(m.user_id) == str(current_user.id) and str(m.matched_user_id) == str(target_user_id)) or \
-           (str(m.user_id) == str(target_user_id) and str(m.matched_user_id) == str(current_user.id)):
-            connection = m
-            break
+    # Check if users are connected (accepted match) - single lookup on the pair index
+    connection = db.query(Match).filter(
+        Match.user_low_id == user_low_id,
+        Match.user_high_id == user_high_id
+    ).first()
     
     # Check if connection exists and is accepted
     if not connection:
@@ -123,30 +133,35 @@ async def start_conversation(
         )
     
     # Check if conversation already exists
-    all_convs = db.query(Conversation).filter(
-        or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
-        )
-    ).all()
+    existing = db.query(Conversation).filter(
+        Conversation.user_low_id == user_low_id,
+        Conversation.user_high_id == user_high_id
+    ).first()
     
-    existing = None
-    for conv in all_convs:
-        if (str(conv.user1_id) == str(current_user.id) and str(conv.user2_id) == str(target_user_id)) or \
-           (str(conv.user1_id) == str(target_user_id) and str(conv.user2_id) == str(current_user.id)):
-            existing = conv
-            break
+    if not existing:
+        # Create new conversation
+        conversation = Conversation(
+            user1_id=current_user.id,
+            user2_id=target_user_id,
+            user_low_id=user_low_id,
+            user_high_id=user_high_id
+        )
+        db.add(conversation)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request created the conversation first - reuse it
+            db.rollback()
+            existing = db.query(Conversation).filter(
+                Conversation.user_low_id == user_low_id,
+                Conversation.user_high_id == user_high_id
+            ).first()
     
     if existing:
         # Return existing conversation
         return ConversationResponse(
             id=existing.id,
-            other_user=ConversationParticipant(
-                id=other_user.id,
-                name=other_user.name,
-                email=other_user.email,
-                avatar=other_user.avatar
-            ),
+            other_user=ConversationParticipant.model_validate(other_user),
             last_message=None,
             last_message_time=None,
             unread_count=0,
@@ -154,13 +169,6 @@ async def start_conversation(
             updated_at=existing.updated_at or existing.created_at or datetime.utcnow()
         )
     
-    # Create new conversation
-    conversation = Conversation(
-        user1_id=current_user.id,
-        user2_id=target_user_id
-    )
-    db.add(conversation)
-    db.commit()
     db.refresh(conversation)
     
     # Send initial message if provided
@@ -173,14 +181,10 @@ async def start_conversation(
         db.add(message)
         db.commit()
     
+    bump_versions([current_user.id, target_user_id], "conversations")
     return ConversationResponse(
         id=conversation.id,
-        other_user=ConversationParticipant(
-            id=other_user.id,
-            name=other_user.name,
-            email=other_user.email,
-            avatar=other_user.avatar
-        ),
+        other_user=ConversationParticipant.model_validate(other_user),
         last_message=request.initial_message,
         last_message_time=conversation.created_at if request.initial_message else None,
         unread_count=0,
@@ -189,13 +193,17 @@ async def start_conversation(
     )
 
 
-@router.get("/conversations/{conversation_id}", response_model=ConversationWithMessages)
+@router.get("/conversations/{conversation_id}", response_model=ConversationWithMessages, dependencies=[Depends(conditional_get("conversations"))])
 async def get_conversation(
     conversation_id: UUID,
     db: Session = Depends(get_db),
+    cards: UserCardLoader = Depends(get_user_cards),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific conversation with all messages"""
+    """
+    Get a specific conversation with all messages.
+    Read-only: use POST /conversations/{id}/read to advance the read watermark.
+    """
     conversation = db.query(Conversation).filter(
         and_(
             Conversation.id == conversation_id,
@@ -212,22 +220,15 @@ async def get_conversation(
             detail="Conversation not found"
         )
     
-    # Mark messages as read
-    db.query(Message).filter(
-        and_(
-            Message.conversation_id == conversation_id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        )
-    ).update({"is_read": True})
-    db.commit()
-    
-    # Get other user
-    other_user = conversation.user2 if conversation.user1_id == current_user.id else conversation.user1
+    # Both participants' cards in one lookup; every message's sender is one of them
+    users = cards.load_many([conversation.user1_id, conversation.user2_id])
+    other_user_id = conversation.user2_id if conversation.user1_id == current_user.id else conversation.user1_id
+    other_user = users[str(other_user_id)]
     
     # Get messages with sender info
     messages = db.query(Message).filter(
-        Message.conversation_id == conversation_id
+        Message.conversation_id == conversation_id,
+        Message.created_at >= hot_window_start()
     ).order_by(Message.created_at).all()
     
     messages_with_sender = []
@@ -239,27 +240,131 @@ async def get_conversation(
             content=msg.content,
             is_read=msg.is_read,
             created_at=msg.created_at,
-            sender_name=msg.sender.name,
-            sender_avatar=msg.sender.avatar
+            sender_name=users[str(msg.sender_id)]["name"],
+            sender_avatar=users[str(msg.sender_id)]["avatar"]
         ))
     
     return ConversationWithMessages(
         id=conversation.id,
-        other_user=ConversationParticipant(
-            id=other_user.id,
-            name=other_user.name,
-            email=other_user.email,
-            avatar=other_user.avatar
-        ),
+        other_user=ConversationParticipant.model_validate(other_user),
         last_message=messages[-1].content if messages else None,
         last_message_time=messages[-1].created_at if messages else None,
-        unread_count=0,
+        unread_count=sum(1 for msg in messages if msg.sender_id != current_user.id and not msg.is_read),
         created_at=conversation.created_at or datetime.utcnow(),
         updated_at=conversation.updated_at or conversation.created_at or datetime.utcnow(),
         messages=messages_with_sender
     )
 
 
+@router.post("/conversations/{conversation_id}/read", response_model=ReadReceiptResponse)
+async def mark_conversation_read(
+    conversation_id: UUID,
+    read_data: MarkReadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark messages as read up to (and including) the given message.
+    - The watermark only moves forward; older or repeated watermarks are a no-op
+    - Messages in the newly covered range get is_read set in a single UPDATE
+    """
+    conversation = db.query(Conversation).filter(
+        and_(
+            Conversation.id == conversation_id,
+            or_(
+                Conversation.user1_id == current_user.id,
+                Conversation.user2_id == current_user.id
+            )
+        )
+    ).first()
+    
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    
+    watermark = db.query(Message).filter(
+        Message.id == read_data.up_to_message_id,
+        Message.conversation_id == conversation_id
+    ).first()
+    
+    if not watermark:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found in this conversation"
+        )
+    
+    read_state = db.query(ConversationRead).filter(
+        ConversationRead.conversation_id == conversation_id,
+        ConversationRead.user_id == current_user.id
+    ).first()
+    
+    # Nothing new to mark - skip the write entirely
+    if read_state and read_state.last_read_at >= watermark.created_at:
+        return ReadReceiptResponse(
+            conversation_id=conversation_id,
+            user_id=current_user.id,
+            last_read_message_id=read_state.last_read_message_id,
+            last_read_at=read_state.last_read_at,
+            marked_count=0
+        )
+    
+    unread_filter = [
+        Message.conversation_id == conversation_id,
+        Message.sender_id != current_user.id,
+        Message.is_read == False,
+        Message.created_at <= watermark.created_at
+    ]
+    if read_state:
+        unread_filter.append(Message.created_at > read_state.last_read_at)
+    else:
+        unread_filter.append(Message.created_at >= hot_window_start())
+    
+    marked_count = db.query(Message).filter(*unread_filter).update(
+        {"is_read": True}, synchronize_session=False
+    )
+    
+    # Upsert so concurrent first reads don't collide on uq_conversation_reads_participant;
+    # the watermark still only moves forward if another request got there first
+    statement = postgresql.insert(ConversationRead).values(
+        id=uuid4(),
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        last_read_message_id=watermark.id,
+        last_read_at=watermark.created_at,
+        updated_at=datetime.utcnow()
+    )
+    moves_forward = statement.excluded.last_read_at > ConversationRead.last_read_at
+    read_state = db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["conversation_id", "user_id"],
+            set_={
+                "last_read_message_id": case(
+                    (moves_forward, statement.excluded.last_read_message_id),
+                    else_=ConversationRead.last_read_message_id
+                ),
+                "last_read_at": case(
+                    (moves_forward, statement.excluded.last_read_at),
+                    else_=ConversationRead.last_read_at
+                ),
+                "updated_at": statement.excluded.updated_at,
+            }
+        ).returning(ConversationRead.last_read_message_id, ConversationRead.last_read_at)
+    ).one()
+    
+    db.commit()
+    bump_versions([conversation.user1_id, conversation.user2_id], "conversations")
+    
+    return ReadReceiptResponse(
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        last_read_message_id=read_state.last_read_message_id,
+        last_read_at=read_state.last_read_at,
+        marked_count=marked_count
+    )
+
+
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageResponse)
 async def send_message(
     conversation_id: UUID,
@@ -297,36 +402,72 @@ async def send_message(
     conversation.updated_at = message.created_at
     
     db.commit()
+    bump_versions([conversation.user1_id, conversation.user2_id], "conversations")
     db.refresh(message)
     
     return message
 
 
-@router.get("/unread-count")
-async def get_unread_count(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get total unread message count"""
-    # Get all conversations for user
+def count_unread(db: Session, user_id: UUID) -> int:
+    """Messages from others, not yet read, across all of the user's conversations"""
     conversations = db.query(Conversation.id).filter(
         or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
+            Conversation.user1_id == user_id,
+            Conversation.user2_id == user_id
         )
     ).all()
     
     conv_ids = [c.id for c in conversations]
     
     if not conv_ids:
-        return {"unread_count": 0}
+        return 0
     
     count = db.query(func.count(Message.id)).filter(
         and_(
             Message.conversation_id.in_(conv_ids),
-            Message.sender_id != current_user.id,
-            Message.is_read == False
+            Message.sender_id != user_id,
+            Message.is_read == False,
+            Message.created_at >= hot_window_start()
         )
     ).scalar()
+    return count or 0
+
+
+@router.get("/unread-count", dependencies=[Depends(conditional_get("conversations"))])
+async def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get total unread message count"""
+    return {"unread_count": count_unread(db, current_user.id)}
+
+
+@router.get("/search", response_model=List[MessageSearchResult], dependencies=[Depends(conditional_get("conversations"))])
+async def search_my_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full-text search across messages in the current user's conversations, best match first"""
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query cannot be empty"
+        )
     
-    return {"unread_count": count or 0}
+    results = search_messages(db, current_user.id, q.strip(), skip=skip, limit=limit)
+    
+    return [
+        MessageSearchResult(
+            id=message.id,
+            conversation_id=message.conversation_id,
+            sender_id=message.sender_id,
+            content=message.content,
+            is_read=message.is_read,
+            created_at=message.created_at,
+            score=score
+        )
+        for message, score in results
+    ]
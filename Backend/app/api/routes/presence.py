@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from app.db.session import get_db
+from app.api.deps import get_current_user
+from app.core.cache import TTLCache
+from app.models.database import User, Match, MatchStatus
+from app.models.messaging import Conversation
+from app.schemas.presence import HeartbeatRequest, HeartbeatResponse, UserPresence
+from app.services.presence import get_presence_store
+
+router = APIRouter()
+
+# conversation_id -> (user1_id, user2_id); participants never change, so typing heartbeats skip the query
+_participants = TTLCache(ttl=3600, maxsize=50000)
+
+
+def _is_participant(db: Session, conversation_id, user_id) -> bool:
+    key = str(conversation_id)
+    participants = _participants.get(key)
+    if participants is None:
+        row = db.query(Conversation.user1_id, Conversation.user2_id).filter(
+            Conversation.id == conversation_id
+        ).first()
+        if row is None:
+            return False
+        participants = (str(row.user1_id), str(row.user2_id))
+        _participants.set(key, participants)
+    return str(user_id) in participants
+
+
+@router.post("/heartbeat", response_model=HeartbeatResponse)
+async def heartbeat(
+    heartbeat_data: HeartbeatRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Mark the current user online, optionally with typing state for a conversation.
+    Clients should send this every ~20 seconds while active, and on typing start/stop.
+    Nothing is written to the database.
+    """
+    if heartbeat_data.conversation_id and not _is_participant(db, heartbeat_data.conversation_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a participant in this conversation"
+        )
+    
+    store = get_presence_store()
+    seen = store.touch(str(current_user.id))
+    if heartbeat_data.conversation_id:
+        store.set_typing(str(heartbeat_data.conversation_id), str(current_user.id), heartbeat_data.typing)
+    
+    return HeartbeatResponse(
+        user_id=current_user.id,
+        last_seen=datetime.utcfromtimestamp(seen)
+    )
+
+
+@router.get("/", response_model=List[UserPresence])
+async def get_connections_presence(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Presence and typing state for all accepted connections in one call.
+    No ETag: presence expires on its own within seconds, so there is no version to compare.
+    """
+    matches = db.query(Match.user_id, Match.matched_user_id).filter(
+        or_(
+            Match.user_id == current_user.id,
+            Match.matched_user_id == current_user.id
+        ),
+        Match.status == MatchStatus.accepted
+    ).all()
+    
+    connection_ids = [
+        matched_user_id if user_id == current_user.id else user_id
+        for user_id, matched_user_id in matches
+    ]
+    if not connection_ids:
+        return []
+    
+    conversations = db.query(Conversation.id, Conversation.user1_id, Conversation.user2_id).filter(
+        or_(
+            Conversation.user1_id == current_user.id,
+            Conversation.user2_id == current_user.id
+        )
+    ).all()
+    conversation_by_user = {
+        (user2_id if user1_id == current_user.id else user1_id): conv_id
+        for conv_id, user1_id, user2_id in conversations
+    }
+    
+    store = get_presence_store()
+    last_seen = store.last_seen(str(uid) for uid in connection_ids)
+    typing = store.typing(str(conv_id) for conv_id in conversation_by_user.values())
+    
+    result = []
+    for uid in connection_ids:
+        seen = last_seen.get(str(uid))
+        conv_id = conversation_by_user.get(uid)
+        result.append(UserPresence(
+            user_id=uid,
+            online=seen is not None,
+            last_seen=datetime.utcfromtimestamp(seen) if seen is not None else None,
+            conversation_id=conv_id,
+            typing=conv_id is not None and str(uid) in typing.get(str(conv_id), set())
+        ))
+    return result
@@ -1,15 +1,45 @@
-from typing import List
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, update, insert, select
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.database import User, Session as DBSession, SessionStatus, SessionType, CreditTransaction
-from app.schemas.schemas import SessionResponse, SessionCreate, SessionUpdate, SessionRatingRequest
+from app.api.deps import get_current_user, conditional_get
+from app.core.pagination import paginate
+from app.core.serialization import rows_response
+from app.models.database import User, Session as DBSession, SessionStatus, SessionType
+from app.schemas.schemas import (
+    SessionResponse, SessionCreate, SessionUpdate, SessionRatingRequest, SessionSummaryResponse,
+    ConflictCheckRequest, SlotConflictResponse, SessionSeriesCreate, SessionSeriesReschedule
+)
+from app.core.scheduling import parse_session_start, session_end, shift_session_date
+from app.services import credit_ledger, idempotency
+from app.services.session_summary import get_session_summary, invalidate_session_summary
+from app.services.session_conflicts import (
+    find_conflicts, invalidate_busy_intervals, lock_busy_intervals, overlapping_sessions
+)
+from app.services.session_reminders import sync_session_reminders
+from app.services.resource_versions import bump_versions
+from app.services.user_cards import invalidate_user_cards
+from app.services.exports import export_response
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 200
+
+# Every SessionResponse field, so list endpoints can serialize rows without loading ORM objects
+SESSION_COLUMNS = [
+    DBSession.id, DBSession.title, DBSession.user_id, DBSession.participant_id, DBSession.participant_name,
+    DBSession.skill, DBSession.date, DBSession.time, DBSession.duration, DBSession.type, DBSession.status,
+    DBSession.credits_amount, DBSession.starts_at, DBSession.ends_at, DBSession.series_id,
+    DBSession.rating, DBSession.feedback, DBSession.rated_by, DBSession.created_at, DBSession.updated_at,
+]
+
+# Longest window the calendar endpoint will return in one call
+MAX_CALENDAR_RANGE = timedelta(days=92)
+
 # Credit rates per duration (in minutes)
 CREDIT_RATES = {
     15: 5,   # 15 min = 5 credits
@@ -23,64 +53,106 @@ def get_credits_for_duration(duration: int) -> int:
     return CREDIT_RATES.get(duration, duration // 3)  # Default: 1 credit per 3 minutes
 
 
-@router.get("/", response_model=List[SessionResponse])
+def session_slot(date: str, time: str, duration: int):
+    """(starts_at, ends_at) of a session slot; 400 if the date or time can't be parsed"""
+    starts_at = parse_session_start(date, time)
+    if starts_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unrecognised date or time: {date} {time}"
+        )
+    return starts_at, session_end(starts_at, duration)
+
+
+def ensure_no_conflict(db: Session, user_ids, date: str, time: str, duration: int, exclude_session_id: UUID = None):
+    """Raise 409 if the slot overlaps a scheduled session of any of `user_ids`; their rows stay locked until commit"""
+    starts_at, ends_at = session_slot(date, time, duration)
+    indexes = lock_busy_intervals(db, user_ids)
+    conflicts = overlapping_sessions(indexes.values(), starts_at, ends_at, exclude_session_id)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Time slot overlaps {len(conflicts)} already scheduled session(s). Use /api/sessions/conflicts to check slots first."
+        )
+
+
+def user_sessions_query(db: Session, user_id: UUID):
+    """Column query for every session the user organizes or takes part in; paginate it on (created_at, id)"""
+    return db.query(*SESSION_COLUMNS).filter(
+        or_(
+            DBSession.user_id == user_id,
+            DBSession.participant_id == user_id
+        )
+    )
+
+
+@router.get("/", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
 async def get_user_sessions(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     status_filter: SessionStatus = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all sessions for current user (as organizer or participant)"""
-    query = db.query(DBSession).filter(
-        or_(
-            DBSession.user_id == current_user.id,
-            DBSession.participant_id == current_user.id
-        )
-    )
+    """Get sessions for current user (as organizer or participant), newest first. Pass X-Next-Cursor back as `cursor` for the next page."""
+    query = user_sessions_query(db, current_user.id)
     
     if status_filter:
         query = query.filter(DBSession.status == status_filter)
     
-    sessions = query.order_by(DBSession.created_at.desc()).all()
-    return sessions
+    sessions = paginate(query, DBSession.created_at, DBSession.id, cursor, limit, response)
+    return rows_response(sessions, response)
 
 
-@router.get("/pending", response_model=List[SessionResponse])
+@router.get("/pending", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
 async def get_pending_requests(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get pending session requests where I am the participant (need to accept/reject)"""
-    sessions = db.query(DBSession).filter(
+    query = db.query(*SESSION_COLUMNS).filter(
         and_(
             DBSession.participant_id == current_user.id,
             DBSession.status == SessionStatus.pending
         )
-    ).order_by(DBSession.created_at.desc()).all()
-    return sessions
+    )
+    sessions = paginate(query, DBSession.created_at, DBSession.id, cursor, limit, response)
+    return rows_response(sessions, response)
 
 
-@router.get("/sent", response_model=List[SessionResponse])
+@router.get("/sent", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
 async def get_sent_requests(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get session requests I sent (waiting for acceptance)"""
-    sessions = db.query(DBSession).filter(
+    query = db.query(*SESSION_COLUMNS).filter(
         and_(
             DBSession.user_id == current_user.id,
             DBSession.status == SessionStatus.pending
         )
-    ).order_by(DBSession.created_at.desc()).all()
-    return sessions
+    )
+    sessions = paginate(query, DBSession.created_at, DBSession.id, cursor, limit, response)
+    return rows_response(sessions, response)
 
 
-@router.get("/scheduled", response_model=List[SessionResponse])
+@router.get("/scheduled", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
 async def get_scheduled_sessions(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all scheduled (accepted) sessions"""
-    sessions = db.query(DBSession).filter(
+    """Get scheduled (accepted) sessions, soonest first"""
+    query = db.query(*SESSION_COLUMNS).filter(
         and_(
             or_(
                 DBSession.user_id == current_user.id,
@@ -88,17 +160,131 @@ async def get_scheduled_sessions(
             ),
             DBSession.status == SessionStatus.scheduled
         )
-    ).order_by(DBSession.date, DBSession.time).all()
-    return sessions
+    )
+    sessions = paginate(query, DBSession.starts_at, DBSession.id, cursor, limit, response, descending=False)
+    return rows_response(sessions, response)
+
+
+@router.get("/summary", response_model=SessionSummaryResponse, dependencies=[Depends(conditional_get("sessions", "credits"))])
+async def get_sessions_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Dashboard summary: counts by status/type, completed minutes, credits earned/spent and this week's activity"""
+    return get_session_summary(db, current_user.id)
+
+
+@router.get("/export")
+async def export_sessions(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """All of the current user's sessions as a streamed CSV or NDJSON download, oldest first"""
+    statement = select(
+        DBSession.id,
+        DBSession.title,
+        DBSession.skill,
+        DBSession.type,
+        DBSession.status,
+        DBSession.date,
+        DBSession.time,
+        DBSession.starts_at,
+        DBSession.ends_at,
+        DBSession.duration,
+        DBSession.credits_amount,
+        DBSession.user_id,
+        DBSession.participant_id,
+        DBSession.participant_name,
+        DBSession.series_id,
+        DBSession.rating,
+        DBSession.feedback,
+        DBSession.created_at
+    ).where(
+        or_(
+            DBSession.user_id == current_user.id,
+            DBSession.participant_id == current_user.id
+        )
+    ).order_by(DBSession.created_at, DBSession.id)
+    return export_response(db.get_bind(), statement, fmt, "sessions")
+
+
+@router.get("/calendar", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
+async def get_calendar_sessions(
+    response: Response,
+    from_: datetime = Query(..., alias="from"),
+    to: datetime = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get sessions starting in [from, to), ordered by start time.
+    Cancelled and rejected sessions are excluded. Naive datetimes are treated as UTC.
+    """
+    if from_.tzinfo is None:
+        from_ = from_.replace(tzinfo=timezone.utc)
+    if to.tzinfo is None:
+        to = to.replace(tzinfo=timezone.utc)
+    
+    if to <= from_:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+    if to - from_ > MAX_CALENDAR_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range cannot exceed {MAX_CALENDAR_RANGE.days} days"
+        )
+    
+    active_statuses = [SessionStatus.pending, SessionStatus.scheduled, SessionStatus.completed]
+    in_range = and_(
+        DBSession.status.in_(active_statuses),
+        DBSession.starts_at >= from_,
+        DBSession.starts_at < to
+    )
+    # Each branch matches one of the (user, status, starts_at) composite indexes
+    sessions = db.query(*SESSION_COLUMNS).filter(
+        or_(
+            and_(DBSession.user_id == current_user.id, in_range),
+            and_(DBSession.participant_id == current_user.id, in_range)
+        )
+    ).order_by(DBSession.starts_at).all()
+    return rows_response(sessions, response)
 
 
-@router.get("/history", response_model=List[SessionResponse])
+@router.post("/conflicts", response_model=List[SlotConflictResponse])
+async def check_conflicts(
+    request: ConflictCheckRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Check proposed slots against the scheduled sessions of the current user (and the slot's participant, if given)"""
+    results = []
+    for slot in request.slots:
+        user_ids = [current_user.id] + ([slot.participant_id] if slot.participant_id else [])
+        starts_at, ends_at = session_slot(slot.date, slot.time, slot.duration)
+        results.append(SlotConflictResponse(
+            date=slot.date,
+            time=slot.time,
+            duration=slot.duration,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            conflicting_session_ids=find_conflicts(db, user_ids, starts_at, ends_at)
+        ))
+    return results
+
+
+@router.get("/history", response_model=List[SessionResponse], dependencies=[Depends(conditional_get("sessions"))])
 async def get_session_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get completed sessions"""
-    sessions = db.query(DBSession).filter(
+    """Get completed sessions, most recently completed first"""
+    query = db.query(*SESSION_COLUMNS).filter(
         and_(
             or_(
                 DBSession.user_id == current_user.id,
@@ -106,8 +292,9 @@ async def get_session_history(
             ),
             DBSession.status == SessionStatus.completed
         )
-    ).order_by(DBSession.updated_at.desc()).all()
-    return sessions
+    )
+    sessions = paginate(query, DBSession.updated_at, DBSession.id, cursor, limit, response)
+    return rows_response(sessions, response)
 
 
 @router.post("/", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
@@ -140,6 +327,11 @@ async def create_session(
             detail="Participant not found"
         )
     
+    ensure_no_conflict(
+        db, [current_user.id, session_data.participant_id],
+        session_data.date, session_data.time, session_data.duration
+    )
+    
     new_session = DBSession(
         title=session_data.title,
         user_id=current_user.id,
@@ -156,9 +348,258 @@ async def create_session(
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    invalidate_session_summary(new_session.user_id, new_session.participant_id)
+    bump_versions([new_session.user_id, new_session.participant_id], "sessions")
     return new_session
 
 
+def _series_sessions(db: Session, series_id: UUID, current_user: User, organizer_only: bool = False):
+    """Still-open (pending/scheduled) occurrences of a series the current user is part of"""
+    member = DBSession.user_id == current_user.id
+    if not organizer_only:
+        member = or_(member, DBSession.participant_id == current_user.id)
+    return db.query(DBSession).filter(
+        DBSession.series_id == series_id,
+        member,
+        DBSession.status.in_([SessionStatus.pending, SessionStatus.scheduled])
+    ).order_by(DBSession.starts_at.asc().nulls_last()).all()
+
+
+def _ensure_series_free(db: Session, sessions: List[DBSession], slots=None):
+    """409 if any occurrence overlaps a scheduled session outside the series; both users stay locked until commit"""
+    own_ids = {session.id for session in sessions}
+    indexes = lock_busy_intervals(db, {user_id for s in sessions for user_id in (s.user_id, s.participant_id)})
+    for session in sessions:
+        starts_at, ends_at = slots[session.id] if slots else (session.starts_at, session.ends_at)
+        if starts_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unrecognised date or time for the occurrence on {session.date}"
+            )
+        conflicts = [
+            session_id for session_id in overlapping_sessions(
+                (indexes[session.user_id], indexes[session.participant_id]), starts_at, ends_at
+            )
+            if session_id not in own_ids
+        ]
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Occurrence on {session.date} overlaps an already scheduled session"
+            )
+
+
+@router.post("/series", response_model=List[SessionResponse], status_code=status.HTTP_201_CREATED)
+async def create_session_series(
+    series_data: SessionSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create every occurrence of a recurring session in one multi-row insert"""
+    credits_amount = get_credits_for_duration(series_data.duration)
+    
+    if series_data.type == SessionType.learning:
+        if current_user.credits < credits_amount:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient credits. You need {credits_amount} credits but have {current_user.credits}"
+            )
+    
+    participant_exists = db.query(User.id).filter(User.id == series_data.participant_id).first()
+    if not participant_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participant not found"
+        )
+    
+    indexes = lock_busy_intervals(db, [current_user.id, series_data.participant_id]).values()
+    rule = series_data.recurrence
+    step_days = rule.interval * (7 if rule.frequency == "weekly" else 1)
+    series_id = uuid4()
+    now = datetime.utcnow()
+    rows = []
+    for occurrence in range(rule.count):
+        date = shift_session_date(series_data.date, occurrence * step_days)
+        if date is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unrecognised date: {series_data.date}"
+            )
+        starts_at, ends_at = session_slot(date, series_data.time, series_data.duration)
+        if overlapping_sessions(indexes, starts_at, ends_at):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Occurrence on {date} overlaps an already scheduled session"
+            )
+        rows.append({
+            "id": uuid4(),
+            "series_id": series_id,
+            "title": series_data.title,
+            "user_id": current_user.id,
+            "participant_id": series_data.participant_id,
+            "participant_name": series_data.participant_name,
+            "skill": series_data.skill,
+            "date": date,
+            "time": series_data.time,
+            "duration": series_data.duration,
+            "starts_at": starts_at,
+            "ends_at": ends_at,
+            "credits_amount": credits_amount,
+            "type": series_data.type,
+            "status": SessionStatus.pending,
+            "created_at": now,
+            "updated_at": now,
+        })
+    
+    # Core insert: one statement for all rows (mapper events don't fire, so starts_at/ends_at are set above)
+    db.execute(insert(DBSession), rows)
+    db.commit()
+    invalidate_session_summary(current_user.id, series_data.participant_id)
+    bump_versions([current_user.id, series_data.participant_id], "sessions")
+    return db.query(DBSession).filter(DBSession.series_id == series_id).order_by(DBSession.starts_at).all()
+
+
+@router.post("/series/{series_id}/accept", response_model=List[SessionResponse])
+async def accept_session_series(
+    series_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Accept every pending occurrence of a series (only the participant can accept)"""
+    pending = db.query(DBSession).filter(
+        DBSession.series_id == series_id,
+        DBSession.participant_id == current_user.id,
+        DBSession.status == SessionStatus.pending
+    ).all()
+    
+    if not pending:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No pending sessions in this series that you can accept"
+        )
+    
+    first = pending[0]
+    # The participant learns (and pays) every occurrence they accept
+    credits_needed = sum(session.credits_amount for session in pending)
+    if first.type == SessionType.teaching and current_user.credits < credits_needed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient credits. You need {credits_needed} credits but have {current_user.credits}"
+        )
+    
+    _ensure_series_free(db, pending)
+    
+    db.execute(
+        update(DBSession).where(
+            DBSession.series_id == series_id,
+            DBSession.participant_id == current_user.id,
+            DBSession.status == SessionStatus.pending
+        ).values(status=SessionStatus.scheduled, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    invalidate_session_summary(first.user_id, first.participant_id)
+    bump_versions([first.user_id, first.participant_id], "sessions")
+    invalidate_busy_intervals(first.user_id, first.participant_id)
+    series_sessions = db.query(DBSession).filter(DBSession.series_id == series_id).order_by(DBSession.starts_at).all()
+    sync_session_reminders(*series_sessions)
+    return series_sessions
+
+
+@router.post("/series/{series_id}/cancel", response_model=List[SessionResponse])
+async def cancel_session_series(
+    series_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel every pending/scheduled occurrence of a series (either side can cancel)"""
+    open_sessions = _series_sessions(db, series_id, current_user)
+    if not open_sessions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Series not found or nothing left to cancel"
+        )
+    
+    db.execute(
+        update(DBSession).where(
+            DBSession.series_id == series_id,
+            or_(
+                DBSession.user_id == current_user.id,
+                DBSession.participant_id == current_user.id
+            ),
+            DBSession.status.in_([SessionStatus.pending, SessionStatus.scheduled])
+        ).values(status=SessionStatus.cancelled, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    first = open_sessions[0]
+    invalidate_session_summary(first.user_id, first.participant_id)
+    bump_versions([first.user_id, first.participant_id], "sessions")
+    invalidate_busy_intervals(first.user_id, first.participant_id)
+    series_sessions = db.query(DBSession).filter(DBSession.series_id == series_id).order_by(DBSession.starts_at).all()
+    sync_session_reminders(*series_sessions)
+    return series_sessions
+
+
+@router.post("/series/{series_id}/reschedule", response_model=List[SessionResponse])
+async def reschedule_session_series(
+    series_id: UUID,
+    changes: SessionSeriesReschedule,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move every pending/scheduled occurrence of a series (only organizer).
+    `time` and `duration` replace the current values; `shift_days` moves each date.
+    """
+    open_sessions = _series_sessions(db, series_id, current_user, organizer_only=True)
+    if not open_sessions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Series not found or cannot be rescheduled"
+        )
+    
+    updates = []
+    slots = {}
+    for session in open_sessions:
+        date = session.date
+        if changes.shift_days:
+            date = shift_session_date(session.date, changes.shift_days)
+            if date is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unrecognised date: {session.date}"
+                )
+        time = changes.time or session.time
+        duration = changes.duration or session.duration
+        starts_at = parse_session_start(date, time)
+        ends_at = session_end(starts_at, duration)
+        slots[session.id] = (starts_at, ends_at)
+        updates.append({
+            "id": session.id,
+            "date": date,
+            "time": time,
+            "duration": duration,
+            "credits_amount": get_credits_for_duration(duration),
+            "starts_at": starts_at,
+            "ends_at": ends_at,
+        })
+    
+    # Pending occurrences too, so they can't be moved onto a slot that is already taken
+    _ensure_series_free(db, open_sessions, slots)
+    
+    # Bulk UPDATE by primary key: a single executemany for the whole series
+    db.execute(update(DBSession), updates)
+    db.commit()
+    first = open_sessions[0]
+    invalidate_session_summary(first.user_id, first.participant_id)
+    bump_versions([first.user_id, first.participant_id], "sessions")
+    invalidate_busy_intervals(first.user_id, first.participant_id)
+    series_sessions = db.query(DBSession).filter(DBSession.series_id == series_id).order_by(DBSession.starts_at).all()
+    sync_session_reminders(*series_sessions)
+    return series_sessions
+
+
 @router.post("/{session_id}/accept", response_model=SessionResponse)
 async def accept_session(
     session_id: UUID,
@@ -188,9 +629,18 @@ async def accept_session(
                 detail=f"Insufficient credits. You need {session.credits_amount} credits but have {current_user.credits}"
             )
     
+    ensure_no_conflict(
+        db, [session.user_id, session.participant_id],
+        session.date, session.time, session.duration, exclude_session_id=session.id
+    )
+    
     session.status = SessionStatus.scheduled
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions")
+    invalidate_busy_intervals(session.user_id, session.participant_id)
+    sync_session_reminders(session)
     return session
 
 
@@ -216,6 +666,8 @@ async def reject_session(
     session.status = SessionStatus.rejected
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions")
     return session
 
 
@@ -244,12 +696,18 @@ async def cancel_session(
     session.status = SessionStatus.cancelled
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions")
+    invalidate_busy_intervals(session.user_id, session.participant_id)
+    sync_session_reminders(session)
     return session
 
 
 @router.post("/{session_id}/complete", response_model=SessionResponse)
 async def complete_session(
     session_id: UUID,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=idempotency.IDEMPOTENCY_HEADER),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -257,7 +715,12 @@ async def complete_session(
     Complete a session and transfer credits.
     - Learner pays credits
     - Teacher receives credits
+    Retries with the same Idempotency-Key replay the first successful response.
     """
+    guard = idempotency.claim(db, current_user.id, idempotency_key, request)
+    if guard.replay:
+        return guard.replay
+    
     session = db.query(DBSession).filter(
         DBSession.id == session_id,
         or_(
@@ -284,55 +747,58 @@ async def complete_session(
         teacher_id = session.participant_id
         learner_id = session.user_id
     
-    teacher = db.query(User).filter(User.id == teacher_id).first()
-    learner = db.query(User).filter(User.id == learner_id).first()
+    # Claim the session atomically so two concurrent completions can't both pay out
+    claimed = db.execute(
+        update(DBSession).where(
+            DBSession.id == session.id,
+            DBSession.status == SessionStatus.scheduled
+        ).values(status=SessionStatus.completed).execution_options(synchronize_session=False)
+    ).rowcount
     
-    if not teacher or not learner:
+    if not claimed:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Could not find session participants"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found or not in scheduled status"
         )
     
     credits_amount = session.credits_amount
     
-    # Check if learner has enough credits
-    if learner.credits < credits_amount:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Learner has insufficient credits. Need {credits_amount}, have {learner.credits}"
-        )
-    
     # Transfer credits: deduct from learner, add to teacher
-    learner.credits -= credits_amount
-    teacher.credits += credits_amount
-    
-    # Create transaction for learner (spent)
-    learner_transaction = CreditTransaction(
-        user_id=learner_id,
-        session_id=session.id,
-        amount=-credits_amount,
-        transaction_type="session_payment",
-        description=f"Paid for learning session: {session.title} ({session.duration} min)",
-        balance_after=learner.credits
-    )
-    db.add(learner_transaction)
-    
-    # Create transaction for teacher (earned)
-    teacher_transaction = CreditTransaction(
-        user_id=teacher_id,
-        session_id=session.id,
-        amount=credits_amount,
-        transaction_type="session_earned",
-        description=f"Earned from teaching session: {session.title} ({session.duration} min)",
-        balance_after=teacher.credits
-    )
-    db.add(teacher_transaction)
-    
-    # Mark session as completed
-    session.status = SessionStatus.completed
+    if credits_amount > 0:
+        try:
+            credit_ledger.transfer(
+                db,
+                from_user_id=learner_id,
+                to_user_id=teacher_id,
+                amount=credits_amount,
+                debit_type="session_payment",
+                credit_type="session_earned",
+                debit_description=f"Paid for learning session: {session.title} ({session.duration} min)",
+                credit_description=f"Earned from teaching session: {session.title} ({session.duration} min)",
+                session_id=session.id
+            )
+        except credit_ledger.InsufficientCreditsError as error:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Learner has insufficient credits. Need {credits_amount}, have {error.available}"
+            )
+        except credit_ledger.UnknownAccountError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Could not find session participants"
+            )
     
+    db.refresh(session)
+    guard.save(SessionResponse.model_validate(session))
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions", "credits")
+    invalidate_busy_intervals(session.user_id, session.participant_id)
+    sync_session_reminders(session)
     return session
 
 
@@ -360,11 +826,27 @@ async def update_session(
     if session_update.duration and session_update.duration != session.duration:
         session.credits_amount = get_credits_for_duration(session_update.duration)
     
-    for field, value in session_update.dict(exclude_unset=True).items():
+    changes = session_update.dict(exclude_unset=True)
+    new_status = changes.get("status", session.status)
+    reschedules = any(field in changes for field in ("date", "time", "duration"))
+    if new_status == SessionStatus.scheduled and (reschedules or session.status != SessionStatus.scheduled):
+        ensure_no_conflict(
+            db, [session.user_id, session.participant_id],
+            changes.get("date", session.date),
+            changes.get("time", session.time),
+            changes.get("duration", session.duration),
+            exclude_session_id=session.id
+        )
+    
+    for field, value in changes.items():
         setattr(session, field, value)
     
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions")
+    invalidate_busy_intervals(session.user_id, session.participant_id)
+    sync_session_reminders(session)
     return session
 
 
@@ -397,33 +879,40 @@ async def rate_session(
             detail="Session already rated"
         )
     
-    session.rating = rating_data.rating
-    session.feedback = rating_data.feedback
-    session.rated_by = current_user.id
+    # Conditional write so concurrent ratings of the same session can't both count
+    claimed = db.execute(
+        update(DBSession).where(
+            DBSession.id == session.id,
+            DBSession.rating.is_(None)
+        ).values(
+            rating=rating_data.rating,
+            feedback=rating_data.feedback,
+            rated_by=current_user.id
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    
+    if not claimed:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Session already rated"
+        )
     
-    # Update the rated user's overall rating
+    # Update the rated user's running aggregates in place (User.rating is derived from them)
     rated_user_id = session.participant_id if session.user_id == current_user.id else session.user_id
-    rated_user = db.query(User).filter(User.id == rated_user_id).first()
-    
-    if rated_user:
-        # Get all ratings for this user
-        all_sessions = db.query(DBSession).filter(
-            and_(
-                or_(
-                    DBSession.participant_id == rated_user_id,
-                    DBSession.user_id == rated_user_id
-                ),
-                DBSession.rating.isnot(None),
-                DBSession.rated_by != rated_user_id  # Ratings given TO this user
-            )
-        ).all()
-        
-        all_ratings = [s.rating for s in all_sessions]
-        if all_ratings:
-            rated_user.rating = sum(all_ratings) / len(all_ratings)
+    db.execute(
+        update(User).where(User.id == rated_user_id).values(
+            rating_sum=User.rating_sum + rating_data.rating,
+            rating_count=User.rating_count + 1
+        ).execution_options(synchronize_session=False)
+    )
     
     db.commit()
     db.refresh(session)
+    invalidate_session_summary(session.user_id, session.participant_id)
+    bump_versions([session.user_id, session.participant_id], "sessions")
+    bump_versions([rated_user_id], "profile")
+    invalidate_user_cards(rated_user_id)
     return session
 
 
@@ -446,14 +935,17 @@ async def delete_session(
             detail="Session not found or cannot be deleted"
         )
     
+    participants = (session.user_id, session.participant_id)
     db.delete(session)
     db.commit()
+    invalidate_session_summary(*participants)
+    bump_versions(participants, "sessions")
     return None
 
 
 @router.get("/credit-rates")
 async def get_credit_rates():
-    """Get credit rates for different session durations"""
+    """Get credit rates for different session durations (static, so no ETag)"""
     return {
         "rates": CREDIT_RATES,
         "description": "Credits required/earned per session duration in minutes"
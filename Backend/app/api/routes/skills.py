@@ -1,16 +1,19 @@
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, conditional_get, ensure_modified
 from app.models.database import User, Skill
 from app.schemas.schemas import SkillResponse, SkillCreate
+from app.core.singleflight import single_flight
+from app.services.resource_versions import bump_versions
+from app.services.match_suggestions import invalidate_match_suggestions
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[SkillResponse])
+@router.get("/", response_model=List[SkillResponse], dependencies=[Depends(conditional_get("skills"))])
 async def get_current_user_skills(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -27,6 +30,9 @@ async def create_skill(
     new_skill = Skill(**skill_data.dict(), user_id=current_user.id)
     db.add(new_skill)
     db.commit()
+    bump_versions([current_user.id], "skills")
+    invalidate_match_suggestions(current_user.id)
+    get_skill_categories.invalidate()
     db.refresh(new_skill)
     return new_skill
 
@@ -50,21 +56,29 @@ async def delete_skill(
     
     db.delete(skill)
     db.commit()
+    bump_versions([current_user.id], "skills")
+    invalidate_match_suggestions(current_user.id)
+    get_skill_categories.invalidate()
     return None
 
 
 @router.get("/user/{user_id}", response_model=List[SkillResponse])
 async def get_user_skills(
     user_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    ensure_modified(request, response, user_id, ["skills"])
     skills = db.query(Skill).filter(Skill.user_id == user_id).all()
     return skills
 
 
+# Same for every user: one DISTINCT over all skills per worker and minute, shared by concurrent callers
 @router.get("/categories", response_model=List[str])
-async def get_skill_categories(
+@single_flight(key=lambda **_: "categories", ttl=60)
+def get_skill_categories(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
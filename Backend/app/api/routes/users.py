@@ -1,16 +1,19 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, conditional_get, ensure_modified
+from app.core.pagination import paginate
 from app.models.database import User
 from app.schemas.schemas import UserResponse, UserUpdate, UserCreate
+from app.services.user_cards import invalidate_user_cards
+from app.services.resource_versions import bump_versions
 
 router = APIRouter()
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(conditional_get("profile", "credits"))])
 async def get_current_user_profile(
     current_user: User = Depends(get_current_user)
 ):
@@ -28,15 +31,20 @@ async def update_current_user_profile(
     
     db.commit()
     db.refresh(current_user)
+    invalidate_user_cards(current_user.id)
+    bump_versions([current_user.id], "profile")
     return current_user
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    ensure_modified(request, response, user_id, ["profile", "credits"])
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
@@ -48,13 +56,21 @@ async def get_user_by_id(
 
 @router.get("/", response_model=List[UserResponse])
 async def get_all_users(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    """
+    Oldest first. Pass X-Next-Cursor back as `cursor` for the next page; `skip` is kept for older clients.
+    No ETag: the page changes whenever any listed user does, which no per-user version tracks.
+    """
+    return paginate(
+        db.query(User), User.created_at, User.id,
+        cursor, limit, response, descending=False, skip=skip
+    )
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,139 @@
+"""
+Response compression middleware.
+
+Responses are compressed with brotli (if enabled and installed) or gzip, whichever
+the client accepts, when all of these hold:
+
+- the body is at least COMPRESSION_MIN_SIZE bytes; below that the framing
+  overhead and CPU cost outweigh the savings
+- the content type matches COMPRESSION_CONTENT_TYPES (entries ending in "/"
+  match every subtype, e.g. "text/")
+- the response is not already encoded and is not a 204/304
+
+WebSocket traffic is passed through untouched, and so is any response sent in
+more than one body chunk (StreamingResponse, including the CSV/NDJSON exports):
+those are flushed to the client as they are produced and buffering them to
+compress would defeat that. A strong ETag on a compressed response is
+weakened, since the bytes on the wire no longer match the identity encoding.
+"""
+import gzip
+from typing import List, Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings from an Accept-Encoding header, dropping any with q=0"""
+    accepted = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Sequence[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli: bool = False,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._brotli = None
+        if brotli:
+            try:
+                import brotli as brotli_module
+            except ImportError as exc:
+                raise RuntimeError("COMPRESSION_BROTLI=true requires the 'brotli' package") from exc
+            self._brotli = brotli_module
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if self._brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return self._brotli.compress(body, quality=self.brotli_quality)
+        return gzip_compress(body, self.gzip_level)
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return any(
+            content_type.startswith(allowed) if allowed.endswith("/") else content_type == allowed
+            for allowed in self.content_types
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if status_code < 200 or status_code in (204, 304) or not self._compressible(Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether this is a streaming response
+                    start = message
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.compress(body, encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
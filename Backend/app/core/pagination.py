@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination.
+
+List endpoints order by a unique (sort column, id) key and hand back an opaque
+cursor for the last row of the page. The next page filters on the key instead of
+using OFFSET, so every page costs the same regardless of depth. The cursor is
+returned in the X-Next-Cursor response header so list response bodies keep
+their shape; it is absent on the last page.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: UUID) -> str:
+    payload = [sort_value.isoformat() if sort_value is not None else None, str(row_id)]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None, UUID(row_id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _after(sort_column, id_column, sort_value, row_id, descending: bool):
+    """Rows strictly after (sort_value, row_id); NULL sort values come last in both directions"""
+    if sort_value is None:
+        return and_(sort_column.is_(None), id_column < row_id if descending else id_column > row_id)
+    key = tuple_(sort_column, id_column)
+    after = key < tuple_(sort_value, row_id) if descending else key > tuple_(sort_value, row_id)
+    return or_(after, sort_column.is_(None))
+
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    response: Optional[Response] = None,
+    descending: bool = True,
+    skip: int = 0
+) -> List[Any]:
+    """
+    Apply keyset ordering/filtering to `query` and return one page of rows.
+    If `response` is given, the next cursor is set as a header when more rows exist.
+    `skip` is a legacy OFFSET for older clients and is ignored when a cursor is given.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(_after(sort_column, id_column, sort_value, row_id, descending))
+
+    if descending:
+        order = [sort_column.desc().nulls_last(), id_column.desc()]
+    else:
+        order = [sort_column.asc().nulls_last(), id_column.asc()]
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(*order)
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+
+    if response is not None and len(rows) > limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return page
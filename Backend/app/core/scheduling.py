@@ -0,0 +1,56 @@
+"""
+Helpers for turning the session `date`/`time` strings into real timestamps.
+
+Clients send the local date ("YYYY-MM-DD") and time ("HH:MM") picked in the UI;
+they are interpreted in the configured SESSION_TIMEZONE and stored as UTC-aware
+datetimes in Session.starts_at / Session.ends_at.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+from config import get_settings
+
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p")
+
+
+def _parse_date(value: str):
+    # ISO only: "03/04/2026" could be either March or April, so it is left unparsed rather than guessed
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return None
+
+
+def _parse_time(value: str):
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value.upper(), fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def shift_session_date(date_value: str, days: int) -> Optional[str]:
+    """The session date `days` later, as "YYYY-MM-DD", or None if unparsable"""
+    day = _parse_date(date_value.strip()) if date_value else None
+    if day is None:
+        return None
+    return (day + timedelta(days=days)).isoformat()
+
+
+def parse_session_start(date_value: Optional[str], time_value: Optional[str]) -> Optional[datetime]:
+    """Combine a session's date and time strings into a UTC datetime, or None if unparsable"""
+    if not date_value or not time_value:
+        return None
+    day = _parse_date(date_value.strip())
+    clock = _parse_time(time_value.strip())
+    if day is None or clock is None:
+        return None
+    local = datetime.combine(day, clock, tzinfo=ZoneInfo(get_settings().session_timezone))
+    return local.astimezone(timezone.utc)
+
+
+def session_end(starts_at: Optional[datetime], duration: Optional[int]) -> Optional[datetime]:
+    if starts_at is None or duration is None:
+        return None
+    return starts_at + timedelta(minutes=duration)
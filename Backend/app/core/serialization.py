@@ -0,0 +1,48 @@
+"""
+Fast JSON responses.
+
+FastJSONResponse is the app's default response class: orjson instead of the
+stdlib encoder for everything a route returns through its response_model.
+
+Hot list endpoints go one step further and skip the ORM and Pydantic entirely:
+they select just the columns their response_model exposes, and rows_response
+hands the row mappings straight to orjson, which encodes UUIDs, datetimes and
+enums natively. The route keeps its response_model for the OpenAPI docs; the
+rows must already have that shape since nothing validates them.
+"""
+from typing import Any, Iterable, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+# Headers of the injected Response that describe its own (empty) body
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that writes UTC datetimes with a Z suffix, the same as Pydantic"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def row_dicts(rows: Iterable[Any]) -> list:
+    """Plain dicts from column-selected rows, keyed by column name"""
+    return [dict(row._mapping) for row in rows]
+
+
+def rows_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Serialize `content` (rows or already-built dicts) without going through the response_model.
+    Headers set on the route's injected `response` (e.g. X-Next-Cursor) are carried over,
+    since FastAPI only merges them into responses it builds itself.
+    """
+    if isinstance(content, list) and content and hasattr(content[0], "_mapping"):
+        content = row_dicts(content)
+    result = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        result.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers
+            if name.decode("latin-1") not in _BODY_HEADERS
+        )
+    return result
@@ -0,0 +1,189 @@
+"""
+Single-flight coalescing for expensive reads.
+
+@single_flight(key=..., ttl=...) wraps a function so that concurrent calls with
+the same key share one execution: the first caller runs it, and callers that
+arrive while it is running wait for its result (or its exception) instead of
+repeating the work. With ttl > 0 a successful result is also kept per key for
+that many seconds, so calls arriving just after it finished are answered from
+memory; invalidate(*keys) drops them early, and a call that is in flight while
+its key is invalidated is shared with its waiters but not cached.
+
+Plain functions are coalesced across threads, e.g. `def` routes, which FastAPI
+runs in its threadpool. Coroutine functions are coalesced within one event
+loop; an `async def` route that does blocking database work never yields, so
+nothing can overlap with it, and such routes should be `def` instead. Results
+are shared between callers: treat them as read-only.
+
+Coalescing, caches and counters are per worker process; counters are exposed
+at /api/metrics/single-flight.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+from app.core.cache import TTLCache
+
+_MISSING = object()
+
+
+def _default_key(*args, **kwargs) -> Hashable:
+    return args, tuple(sorted(kwargs.items()))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.task: Optional[asyncio.Future] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cacheable = True
+
+
+class SingleFlight:
+    def __init__(self, name: str, ttl: float = 0, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize) if ttl > 0 else None
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.errors = 0
+
+    def _join(self, key: Hashable):
+        """(cached value, None, False) on a cache hit, else (_MISSING, call, is_leader)"""
+        with self._lock:
+            self.calls += 1
+            if self._cache is not None:
+                value = self._cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    self.cache_hits += 1
+                    return value, None, False
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return _MISSING, call, False
+            call = self._calls[key] = _Call()
+            self.executions += 1
+            return _MISSING, call, True
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if call.error is not None:
+                self.errors += 1
+            elif self._cache is not None and call.cacheable:
+                self._cache.set(key, call.result)
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        value, call, leader = self._join(key)
+        if call is None:
+            return value
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def _lead(self, key: Hashable, call: _Call, fn: Callable, args, kwargs) -> Any:
+        try:
+            call.result = await fn(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        value, call, leader = self._join(key)
+        if call is None:
+            return value
+        if leader:
+            call.task = asyncio.ensure_future(self._lead(key, call, fn, args, kwargs))
+        # Shielded so that one cancelled caller doesn't cancel the work the others wait on
+        return await asyncio.shield(call.task)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop cached results for `keys`, or for every key if none are given"""
+        with self._lock:
+            if not keys:
+                if self._cache is not None:
+                    self._cache.clear()
+                for call in self._calls.values():
+                    call.cacheable = False
+                return
+            for key in keys:
+                if self._cache is not None:
+                    self._cache.delete(key)
+                call = self._calls.get(key)
+                if call is not None:
+                    call.cacheable = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "cache_hits": self.cache_hits,
+                "errors": self.errors,
+                "in_flight": len(self._calls),
+                "cached_keys": len(self._cache) if self._cache is not None else 0,
+                "saved_ratio": round(1 - self.executions / self.calls, 4) if self.calls else 0.0,
+            }
+
+
+_flights: Dict[str, SingleFlight] = {}
+
+
+def single_flight(
+    key: Optional[Callable[..., Hashable]] = None,
+    ttl: float = 0,
+    maxsize: int = 1024,
+    name: Optional[str] = None
+):
+    """
+    Coalesce concurrent calls that map to the same key. `key` is called with the
+    call's arguments (routes are called with keyword arguments only); by default
+    the key is (args, sorted kwargs items), which must be hashable. The wrapper's
+    invalidate() takes keys in the same form.
+    """
+    make_key = key or _default_key
+
+    def decorate(fn: Callable) -> Callable:
+        flight = SingleFlight(name or f"{fn.__module__}.{fn.__qualname__}", ttl=ttl, maxsize=maxsize)
+        _flights[flight.name] = flight
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await flight.do_async(make_key(*args, **kwargs), fn, *args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                return flight.do(make_key(*args, **kwargs), fn, *args, **kwargs)
+
+        wrapper.flight = flight
+        wrapper.invalidate = flight.invalidate
+        return wrapper
+
+    return decorate
+
+
+def metrics_snapshot() -> Dict[str, dict]:
+    return {name: flight.snapshot() for name, flight in _flights.items()}
@@ -1,10 +1,12 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, Enum, ForeignKey, JSON, Text, CheckConstraint, UniqueConstraint, Index
+from sqlalchemy import Column, String, Integer, Float, DateTime, Enum, ForeignKey, JSON, Text, CheckConstraint, UniqueConstraint, Index, case, event, text, Date, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.core.scheduling import parse_session_start, session_end
 
 
 class SkillLevel(enum.Enum):
@@ -22,6 +24,7 @@ class MatchStatus(enum.Enum):
     pending = "pending"
     accepted = "accepted"
     rejected = "rejected"
+    expired = "expired"      # Never answered, closed by the expiry sweeper
 
 
 class SessionStatus(enum.Enum):
@@ -30,6 +33,7 @@ class SessionStatus(enum.Enum):
     completed = "completed"  # Session completed
     cancelled = "cancelled"  # Session cancelled
     rejected = "rejected"    # Session request rejected
+    expired = "expired"      # Still pending when its start time passed
 
 
 class SessionType(enum.Enum):
@@ -37,6 +41,11 @@ class SessionType(enum.Enum):
     learning = "learning"
 
 
+def canonical_pair(user_a, user_b):
+    """Order two user ids so a pair maps to the same (low, high) key in either direction"""
+    return (user_a, user_b) if user_a <= user_b else (user_b, user_a)
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -48,7 +57,9 @@ class User(Base):
     avatar = Column(String(500), nullable=True)
     availability = Column(JSON, nullable=True)
     credits = Column(Integer, default=0)
-    rating = Column(Float, nullable=True)
+    # Running rating aggregates, updated atomically in rate_session
+    rating_sum = Column(Float, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -58,6 +69,22 @@ class User(Base):
     matches_received = relationship("Match", foreign_keys="Match.user_id", back_populates="user")
     matches_given = relationship("Match", foreign_keys="Match.matched_user_id", back_populates="matched_user")
     credit_transactions = relationship("CreditTransaction", back_populates="user", cascade="all, delete-orphan")
+    
+    @hybrid_property
+    def rating(self):
+        """Average rating received, None until the first rating"""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+    
+    @rating.inplace.expression
+    @classmethod
+    def _rating_expression(cls):
+        return case((cls.rating_count > 0, cls.rating_sum / cls.rating_count), else_=None)
+    
+    __table_args__ = (
+        Index('ix_users_created_id', 'created_at', 'id'),
+    )
 
 
 class Skill(Base):
@@ -90,6 +117,9 @@ class Match(Base):
     match_score = Column(Float, nullable=False)
     common_skills = Column(JSON, nullable=False)
     status = Column(Enum(MatchStatus), default=MatchStatus.pending, nullable=False)
+    # Canonical (least, greatest) user pair - one match per pair regardless of direction
+    user_low_id = Column(UUID(as_uuid=True), nullable=False)
+    user_high_id = Column(UUID(as_uuid=True), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -98,6 +128,9 @@ class Match(Base):
     
     __table_args__ = (
         UniqueConstraint('user_id', 'matched_user_id', name='uq_match_users'),
+        Index('uq_matches_user_pair', 'user_low_id', 'user_high_id', unique=True),
+        Index('ix_matches_pending_created', 'created_at', postgresql_where=text("status = 'pending'")),
+        Index('ix_matches_created_at', 'created_at'),
         CheckConstraint('user_id != matched_user_id', name='ck_match_different_users'),
         CheckConstraint('match_score >= 0 AND match_score <= 100', name='ck_match_score_range'),
     )
@@ -115,9 +148,14 @@ class Session(Base):
     date = Column(String(50), nullable=False)
     time = Column(String(10), nullable=False)
     duration = Column(Integer, nullable=False)  # Duration in minutes: 15, 30, 60
+    # Derived from date/time/duration on every flush, see _sync_session_schedule
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    ends_at = Column(DateTime(timezone=True), nullable=True)
     credits_amount = Column(Integer, nullable=False, default=0)  # Credits for this session
     status = Column(Enum(SessionStatus), default=SessionStatus.pending, nullable=False)
     type = Column(Enum(SessionType), nullable=False)
+    # Shared by every occurrence of a recurring series, NULL for one-off sessions
+    series_id = Column(UUID(as_uuid=True), nullable=True)
     
     # Rating fields
     rating = Column(Float, nullable=True)
@@ -135,10 +173,26 @@ class Session(Base):
         Index('ix_sessions_user_id', 'user_id'),
         Index('ix_sessions_date', 'date'),
         Index('ix_sessions_status', 'status'),
+        Index('ix_sessions_user_status_starts', 'user_id', 'status', 'starts_at'),
+        Index('ix_sessions_participant_status_starts', 'participant_id', 'status', 'starts_at'),
+        Index('ix_sessions_user_created_id', 'user_id', 'created_at', 'id'),
+        Index('ix_sessions_participant_created_id', 'participant_id', 'created_at', 'id'),
+        Index('ix_sessions_series_id', 'series_id'),
+        Index('ix_sessions_pending_starts', 'starts_at', postgresql_where=text("status = 'pending'")),
+        Index('ix_sessions_status_starts', 'status', 'starts_at'),
+        Index('ix_sessions_updated_at', 'updated_at'),
         CheckConstraint('rating IS NULL OR (rating >= 0 AND rating <= 5)', name='ck_rating_range'),
     )
 
 
+@event.listens_for(Session, "before_insert")
+@event.listens_for(Session, "before_update")
+def _sync_session_schedule(mapper, connection, target):
+    """Keep starts_at/ends_at in step with the date, time and duration strings"""
+    target.starts_at = parse_session_start(target.date, target.time)
+    target.ends_at = session_end(target.starts_at, target.duration)
+
+
 class CreditTransaction(Base):
     __tablename__ = "credit_transactions"
     
@@ -157,4 +211,59 @@ class CreditTransaction(Base):
     __table_args__ = (
         Index('ix_credit_transactions_user_id', 'user_id'),
         Index('ix_credit_transactions_created_at', 'created_at'),
+        Index('ix_credit_transactions_user_created_id', 'user_id', 'created_at', 'id'),
+    )
+
+
+class IdempotencyKey(Base):
+    """Stored result of a mutation made with an Idempotency-Key header, replayed for retries"""
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    # sha256 of method, path and body, so a key can't be reused for a different request
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_key'),
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+
+class CreditCheckpoint(Base):
+    """Verified ledger position per user: balance after last_transaction_id, see credit_reconciliation"""
+    __tablename__ = "credit_checkpoints"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    balance = Column(Integer, nullable=False)
+    last_transaction_id = Column(UUID(as_uuid=True), nullable=True)
+    last_transaction_at = Column(DateTime, nullable=True)
+    verified_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DailyRollup(Base):
+    """Pre-aggregated platform stat for one UTC day, filled by app/services/rollups.py"""
+    __tablename__ = "daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_daily_rollups_category_day', 'category', 'day'),
     )
+
+
+class RollupWatermark(Base):
+    """Rows of `source` created before `processed_until` are already in daily_rollups"""
+    __tablename__ = "rollup_watermarks"
+    
+    source = Column(String(50), primary_key=True)
+    processed_until = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
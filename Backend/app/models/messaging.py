@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Index
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -13,6 +13,9 @@ class Conversation(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user1_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user2_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Canonical (least, greatest) user pair - one conversation per pair
+    user_low_id = Column(UUID(as_uuid=True), nullable=False)
+    user_high_id = Column(UUID(as_uuid=True), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -25,6 +28,7 @@ class Conversation(Base):
         Index('ix_conversations_user1_id', 'user1_id'),
         Index('ix_conversations_user2_id', 'user2_id'),
         Index('ix_conversations_updated_at', 'updated_at'),
+        Index('uq_conversations_user_pair', 'user_low_id', 'user_high_id', unique=True),
     )
 
 
@@ -37,7 +41,8 @@ class Message(Base):
     sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Partition key on Postgres (monthly range partitions), see app/services/message_partitions.py
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
@@ -47,4 +52,22 @@ class Message(Base):
         Index('ix_messages_conversation_id', 'conversation_id'),
         Index('ix_messages_sender_id', 'sender_id'),
         Index('ix_messages_created_at', 'created_at'),
+        Index('ix_messages_conversation_created', 'conversation_id', 'created_at'),
+    )
+
+
+class ConversationRead(Base):
+    """Per-participant read watermark for a conversation"""
+    __tablename__ = "conversation_reads"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # No FK: messages is partitioned and its rows may be archived
+    last_read_message_id = Column(UUID(as_uuid=True), nullable=True)
+    last_read_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('conversation_id', 'user_id', name='uq_conversation_reads_participant'),
     )
@@ -25,6 +25,10 @@ class MessageWithSender(MessageResponse):
     sender_avatar: Optional[str] = None
 
 
+class MessageSearchResult(MessageResponse):
+    score: float
+
+
 class ConversationParticipant(BaseModel):
     id: UUID
     name: str
@@ -55,3 +59,18 @@ class ConversationWithMessages(ConversationResponse):
 class StartConversationRequest(BaseModel):
     user_id: UUID
     initial_message: Optional[str] = None
+
+
+class MarkReadRequest(BaseModel):
+    up_to_message_id: UUID
+
+
+class ReadReceiptResponse(BaseModel):
+    conversation_id: UUID
+    user_id: UUID
+    last_read_message_id: Optional[UUID] = None
+    last_read_at: datetime
+    marked_count: int = 0
+    
+    class Config:
+        from_attributes = True
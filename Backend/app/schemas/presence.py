@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class HeartbeatRequest(BaseModel):
+    conversation_id: Optional[UUID] = None
+    typing: bool = False
+
+
+class HeartbeatResponse(BaseModel):
+    user_id: UUID
+    last_seen: datetime
+
+
+class UserPresence(BaseModel):
+    user_id: UUID
+    online: bool
+    last_seen: Optional[datetime] = None
+    conversation_id: Optional[UUID] = None
+    typing: bool = False
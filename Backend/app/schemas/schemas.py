@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Dict, Literal, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field
 from app.models.database import SkillLevel, SkillType, MatchStatus, SessionStatus, SessionType
@@ -92,6 +92,22 @@ class SessionCreate(SessionBase):
     pass
 
 
+class RecurrenceRule(BaseModel):
+    frequency: Literal["daily", "weekly"] = "weekly"
+    interval: int = Field(1, ge=1, le=4)
+    count: int = Field(..., ge=2, le=52)
+
+
+class SessionSeriesCreate(SessionBase):
+    recurrence: RecurrenceRule
+
+
+class SessionSeriesReschedule(BaseModel):
+    time: Optional[str] = None
+    duration: Optional[int] = None
+    shift_days: Optional[int] = Field(None, ge=-365, le=365)
+
+
 class SessionUpdate(BaseModel):
     title: Optional[str] = None
     date: Optional[str] = None
@@ -110,6 +126,9 @@ class SessionResponse(SessionBase):
     user_id: UUID
     status: SessionStatus
     credits_amount: int = 0
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    series_id: Optional[UUID] = None
     rating: Optional[float] = None
     feedback: Optional[str] = None
     rated_by: Optional[UUID] = None
@@ -120,6 +139,42 @@ class SessionResponse(SessionBase):
         from_attributes = True
 
 
+class ProposedSlot(BaseModel):
+    date: str
+    time: str
+    duration: int
+    participant_id: Optional[UUID] = None
+
+
+class ConflictCheckRequest(BaseModel):
+    slots: List[ProposedSlot] = Field(..., max_length=100)
+
+
+class SlotConflictResponse(BaseModel):
+    date: str
+    time: str
+    duration: int
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    conflicting_session_ids: List[UUID]
+
+
+class WeekdayActivity(BaseModel):
+    day: str
+    sessions: int
+
+
+class SessionSummaryResponse(BaseModel):
+    counts_by_status: Dict[str, int]
+    counts_by_type: Dict[str, int]
+    total_sessions: int
+    completed_minutes: int
+    rated_sessions: int
+    credits_earned: int
+    credits_spent: int
+    weekly_activity: List[WeekdayActivity]
+
+
 class CreditTransactionBase(BaseModel):
     amount: int
     transaction_type: str
@@ -141,6 +196,41 @@ class CreditTransactionResponse(CreditTransactionBase):
         from_attributes = True
 
 
+class CreditLedgerSummaryResponse(BaseModel):
+    balance: int
+    stored_balance: int
+    consistent: bool
+    checkpoint_balance: Optional[int] = None
+    checkpoint_transaction_id: Optional[UUID] = None
+    checkpoint_at: Optional[datetime] = None
+    transactions_since_checkpoint: int
+
+
 class CreditBalanceResponse(BaseModel):
     user_id: UUID
     credits: int
+
+
+class DailyRollupResponse(BaseModel):
+    day: date
+    category: str
+    value: int
+    
+    class Config:
+        from_attributes = True
+
+
+class RollupRunResponse(BaseModel):
+    windows_processed: Dict[str, int]
+
+
+class BootstrapResponse(BaseModel):
+    user: UserResponse
+    skills: List[SkillResponse]
+    matches: List[MatchResponse]
+    sessions: List[SessionResponse]
+    sessions_next_cursor: Optional[str] = None
+    credits: CreditBalanceResponse
+    unread_count: int
+    # Per-section milliseconds, only in debug mode
+    timings_ms: Optional[Dict[str, float]] = None
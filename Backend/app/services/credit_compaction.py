@@ -0,0 +1,184 @@
+"""
+Retention compaction for `credit_transactions`.
+
+For every month older than CREDIT_HOT_MONTHS, each user's raw transactions are
+written to a gzipped CSV archive and replaced by at most two summary rows:
+
+- `monthly_credit_summary`: the month's total credits, dated at the month's first transaction
+- `monthly_debit_summary`: the month's total debits, dated at its last transaction
+
+balance_after on the debit row is the last raw row's balance_after, so the
+ledger chain (previous balance + amount = balance_after) continues unbroken
+into the next month, and earned/spent totals stay correct. Reconciliation
+checkpoints that pointed inside a compacted month are moved onto its summary.
+
+Users are processed in batches, one transaction and one archive file per batch.
+The archive is written and fsynced before the delete commits; if the commit
+fails the rows stay in the table and the next run archives them again.
+"""
+import csv
+import gzip
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.models.database import CreditTransaction, CreditCheckpoint
+from app.services.message_partitions import add_months, month_start
+from app.services.resource_versions import bump_versions
+
+CREDIT_SUMMARY_TYPE = "monthly_credit_summary"
+DEBIT_SUMMARY_TYPE = "monthly_debit_summary"
+SUMMARY_TYPES = (CREDIT_SUMMARY_TYPE, DEBIT_SUMMARY_TYPE)
+
+ARCHIVE_COLUMNS = [
+    "id", "user_id", "session_id", "amount", "transaction_type",
+    "description", "balance_after", "created_at",
+]
+
+
+def _month_bounds(month: date):
+    return datetime.combine(month, datetime.min.time()), datetime.combine(add_months(month, 1), datetime.min.time())
+
+
+def _users_to_compact(db: Session, start: datetime, end: datetime, after: Optional[UUID], limit: int) -> List[UUID]:
+    """Users with more than one raw transaction in [start, end), in id order"""
+    query = select(CreditTransaction.user_id).where(
+        CreditTransaction.created_at >= start,
+        CreditTransaction.created_at < end,
+        CreditTransaction.transaction_type.notin_(SUMMARY_TYPES)
+    ).group_by(CreditTransaction.user_id).having(func.count() > 1)
+    if after is not None:
+        query = query.where(CreditTransaction.user_id > after)
+    return list(db.execute(query.order_by(CreditTransaction.user_id).limit(limit)).scalars())
+
+
+def _write_archive(path: str, rows) -> None:
+    with gzip.open(path, "wt", newline="") as archive:
+        writer = csv.writer(archive)
+        writer.writerow(ARCHIVE_COLUMNS)
+        for row in rows:
+            writer.writerow([
+                row.id, row.user_id, row.session_id or "", row.amount, row.transaction_type,
+                row.description or "", row.balance_after, row.created_at.isoformat(),
+            ])
+        archive.flush()
+        os.fsync(archive.fileno())
+
+
+def _summaries(month: date, rows) -> List[dict]:
+    """Summary rows for one user's month; rows are ordered by (created_at, id)"""
+    first, last = rows[0], rows[-1]
+    opening = first.balance_after - first.amount
+    credits = sum(row.amount for row in rows if row.amount > 0)
+    # The two summaries share created_at when the month's first and last rows do, and
+    # readers order by (created_at, id): sorted ids keep the credit summary first
+    credit_id, debit_id = sorted((uuid4(), uuid4()))
+    summaries = []
+    if credits:
+        summaries.append({
+            "id": credit_id,
+            "user_id": first.user_id,
+            "amount": credits,
+            "transaction_type": CREDIT_SUMMARY_TYPE,
+            "description": f"Credits received in {month:%Y-%m} ({len(rows)} transactions compacted)",
+            "balance_after": opening + credits,
+            "created_at": first.created_at,
+        })
+    debits = last.balance_after - (opening + credits)
+    if debits or not summaries:
+        summaries.append({
+            "id": debit_id,
+            "user_id": first.user_id,
+            "amount": debits,
+            "transaction_type": DEBIT_SUMMARY_TYPE,
+            "description": f"Credits spent in {month:%Y-%m} ({len(rows)} transactions compacted)",
+            "balance_after": last.balance_after,
+            "created_at": last.created_at,
+        })
+    return summaries
+
+
+def compact_month(db: Session, month: date, archive_dir: str, batch_size: int = 500) -> Dict[str, int]:
+    """Compact one month for every user. Returns counts of users, rows archived and files written."""
+    start, end = _month_bounds(month)
+    stats = {"users": 0, "rows": 0, "files": 0}
+    last_user = None
+    while True:
+        user_ids = _users_to_compact(db, start, end, last_user, batch_size)
+        if not user_ids:
+            return stats
+
+        rows = db.execute(
+            select(CreditTransaction).where(
+                CreditTransaction.user_id.in_(user_ids),
+                CreditTransaction.created_at >= start,
+                CreditTransaction.created_at < end,
+                CreditTransaction.transaction_type.notin_(SUMMARY_TYPES)
+            ).order_by(CreditTransaction.user_id, CreditTransaction.created_at, CreditTransaction.id)
+        ).scalars().all()
+
+        path = os.path.join(
+            archive_dir, f"credit_transactions_{month:%Y%m}_{datetime.utcnow():%Y%m%dT%H%M%S%f}.csv.gz"
+        )
+        _write_archive(path, rows)
+
+        by_user = defaultdict(list)
+        for row in rows:
+            by_user[row.user_id].append(row)
+        summaries = [summary for user_rows in by_user.values() for summary in _summaries(month, user_rows)]
+
+        db.execute(
+            delete(CreditTransaction).where(CreditTransaction.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(insert(CreditTransaction), summaries)
+
+        # Checkpoints inside the month now point at rows that are gone; move them to the month's end
+        closing = {summary["user_id"]: summary for summary in summaries}
+        for checkpoint in db.query(CreditCheckpoint).filter(
+            CreditCheckpoint.user_id.in_(user_ids),
+            CreditCheckpoint.last_transaction_at >= start,
+            CreditCheckpoint.last_transaction_at < end
+        ):
+            summary = closing[checkpoint.user_id]
+            checkpoint.last_transaction_id = summary["id"]
+            checkpoint.last_transaction_at = summary["created_at"]
+            checkpoint.balance = summary["balance_after"]
+
+        db.commit()
+        bump_versions(by_user, "credits")
+        stats["users"] += len(by_user)
+        stats["rows"] += len(rows)
+        stats["files"] += 1
+        last_user = user_ids[-1]
+
+
+def compact_old_transactions(
+    db: Session,
+    archive_dir: str,
+    hot_months: int,
+    today: Optional[date] = None,
+    batch_size: int = 500
+) -> Dict[date, Dict[str, int]]:
+    """Compact every month that ended more than `hot_months` months ago"""
+    cutoff = add_months(month_start(today or date.today()), -hot_months)
+    oldest = db.execute(
+        select(func.min(CreditTransaction.created_at)).where(
+            CreditTransaction.transaction_type.notin_(SUMMARY_TYPES)
+        )
+    ).scalar()
+    if oldest is None:
+        return {}
+
+    os.makedirs(archive_dir, exist_ok=True)
+    results = {}
+    month = month_start(oldest.date())
+    while month < cutoff:
+        stats = compact_month(db, month, archive_dir, batch_size)
+        if stats["rows"]:
+            results[month] = stats
+        month = add_months(month, 1)
+    return results
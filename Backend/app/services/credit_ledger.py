@@ -0,0 +1,144 @@
+"""
+Credit ledger: every balance change goes through here.
+
+Balances are changed with conditional, atomic UPDATE ... RETURNING statements
+instead of read-modify-write in Python, so concurrent requests can neither lose
+updates nor overdraw an account. Two-party transfers touch the user rows in
+ascending id order so concurrent transfers between the same users can't deadlock.
+
+Functions flush but never commit: callers commit (or roll back on error) so the
+balance change, its CreditTransaction rows and any related state change (e.g. a
+session being completed) land in one transaction.
+"""
+from typing import Optional, Tuple
+from uuid import UUID
+from sqlalchemy import update, func
+from sqlalchemy.orm import Session
+from app.models.database import User, CreditTransaction
+
+
+class InsufficientCreditsError(Exception):
+    def __init__(self, user_id: UUID, required: int, available: Optional[int]):
+        self.user_id = user_id
+        self.required = required
+        self.available = available or 0
+        super().__init__(f"Insufficient credits. Need {required}, have {self.available}")
+
+
+class UnknownAccountError(Exception):
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        super().__init__(f"User not found: {user_id}")
+
+
+def _apply_delta(db: Session, user_id: UUID, delta: int) -> int:
+    """Atomically add `delta` to a balance and return the new balance"""
+    stmt = update(User).where(User.id == user_id)
+    if delta < 0:
+        stmt = stmt.where(func.coalesce(User.credits, 0) >= -delta)
+    stmt = stmt.values(
+        credits=func.coalesce(User.credits, 0) + delta
+    ).returning(User.credits).execution_options(synchronize_session=False)
+
+    balance = db.execute(stmt).scalar_one_or_none()
+    if balance is not None:
+        return balance
+
+    row = db.query(User.credits).filter(User.id == user_id).first()
+    if row is None:
+        raise UnknownAccountError(user_id)
+    raise InsufficientCreditsError(user_id, -delta, row.credits)
+
+
+def _record(
+    db: Session,
+    user_id: UUID,
+    amount: int,
+    balance_after: int,
+    transaction_type: str,
+    description: Optional[str],
+    session_id: Optional[UUID]
+) -> CreditTransaction:
+    transaction = CreditTransaction(
+        user_id=user_id,
+        session_id=session_id,
+        amount=amount,
+        transaction_type=transaction_type,
+        description=description,
+        balance_after=balance_after
+    )
+    db.add(transaction)
+    return transaction
+
+
+def earn(
+    db: Session,
+    user_id: UUID,
+    amount: int,
+    transaction_type: str,
+    description: Optional[str] = None,
+    session_id: Optional[UUID] = None
+) -> CreditTransaction:
+    """Add credits to a user's balance"""
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    balance = _apply_delta(db, user_id, amount)
+    transaction = _record(db, user_id, amount, balance, transaction_type, description, session_id)
+    db.flush()
+    return transaction
+
+
+def spend(
+    db: Session,
+    user_id: UUID,
+    amount: int,
+    transaction_type: str = "spent",
+    description: Optional[str] = None,
+    session_id: Optional[UUID] = None
+) -> CreditTransaction:
+    """Deduct credits, raising InsufficientCreditsError rather than going negative"""
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    balance = _apply_delta(db, user_id, -amount)
+    transaction = _record(db, user_id, -amount, balance, transaction_type, description, session_id)
+    db.flush()
+    return transaction
+
+
+def transfer(
+    db: Session,
+    from_user_id: UUID,
+    to_user_id: UUID,
+    amount: int,
+    debit_type: str,
+    credit_type: str,
+    debit_description: Optional[str] = None,
+    credit_description: Optional[str] = None,
+    session_id: Optional[UUID] = None
+) -> Tuple[CreditTransaction, CreditTransaction]:
+    """
+    Move credits between two users. Returns (debit, credit) transactions.
+    On InsufficientCreditsError the caller must roll back, since the receiving
+    side may already have been updated.
+    """
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    if from_user_id == to_user_id:
+        raise ValueError("Cannot transfer credits to the same user")
+
+    deltas = {from_user_id: -amount, to_user_id: amount}
+    balances = {}
+    # Deterministic lock order: always update the lower user id first
+    for user_id in sorted(deltas):
+        balances[user_id] = _apply_delta(db, user_id, deltas[user_id])
+
+    debit = _record(
+        db, from_user_id, -amount, balances[from_user_id],
+        debit_type, debit_description, session_id
+    )
+    credit = _record(
+        db, to_user_id, amount, balances[to_user_id],
+        credit_type, credit_description, session_id
+    )
+    db.flush()
+    return debit, credit
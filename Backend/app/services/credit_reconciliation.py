@@ -0,0 +1,143 @@
+"""
+Incremental reconciliation of User.credits against the credit ledger.
+
+Each user has a CreditCheckpoint: a balance known to be correct as of one
+transaction (ordered by created_at, id). A run only walks the transactions
+after the checkpoint, checking that every balance_after equals the previous
+balance plus amount, then compares users.credits with checkpoint + delta.
+
+- Transactions newer than SETTLE_DELAY are left for the next run, so a row
+  committed late with an older created_at can't slip behind the checkpoint.
+- The checkpoint only advances up to the last transaction before the first
+  broken link, so a mismatch keeps being reported until it is repaired.
+- With no checkpoint yet, the opening balance is taken from the user's first
+  transaction, since older accounts may not start from zero.
+"""
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from app.models.database import User, CreditTransaction, CreditCheckpoint
+
+SETTLE_DELAY = timedelta(minutes=5)
+
+
+class LedgerMismatch(NamedTuple):
+    user_id: UUID
+    kind: str  # "balance_after" or "user_balance"
+    transaction_id: Optional[UUID]
+    expected: int
+    actual: int
+
+
+class LedgerPosition(NamedTuple):
+    balance: int           # checkpoint balance + amounts since the checkpoint
+    stored_balance: int    # users.credits
+    checkpoint: Optional[CreditCheckpoint]
+    transactions_since_checkpoint: int
+
+
+def _after_checkpoint(checkpoint: Optional[CreditCheckpoint]):
+    if checkpoint is None or checkpoint.last_transaction_id is None:
+        return True
+    return tuple_(CreditTransaction.created_at, CreditTransaction.id) > tuple_(
+        checkpoint.last_transaction_at, checkpoint.last_transaction_id
+    )
+
+
+def _opening_balance(db: Session, user_id: UUID) -> Optional[int]:
+    """Balance before the user's first transaction, or None if they have none"""
+    first = db.query(CreditTransaction.amount, CreditTransaction.balance_after).filter(
+        CreditTransaction.user_id == user_id
+    ).order_by(CreditTransaction.created_at, CreditTransaction.id).first()
+    return None if first is None else first.balance_after - first.amount
+
+
+def ledger_position(db: Session, user_id: UUID) -> LedgerPosition:
+    """Balance from the checkpoint plus one aggregate over the newer transactions"""
+    checkpoint = db.get(CreditCheckpoint, user_id)
+    stored, delta, count = db.execute(
+        select(
+            User.credits,
+            select(func.coalesce(func.sum(CreditTransaction.amount), 0)).where(
+                CreditTransaction.user_id == user_id, _after_checkpoint(checkpoint)
+            ).scalar_subquery(),
+            select(func.count(CreditTransaction.id)).where(
+                CreditTransaction.user_id == user_id, _after_checkpoint(checkpoint)
+            ).scalar_subquery()
+        ).where(User.id == user_id)
+    ).one()
+
+    if checkpoint is not None:
+        base = checkpoint.balance
+    else:
+        opening = _opening_balance(db, user_id)
+        base = opening if opening is not None else (stored or 0)
+    return LedgerPosition(int(base + delta), stored or 0, checkpoint, count)
+
+
+def reconcile_user(db: Session, user_id: UUID, settle_before: Optional[datetime] = None) -> List[LedgerMismatch]:
+    """Verify transactions since the checkpoint and advance it. Flushes; caller commits."""
+    settle_before = settle_before or datetime.utcnow() - SETTLE_DELAY
+    checkpoint = db.get(CreditCheckpoint, user_id)
+    if checkpoint is None:
+        opening = _opening_balance(db, user_id)
+        if opening is None:
+            # No transactions yet: the stored balance is the opening balance
+            opening = db.query(User.credits).filter(User.id == user_id).scalar() or 0
+        checkpoint = CreditCheckpoint(user_id=user_id, balance=opening)
+        db.add(checkpoint)
+    running = checkpoint.balance
+
+    transactions = db.query(
+        CreditTransaction.id, CreditTransaction.created_at, CreditTransaction.amount, CreditTransaction.balance_after
+    ).filter(
+        CreditTransaction.user_id == user_id,
+        CreditTransaction.created_at < settle_before,
+        _after_checkpoint(checkpoint)
+    ).order_by(CreditTransaction.created_at, CreditTransaction.id).yield_per(1000)
+
+    mismatches: List[LedgerMismatch] = []
+    verified: Optional[Tuple[UUID, datetime, int]] = None
+    for transaction in transactions:
+        expected = running + transaction.amount
+        if transaction.balance_after != expected:
+            mismatches.append(LedgerMismatch(
+                user_id, "balance_after", transaction.id, expected, transaction.balance_after
+            ))
+        elif not mismatches:
+            verified = (transaction.id, transaction.created_at, expected)
+        # Resync on the stored value so one bad row is reported once, not cascaded
+        running = transaction.balance_after
+
+    if verified is not None:
+        checkpoint.last_transaction_id, checkpoint.last_transaction_at, checkpoint.balance = verified
+    checkpoint.verified_at = datetime.utcnow()
+    db.flush()
+
+    if not mismatches:
+        position = ledger_position(db, user_id)
+        if position.balance != position.stored_balance:
+            mismatches.append(LedgerMismatch(
+                user_id, "user_balance", None, position.balance, position.stored_balance
+            ))
+    return mismatches
+
+
+def reconcile_all(db: Session, batch_size: int = 500) -> List[LedgerMismatch]:
+    """Reconcile every user, committing checkpoints one batch of users at a time"""
+    settle_before = datetime.utcnow() - SETTLE_DELAY
+    mismatches: List[LedgerMismatch] = []
+    last_id = None
+    while True:
+        query = db.query(User.id)
+        if last_id is not None:
+            query = query.filter(User.id > last_id)
+        user_ids = [row.id for row in query.order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            return mismatches
+        for user_id in user_ids:
+            mismatches.extend(reconcile_user(db, user_id, settle_before))
+        db.commit()
+        last_id = user_ids[-1]
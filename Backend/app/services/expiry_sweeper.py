@@ -0,0 +1,196 @@
+"""
+Background sweeper that expires stale pending rows.
+
+- Pending sessions whose start time has passed -> SessionStatus.expired
+- Pending match requests older than MATCH_REQUEST_TTL_DAYS -> MatchStatus.expired
+- Idempotency keys past their TTL are deleted
+
+Each batch is one set-based UPDATE ... WHERE id IN (SELECT ... LIMIT n) that
+re-checks status = 'pending', committed on its own, so a sweep never holds
+long locks and several workers can sweep at the same time (SKIP LOCKED keeps
+them off each other's rows on Postgres). The sweeper runs in a daemon thread
+per worker process; counters are per process too.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from config import get_settings
+from app.models.database import Session as DBSession, SessionStatus, Match, MatchStatus
+from app.services.session_summary import invalidate_session_summary
+from app.services.idempotency import purge_expired_keys
+from app.services.resource_versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+
+class SweepMetrics:
+    """Thread-safe counters describing what the sweeper has done in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failed_runs = 0
+        self.batches = 0
+        self.sessions_expired = 0
+        self.matches_expired = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_seconds = 0.0
+        self.last_batch_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        self.total_batch_seconds = 0.0
+
+    def record_batch(self, kind: str, rows: int, seconds: float) -> None:
+        with self._lock:
+            self.batches += 1
+            if kind == "sessions":
+                self.sessions_expired += rows
+            else:
+                self.matches_expired += rows
+            self.last_batch_seconds = seconds
+            self.max_batch_seconds = max(self.max_batch_seconds, seconds)
+            self.total_batch_seconds += seconds
+
+    def record_run(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.runs += 1
+            if failed:
+                self.failed_runs += 1
+            self.last_run_at = datetime.now(timezone.utc)
+            self.last_run_seconds = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "failed_runs": self.failed_runs,
+                "batches": self.batches,
+                "sessions_expired": self.sessions_expired,
+                "matches_expired": self.matches_expired,
+                "last_run_at": self.last_run_at,
+                "last_run_seconds": round(self.last_run_seconds, 4),
+                "last_batch_seconds": round(self.last_batch_seconds, 4),
+                "max_batch_seconds": round(self.max_batch_seconds, 4),
+                "avg_batch_seconds": round(self.total_batch_seconds / self.batches, 4) if self.batches else 0.0,
+            }
+
+
+metrics = SweepMetrics()
+
+
+def expire_stale_sessions(db: Session, now: datetime, batch_size: int) -> int:
+    """Expire pending sessions that should already have started. Returns rows expired."""
+    total = 0
+    while True:
+        started = time.perf_counter()
+        stale_ids = select(DBSession.id).where(
+            DBSession.status == SessionStatus.pending,
+            DBSession.starts_at < now
+        ).limit(batch_size).with_for_update(skip_locked=True).scalar_subquery()
+        rows = db.execute(
+            update(DBSession).where(
+                DBSession.id.in_(stale_ids),
+                DBSession.status == SessionStatus.pending
+            ).values(status=SessionStatus.expired, updated_at=datetime.utcnow())
+            .returning(DBSession.user_id, DBSession.participant_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        metrics.record_batch("sessions", len(rows), time.perf_counter() - started)
+
+        affected = {user_id for row in rows for user_id in row}
+        invalidate_session_summary(*affected)
+        bump_versions(affected, "sessions")
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+def expire_stale_matches(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Expire match requests left pending since before `cutoff`. Returns rows expired."""
+    total = 0
+    while True:
+        started = time.perf_counter()
+        stale_ids = select(Match.id).where(
+            Match.status == MatchStatus.pending,
+            Match.created_at < cutoff
+        ).limit(batch_size).with_for_update(skip_locked=True).scalar_subquery()
+        rows = db.execute(
+            update(Match).where(
+                Match.id.in_(stale_ids),
+                Match.status == MatchStatus.pending
+            ).values(status=MatchStatus.expired, updated_at=datetime.utcnow())
+            .returning(Match.user_id, Match.matched_user_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        expired = len(rows)
+        metrics.record_batch("matches", expired, time.perf_counter() - started)
+
+        bump_versions({user_id for row in rows for user_id in row}, "matches")
+        total += expired
+        if expired < batch_size:
+            return total
+
+
+def run_sweep(db: Session) -> dict:
+    """One full sweep over sessions and matches"""
+    settings = get_settings()
+    started = time.perf_counter()
+    try:
+        sessions_expired = expire_stale_sessions(
+            db, datetime.now(timezone.utc), settings.expiry_batch_size
+        )
+        # Match.created_at is stored as naive UTC
+        matches_expired = expire_stale_matches(
+            db, datetime.utcnow() - timedelta(days=settings.match_request_ttl_days), settings.expiry_batch_size
+        )
+        keys_purged = purge_expired_keys(db, settings.expiry_batch_size)
+    except Exception:
+        db.rollback()
+        metrics.record_run(time.perf_counter() - started, failed=True)
+        raise
+    metrics.record_run(time.perf_counter() - started)
+    return {
+        "sessions_expired": sessions_expired,
+        "matches_expired": matches_expired,
+        "idempotency_keys_purged": keys_purged,
+    }
+
+
+class ExpirySweeper:
+    """Runs run_sweep every `interval` seconds in a daemon thread"""
+
+    def __init__(self, session_factory: Callable[[], Session], interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                result = run_sweep(db)
+                if any(result.values()):
+                    logger.info("Expiry sweep: %s", result)
+            except Exception:
+                logger.exception("Expiry sweep failed")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
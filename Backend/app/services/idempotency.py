@@ -0,0 +1,139 @@
+"""
+Idempotency-Key support for mutations that move credits.
+
+The first request with a given (user, key) inserts a claim row inside the same
+transaction as the mutation and stores its response on that row before
+committing. A concurrent duplicate's INSERT waits on the unique index until the
+first transaction finishes: if it committed, the duplicate replays the stored
+response; if it rolled back (e.g. a 400), the duplicate runs normally. Only
+successful responses are ever stored, so failed requests can simply be retried.
+
+Rows expire after IDEMPOTENCY_TTL_HOURS; expired rows are ignored on lookup and
+purged by the expiry sweeper.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID, uuid4
+from fastapi import HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from config import get_settings
+from app.models.database import IdempotencyKey
+from app.core.serialization import FastJSONResponse
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _insert_ignoring_conflict(db: Session, values: dict):
+    return db.execute(
+        postgresql.insert(IdempotencyKey).values(**values)
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.id)
+    ).scalar_one_or_none()
+
+
+def request_fingerprint(request: Request, payload: Optional[BaseModel] = None) -> str:
+    body = payload.model_dump_json() if payload is not None else ""
+    return hashlib.sha256(f"{request.method} {request.url.path}\n{body}".encode()).hexdigest()
+
+
+class IdempotencyGuard:
+    """
+    Result of claiming a key. If `replay` is set, return it instead of running the
+    mutation; otherwise call save() with the response before committing.
+    A guard for a request without a key does nothing.
+    """
+
+    def __init__(self, db: Session, row_id: Optional[UUID] = None, replay: Optional[FastJSONResponse] = None):
+        self.db = db
+        self.row_id = row_id
+        self.replay = replay
+
+    def save(self, response: BaseModel, status_code: int = status.HTTP_200_OK) -> None:
+        if self.row_id is None:
+            return
+        row = self.db.get(IdempotencyKey, self.row_id)
+        row.status_code = status_code
+        row.response_body = json.dumps(jsonable_encoder(response), separators=(",", ":"))
+        self.db.flush()
+
+
+def claim(
+    db: Session,
+    user_id: UUID,
+    key: Optional[str],
+    request: Request,
+    payload: Optional[BaseModel] = None
+) -> IdempotencyGuard:
+    if not key:
+        return IdempotencyGuard(db)
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+        )
+
+    fingerprint = request_fingerprint(request, payload)
+    now = datetime.utcnow()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at <= now
+        )
+    )
+    row_id = _insert_ignoring_conflict(db, {
+        "id": uuid4(),
+        "user_id": user_id,
+        "key": key,
+        "request_hash": fingerprint,
+        "created_at": now,
+        "expires_at": now + timedelta(hours=get_settings().idempotency_ttl_hours),
+    })
+    if row_id is not None:
+        return IdempotencyGuard(db, row_id=row_id)
+
+    # Someone else already committed this key (we waited on the unique index if it was in flight)
+    existing = db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    ).scalar_one()
+    if existing.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+        )
+    if existing.status_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+    # Same response class as the original, so replays are encoded identically
+    return IdempotencyGuard(db, replay=FastJSONResponse(
+        status_code=existing.status_code,
+        content=json.loads(existing.response_body),
+        headers={REPLAYED_HEADER: "true"}
+    ))
+
+
+def purge_expired_keys(db: Session, batch_size: int) -> int:
+    """Delete expired keys in bounded batches. Returns rows deleted."""
+    total = 0
+    while True:
+        expired_ids = select(IdempotencyKey.id).where(
+            IdempotencyKey.expires_at <= datetime.utcnow()
+        ).limit(batch_size).scalar_subquery()
+        deleted = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,106 @@
+"""
+Skill-based match suggestions (GET /api/matches/find).
+
+Computing them walks every other user's skills, so concurrent requests from the
+same user (a double-clicked button, two open tabs) share one computation via
+single_flight, and the result is kept for SUGGESTION_TTL seconds. Creating or
+cancelling a match request and adding or removing a skill invalidate the
+affected users' suggestions; other users' skill changes can lag by up to the TTL.
+"""
+from typing import List
+from uuid import UUID
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.singleflight import single_flight
+from app.models.database import User, Match, Skill, SkillType
+
+SUGGESTION_TTL = 10
+
+
+def invalidate_match_suggestions(*user_ids: UUID) -> None:
+    find_potential_matches.invalidate(*[str(user_id) for user_id in user_ids])
+
+
+@single_flight(key=lambda db, user: str(user.id), ttl=SUGGESTION_TTL, maxsize=10000)
+def find_potential_matches(db: Session, user: User) -> List[dict]:
+    """
+    Up to 20 users whose skills complement `user`'s, best match first.
+    Excludes users who already have a match request (sent or received).
+    """
+    # Get current user's skills
+    user_teaching = db.query(Skill).filter(
+        and_(Skill.user_id == user.id, Skill.type == SkillType.teaching)
+    ).all()
+    user_learning = db.query(Skill).filter(
+        and_(Skill.user_id == user.id, Skill.type == SkillType.learning)
+    ).all()
+    
+    teaching_names = {s.name.lower() for s in user_teaching}
+    learning_names = {s.name.lower() for s in user_learning}
+    
+    # Get all other users
+    other_users = db.query(User).filter(User.id != user.id).all()
+    
+    # Get existing matches (both sent and received) to exclude
+    existing_matches = db.query(Match).filter(
+        or_(
+            Match.user_id == user.id,
+            Match.matched_user_id == user.id
+        )
+    ).all()
+    
+    # Users we already have a connection with (either direction)
+    connected_user_ids = set()
+    for m in existing_matches:
+        connected_user_ids.add(m.user_id)
+        connected_user_ids.add(m.matched_user_id)
+    connected_user_ids.discard(user.id)
+    
+    potential_matches = []
+    
+    for other_user in other_users:
+        if other_user.id in connected_user_ids:
+            continue
+            
+        # Get other user's skills
+        other_teaching = db.query(Skill).filter(
+            and_(Skill.user_id == other_user.id, Skill.type == SkillType.teaching)
+        ).all()
+        other_learning = db.query(Skill).filter(
+            and_(Skill.user_id == other_user.id, Skill.type == SkillType.learning)
+        ).all()
+        
+        other_teaching_names = {s.name.lower() for s in other_teaching}
+        other_learning_names = {s.name.lower() for s in other_learning}
+        
+        # They teach what I want to learn
+        they_teach_i_learn = other_teaching_names & learning_names
+        # I teach what they want to learn
+        i_teach_they_learn = teaching_names & other_learning_names
+        
+        common_skills = list(they_teach_i_learn | i_teach_they_learn)
+        
+        if common_skills:
+            total_possible = len(learning_names) + len(teaching_names)
+            if total_possible > 0:
+                match_score = min(100, (len(common_skills) / total_possible) * 100 * 2)
+            else:
+                match_score = 50
+            
+            potential_matches.append({
+                "user": {
+                    "id": str(other_user.id),
+                    "name": other_user.name,
+                    "email": other_user.email,
+                    "avatar": other_user.avatar,
+                    "bio": other_user.bio,
+                    "rating": other_user.rating,
+                },
+                "match_score": round(match_score, 1),
+                "common_skills": common_skills,
+                "they_can_teach": list(they_teach_i_learn),
+                "they_want_to_learn": list(i_teach_they_learn),
+            })
+    
+    potential_matches.sort(key=lambda x: x["match_score"], reverse=True)
+    return potential_matches[:20]
@@ -0,0 +1,144 @@
+"""
+Monthly range partitions for the `messages` table (Postgres only).
+
+Partitions are named `messages_pYYYYMM` and cover [first of month, first of next month).
+`create_future_partitions` keeps a few months pre-created so inserts never land in the
+default partition; `archive_cold_partitions` detaches old months, dumps them to gzipped
+CSV on local disk and drops them so the hot table and its indexes stay small.
+
+Message reads bound `created_at` from below with `hot_window_start()`, the same
+cutoff the archive job uses, so Postgres prunes the cold partitions instead of
+scanning every month. Messages older than MESSAGE_HOT_MONTHS are not served
+even if they have not been archived yet.
+
+Month boundaries are computed from the UTC date, since created_at is naive UTC.
+"""
+import gzip
+import os
+import re
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from config import get_settings
+
+PARTITION_PREFIX = "messages_p"
+_PARTITION_RE = re.compile(rf"^{PARTITION_PREFIX}(\d{{4}})(\d{{2}})$")
+
+# Real columns only; content_tsv is generated and is rebuilt on restore
+ARCHIVE_COLUMNS = "id, conversation_id, sender_id, content, is_read, created_at"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + (month.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def hot_window_start(today: Optional[date] = None) -> datetime:
+    """Start of the oldest month still attached, i.e. the lower bound for message reads"""
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -get_settings().message_hot_months)
+    return datetime.combine(cutoff, time.min)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """Return (name, month) for every monthly partition currently attached to messages"""
+    rows = conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'messages'
+    """)).all()
+
+    partitions = []
+    for (name,) in rows:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def list_detached_partitions(conn: Connection) -> List[str]:
+    """Monthly tables left detached by an interrupted archive run"""
+    rows = conn.execute(text("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :prefix
+    """), {"prefix": PARTITION_PREFIX + "%"}).all()
+    return sorted(name for (name,) in rows if _PARTITION_RE.match(name))
+
+
+def create_partition(conn: Connection, month: date) -> str:
+    name = partition_name(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF messages "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+def create_future_partitions(engine: Engine, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Ensure partitions exist for the current month and the next `months_ahead` months"""
+    current = month_start(today or datetime.utcnow().date())
+    with engine.begin() as conn:
+        existing = {name for name, _ in list_partitions(conn)}
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(month) not in existing:
+                created.append(create_partition(conn, month))
+    return created
+
+
+def _dump_partition(engine: Engine, name: str, path: str) -> None:
+    tmp_path = path + ".tmp"
+    raw = engine.raw_connection()
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+            cursor = raw.cursor()
+            cursor.copy_expert(f"COPY (SELECT {ARCHIVE_COLUMNS} FROM {name} ORDER BY created_at) TO STDOUT WITH CSV HEADER", archive)
+            cursor.close()
+    finally:
+        raw.close()
+    os.replace(tmp_path, path)
+
+
+def archive_cold_partitions(
+    engine: Engine,
+    archive_dir: str,
+    hot_months: int,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Detach, dump and drop partitions older than `hot_months` months.
+    Returns the archive file paths written. A partition is only dropped once its
+    archive file is complete; if dumping fails it stays detached for a retry.
+    """
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -hot_months)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    with engine.connect() as conn:
+        cold = [name for name, month in list_partitions(conn) if month < cutoff]
+        leftovers = list_detached_partitions(conn)
+
+    archived = []
+    for name in leftovers + cold:
+        if name in cold:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE messages DETACH PARTITION {name}"))
+
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        _dump_partition(engine, name, path)
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {name}"))
+        archived.append(path)
+
+    return archived
@@ -0,0 +1,45 @@
+"""
+Full-text search over chat messages.
+
+Postgres keeps a generated `content_tsv` tsvector column with a GIN index
+(created by migration 66671134dccd), so rows are searchable as soon as they
+are written.
+"""
+from typing import List, Tuple
+from uuid import UUID
+from sqlalchemy import func, desc, or_, literal_column
+from sqlalchemy.orm import Session
+from app.models.messaging import Conversation, Message
+from app.services.message_partitions import hot_window_start
+
+SEARCH_LANGUAGE = "english"
+
+
+def search_messages(
+    db: Session,
+    user_id: UUID,
+    query: str,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Tuple[Message, float]]:
+    """
+    Search messages in the user's conversations, within the hot partitions.
+    Returns (message, score) pairs ordered best match first; higher score is better.
+    """
+    participant_filter = or_(
+        Conversation.user1_id == user_id,
+        Conversation.user2_id == user_id
+    )
+    since = Message.created_at >= hot_window_start()
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+    content_tsv = literal_column("messages.content_tsv")
+    score = func.ts_rank(content_tsv, tsquery).label("score")
+    rows = db.query(Message, score).join(
+        Conversation, Conversation.id == Message.conversation_id
+    ).filter(
+        content_tsv.op("@@")(tsquery),
+        participant_filter,
+        since
+    ).order_by(desc(score), desc(Message.created_at)).offset(skip).limit(limit).all()
+
+    return [(message, float(score)) for message, score in rows]
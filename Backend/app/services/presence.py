@@ -0,0 +1,183 @@
+"""
+Online presence and typing indicators.
+
+State is ephemeral and never touches Postgres: clients send heartbeats, each
+heartbeat extends a TTL, and anything not refreshed simply expires. The default
+store is a per-process dict; set PRESENCE_BACKEND=redis to share state between
+workers (requires the `redis` package).
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Set
+from config import get_settings
+
+
+class PresenceStore(ABC):
+    """Interface for presence backends. All ids are strings."""
+
+    @abstractmethod
+    def touch(self, user_id: str) -> float:
+        """Mark a user online and return the heartbeat timestamp"""
+
+    @abstractmethod
+    def set_typing(self, conversation_id: str, user_id: str, typing: bool) -> None:
+        ...
+
+    @abstractmethod
+    def last_seen(self, user_ids: Iterable[str]) -> Dict[str, float]:
+        """Last heartbeat for each user that is still online; offline users are omitted"""
+
+    @abstractmethod
+    def typing(self, conversation_ids: Iterable[str]) -> Dict[str, Set[str]]:
+        """Users currently typing, per conversation; idle conversations are omitted"""
+
+
+class InMemoryPresenceStore(PresenceStore):
+    # Full sweep of expired entries after this many writes, reads expire lazily
+    PURGE_EVERY = 1000
+
+    def __init__(self, online_ttl: float, typing_ttl: float):
+        self.online_ttl = online_ttl
+        self.typing_ttl = typing_ttl
+        self._lock = threading.Lock()
+        self._online: Dict[str, float] = {}  # user_id -> last heartbeat
+        self._typing: Dict[str, Dict[str, float]] = {}  # conversation_id -> {user_id: expires_at}
+        self._writes = 0
+
+    def _maybe_purge(self, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY:
+            return
+        cutoff = now - self.online_ttl
+        self._online = {uid: seen for uid, seen in self._online.items() if seen > cutoff}
+        for conv_id in list(self._typing):
+            users = {uid: exp for uid, exp in self._typing[conv_id].items() if exp > now}
+            if users:
+                self._typing[conv_id] = users
+            else:
+                del self._typing[conv_id]
+
+    def touch(self, user_id: str) -> float:
+        now = time.time()
+        with self._lock:
+            self._online[user_id] = now
+            self._maybe_purge(now)
+        return now
+
+    def set_typing(self, conversation_id: str, user_id: str, typing: bool) -> None:
+        now = time.time()
+        with self._lock:
+            if typing:
+                self._typing.setdefault(conversation_id, {})[user_id] = now + self.typing_ttl
+            else:
+                users = self._typing.get(conversation_id)
+                if users:
+                    users.pop(user_id, None)
+                    if not users:
+                        del self._typing[conversation_id]
+            self._maybe_purge(now)
+
+    def last_seen(self, user_ids: Iterable[str]) -> Dict[str, float]:
+        cutoff = time.time() - self.online_ttl
+        with self._lock:
+            result = {}
+            for uid in user_ids:
+                seen = self._online.get(uid)
+                if seen is not None and seen > cutoff:
+                    result[uid] = seen
+            return result
+
+    def typing(self, conversation_ids: Iterable[str]) -> Dict[str, Set[str]]:
+        now = time.time()
+        with self._lock:
+            result = {}
+            for conv_id in conversation_ids:
+                users = {uid for uid, exp in self._typing.get(conv_id, {}).items() if exp > now}
+                if users:
+                    result[conv_id] = users
+            return result
+
+
+class RedisPresenceStore(PresenceStore):
+    """
+    Shared presence for multi-worker deployments.
+    Online users are plain keys with an expiry; typing state is a sorted set per
+    conversation scored by expiry time.
+    """
+
+    def __init__(self, url: str, online_ttl: float, typing_ttl: float, prefix: str = "presence"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("PRESENCE_BACKEND=redis requires the 'redis' package") from exc
+        self.client = redis.Redis.from_url(url)
+        self.online_ttl = online_ttl
+        self.typing_ttl = typing_ttl
+        self.prefix = prefix
+
+    def _online_key(self, user_id: str) -> str:
+        return f"{self.prefix}:online:{user_id}"
+
+    def _typing_key(self, conversation_id: str) -> str:
+        return f"{self.prefix}:typing:{conversation_id}"
+
+    def touch(self, user_id: str) -> float:
+        now = time.time()
+        self.client.set(self._online_key(user_id), now, px=int(self.online_ttl * 1000))
+        return now
+
+    def set_typing(self, conversation_id: str, user_id: str, typing: bool) -> None:
+        key = self._typing_key(conversation_id)
+        pipe = self.client.pipeline()
+        if typing:
+            pipe.zadd(key, {user_id: time.time() + self.typing_ttl})
+            pipe.pexpire(key, int(self.typing_ttl * 1000))
+        else:
+            pipe.zrem(key, user_id)
+        pipe.execute()
+
+    def last_seen(self, user_ids: Iterable[str]) -> Dict[str, float]:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        values = self.client.mget([self._online_key(uid) for uid in user_ids])
+        return {uid: float(value) for uid, value in zip(user_ids, values) if value is not None}
+
+    def typing(self, conversation_ids: Iterable[str]) -> Dict[str, Set[str]]:
+        conversation_ids = list(conversation_ids)
+        if not conversation_ids:
+            return {}
+        now = time.time()
+        pipe = self.client.pipeline()
+        for conv_id in conversation_ids:
+            pipe.zrangebyscore(self._typing_key(conv_id), now, "+inf")
+        result = {}
+        for conv_id, members in zip(conversation_ids, pipe.execute()):
+            if members:
+                result[conv_id] = {m.decode() if isinstance(m, bytes) else m for m in members}
+        return result
+
+
+_store: Optional[PresenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_presence_store() -> PresenceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                if settings.presence_backend == "redis":
+                    _store = RedisPresenceStore(
+                        settings.presence_redis_url,
+                        settings.presence_ttl_seconds,
+                        settings.typing_ttl_seconds
+                    )
+                else:
+                    _store = InMemoryPresenceStore(
+                        settings.presence_ttl_seconds,
+                        settings.typing_ttl_seconds
+                    )
+    return _store
@@ -0,0 +1,70 @@
+"""
+Consistency checks for the per-user rating aggregates (User.rating_sum / rating_count).
+
+rate_session keeps the aggregates up to date incrementally; this module recomputes
+them from the rated sessions in a single grouped query so drift can be detected
+and repaired in bulk.
+"""
+from typing import List, NamedTuple
+from uuid import UUID
+from sqlalchemy import select, update, func, case, or_
+from sqlalchemy.orm import Session
+from app.models.database import User, Session as DBSession
+from app.services.resource_versions import bump_versions
+
+
+class RatingMismatch(NamedTuple):
+    user_id: UUID
+    stored_sum: float
+    stored_count: int
+    actual_sum: float
+    actual_count: int
+
+
+def received_ratings_subquery():
+    """(user_id, rating_sum, rating_count) of ratings each user received"""
+    rated_user_id = case(
+        (DBSession.rated_by == DBSession.user_id, DBSession.participant_id),
+        else_=DBSession.user_id
+    ).label("user_id")
+    return select(
+        rated_user_id,
+        func.sum(DBSession.rating).label("rating_sum"),
+        func.count(DBSession.rating).label("rating_count")
+    ).where(
+        DBSession.rating.isnot(None),
+        DBSession.rated_by.isnot(None)
+    ).group_by(rated_user_id).subquery()
+
+
+def find_mismatches(db: Session, tolerance: float = 1e-6) -> List[RatingMismatch]:
+    actual = received_ratings_subquery()
+    actual_sum = func.coalesce(actual.c.rating_sum, 0)
+    actual_count = func.coalesce(actual.c.rating_count, 0)
+
+    rows = db.execute(
+        select(User.id, User.rating_sum, User.rating_count, actual_sum, actual_count)
+        .outerjoin(actual, actual.c.user_id == User.id)
+        .where(or_(
+            User.rating_count != actual_count,
+            func.abs(User.rating_sum - actual_sum) > tolerance
+        ))
+    ).all()
+    return [RatingMismatch(*row) for row in rows]
+
+
+def repair_aggregates(db: Session) -> int:
+    """Recompute aggregates for every user whose stored values drifted. Returns rows fixed."""
+    mismatches = find_mismatches(db)
+    if not mismatches:
+        return 0
+    db.execute(
+        update(User),
+        [
+            {"id": m.user_id, "rating_sum": m.actual_sum, "rating_count": m.actual_count}
+            for m in mismatches
+        ]
+    )
+    db.commit()
+    bump_versions([m.user_id for m in mismatches], "profile")
+    return len(mismatches)
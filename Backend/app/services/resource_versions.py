@@ -0,0 +1,158 @@
+"""
+Per-user resource versions for conditional GETs.
+
+Each (user, resource) pair has a version number that the write paths bump
+after they commit, for every user whose view of that resource changed (both
+participants of a session, match or conversation). GET endpoints turn the
+current versions into an ETag and answer a matching If-None-Match with 304
+before running any query; see conditional_get in app/api/deps.py. Reading the
+versions is one store lookup (one lock, or one MGET on Redis).
+
+Responses also embed details of other users (names, avatars, ratings) and a
+few time-dependent values that no counter tracks, so the ETag additionally
+rolls over every ETAG_MAX_AGE_SECONDS; that is the most such details can lag.
+
+The default store is per process and only correct with a single worker: a
+bump on one worker is invisible to the others, which would keep answering 304.
+Set VERSIONS_BACKEND=redis to share versions between workers (requires the
+`redis` package, and an instance that does not evict keys).
+"""
+import hashlib
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence
+from uuid import UUID
+from config import get_settings
+
+RESOURCES = ("profile", "skills", "matches", "sessions", "credits", "conversations")
+
+
+class VersionStore(ABC):
+    """Interface for version backends. Versions only ever change to a value not handed out before."""
+
+    # Distinguishes ETags issued by different store instances, e.g. before and after a restart
+    epoch: str = ""
+
+    @abstractmethod
+    def get(self, user_id: UUID, resources: Sequence[str]) -> List[int]:
+        ...
+
+    @abstractmethod
+    def bump(self, user_ids: Iterable[UUID], resources: Sequence[str]) -> None:
+        ...
+
+
+class InMemoryVersionStore(VersionStore):
+    """
+    LRU of versions drawn from one process-wide sequence. Missing or evicted
+    keys read as `floor`, which is moved to a fresh sequence value on every
+    eviction, so an evicted key can never read back a version it had before.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self.epoch = f"{time.time_ns():x}"
+        self._seq = itertools.count(1)
+        self._floor = 0
+        self._versions: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID, resources: Sequence[str]) -> List[int]:
+        with self._lock:
+            versions = []
+            for resource in resources:
+                key = (str(user_id), resource)
+                version = self._versions.get(key)
+                if version is None:
+                    version = self._floor
+                else:
+                    self._versions.move_to_end(key)
+                versions.append(version)
+            return versions
+
+    def bump(self, user_ids: Iterable[UUID], resources: Sequence[str]) -> None:
+        with self._lock:
+            for user_id in {str(user_id) for user_id in user_ids if user_id is not None}:
+                for resource in resources:
+                    key = (user_id, resource)
+                    self._versions[key] = next(self._seq)
+                    self._versions.move_to_end(key)
+            while len(self._versions) > self.maxsize:
+                self._versions.popitem(last=False)
+                self._floor = next(self._seq)
+
+
+class RedisVersionStore(VersionStore):
+    """Shared versions for multi-worker deployments: one INCR-ed key per (user, resource)"""
+
+    def __init__(self, url: str, prefix: str = "versions"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("VERSIONS_BACKEND=redis requires the 'redis' package") from exc
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, user_id, resource: str) -> str:
+        return f"{self.prefix}:{user_id}:{resource}"
+
+    def get(self, user_id: UUID, resources: Sequence[str]) -> List[int]:
+        values = self.client.mget([self._key(user_id, resource) for resource in resources])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, user_ids: Iterable[UUID], resources: Sequence[str]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in {str(user_id) for user_id in user_ids if user_id is not None}:
+            for resource in resources:
+                pipe.incr(self._key(user_id, resource))
+        pipe.execute()
+
+
+_store: Optional[VersionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_version_store() -> VersionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                if settings.versions_backend == "redis":
+                    _store = RedisVersionStore(settings.versions_redis_url)
+                else:
+                    _store = InMemoryVersionStore()
+    return _store
+
+
+def bump_versions(user_ids: Iterable[UUID], *resources: str) -> None:
+    """Call after commit with every user whose view of `resources` changed"""
+    get_version_store().bump(user_ids, resources)
+
+
+def resource_etag(user_id: UUID, resources: Sequence[str]) -> str:
+    """Weak ETag for `user_id`'s current view of `resources`"""
+    store = get_version_store()
+    versions = store.get(user_id, resources)
+    window = int(time.time() // get_settings().etag_max_age_seconds)
+    key = f"{user_id}|{store.epoch}|{window}|" + "|".join(f"{r}={v}" for r, v in zip(resources, versions))
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag`"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
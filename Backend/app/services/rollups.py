@@ -0,0 +1,157 @@
+"""
+Daily platform rollups.
+
+daily_rollups holds one value per (UTC day, category). run_rollups fills it
+incrementally: each source table has a watermark in rollup_watermarks, and a
+run only aggregates rows created in [watermark, now - SETTLE_DELAY), in windows
+of at most MAX_WINDOW. The rollup increments and the watermark move are
+committed together, so each row is counted exactly once.
+
+- credit_transactions, matches and messages are append-only: their per-day
+  aggregates for the window are added to the stored values.
+- sessions change status in place, so the days (of starts_at) touched by
+  sessions updated in the window are recomputed from scratch instead.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, case, select, and_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.models.database import (
+    DailyRollup, RollupWatermark, CreditTransaction, Match, Session as DBSession, SessionStatus
+)
+from app.models.messaging import Message
+
+SETTLE_DELAY = timedelta(minutes=5)
+MAX_WINDOW = timedelta(days=7)
+
+# Transfer legs between users, see credit_ledger.transfer in complete_session
+TRANSFER_DEBIT = "session_payment"
+TRANSFER_CREDIT = "session_earned"
+
+CATEGORIES = [
+    "sessions_completed",
+    "credits_minted",
+    "credits_spent",
+    "credits_transferred",
+    "new_matches",
+    "messages_sent",
+]
+
+
+def _upsert(db: Session, rows: List[dict], additive: bool) -> None:
+    if not rows:
+        return
+    statement = postgresql.insert(DailyRollup).values(rows)
+    new_value = DailyRollup.value + statement.excluded.value if additive else statement.excluded.value
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["day", "category"],
+        set_={"value": new_value, "updated_at": datetime.utcnow()}
+    ))
+
+
+def _credit_rows(db: Session, start: datetime, end: datetime) -> List[dict]:
+    amount = CreditTransaction.amount
+    kind = CreditTransaction.transaction_type
+    day = func.date(CreditTransaction.created_at)
+    result = db.execute(
+        select(
+            day,
+            func.sum(case((and_(amount > 0, kind != TRANSFER_CREDIT), amount), else_=0)),
+            func.sum(case((and_(amount < 0, kind != TRANSFER_DEBIT), -amount), else_=0)),
+            func.sum(case((kind == TRANSFER_CREDIT, amount), else_=0))
+        ).where(
+            CreditTransaction.created_at >= start,
+            CreditTransaction.created_at < end
+        ).group_by(day)
+    ).all()
+    rows = []
+    for bucket, minted, spent, transferred in result:
+        for category, value in (
+            ("credits_minted", minted), ("credits_spent", spent), ("credits_transferred", transferred)
+        ):
+            rows.append({"day": bucket, "category": category, "value": int(value or 0)})
+    return rows
+
+
+def _count_rows(db: Session, created_at, category: str, start: datetime, end: datetime) -> List[dict]:
+    day = func.date(created_at)
+    result = db.execute(
+        select(day, func.count()).where(created_at >= start, created_at < end).group_by(day)
+    ).all()
+    return [{"day": bucket, "category": category, "value": count} for bucket, count in result]
+
+
+def _session_rows(db: Session, start: datetime, end: datetime) -> List[dict]:
+    touched = select(func.date(DBSession.starts_at)).where(
+        DBSession.updated_at >= start,
+        DBSession.updated_at < end,
+        DBSession.starts_at.isnot(None)
+    ).distinct()
+    days = sorted({bucket for bucket, in db.execute(touched)})
+    if not days:
+        return []
+
+    # One range query over the span; untouched days inside it are simply not rewritten
+    completed = dict(
+        (bucket, count) for bucket, count in db.execute(
+            select(func.date(DBSession.starts_at), func.count()).where(
+                DBSession.status == SessionStatus.completed,
+                DBSession.starts_at >= datetime.combine(days[0], datetime.min.time()),
+                DBSession.starts_at < datetime.combine(days[-1] + timedelta(days=1), datetime.min.time())
+            ).group_by(func.date(DBSession.starts_at))
+        )
+    )
+    return [{"day": d, "category": "sessions_completed", "value": completed.get(d, 0)} for d in days]
+
+
+# source -> (created/updated column used for the watermark, aggregate function, additive?)
+SOURCES = {
+    "credit_transactions": (CreditTransaction.created_at, _credit_rows, True),
+    "matches": (Match.created_at, lambda db, s, e: _count_rows(db, Match.created_at, "new_matches", s, e), True),
+    "messages": (Message.created_at, lambda db, s, e: _count_rows(db, Message.created_at, "messages_sent", s, e), True),
+    "sessions": (DBSession.updated_at, _session_rows, False),
+}
+
+
+def _process_source(db: Session, source: str, until: datetime) -> int:
+    """Advance one source's watermark up to `until`. Returns windows processed."""
+    column, aggregate, additive = SOURCES[source]
+    windows = 0
+    while True:
+        # Row lock per window, so concurrent runs can't add the same window twice
+        watermark = db.get(RollupWatermark, source, with_for_update=True, populate_existing=True)
+        if watermark is None:
+            first = db.execute(select(func.min(column))).scalar()
+            if first is None:
+                db.rollback()
+                return windows
+            # Concurrent first runs can both get here; the loser's insert is a no-op and it
+            # then waits on the winner's row lock like any later window
+            db.execute(postgresql.insert(RollupWatermark).values(
+                source=source, processed_until=datetime.combine(first.date(), datetime.min.time())
+            ).on_conflict_do_nothing(index_elements=["source"]))
+            watermark = db.get(RollupWatermark, source, with_for_update=True, populate_existing=True)
+        if watermark.processed_until >= until:
+            db.rollback()
+            return windows
+
+        start = watermark.processed_until
+        end = min(start + MAX_WINDOW, until)
+        _upsert(db, aggregate(db, start, end), additive)
+        watermark.processed_until = end
+        db.commit()
+        windows += 1
+
+
+def run_rollups(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Bring every rollup source up to date. Returns windows processed per source."""
+    until = (now or datetime.utcnow()) - SETTLE_DELAY
+    return {source: _process_source(db, source, until) for source in SOURCES}
+
+
+def read_rollups(db: Session, start: date, end: date, categories: Optional[List[str]] = None) -> List[DailyRollup]:
+    query = db.query(DailyRollup).filter(DailyRollup.day >= start, DailyRollup.day <= end)
+    if categories:
+        query = query.filter(DailyRollup.category.in_(categories))
+    return query.order_by(DailyRollup.day, DailyRollup.category).all()
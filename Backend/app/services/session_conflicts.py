@@ -0,0 +1,123 @@
+"""
+Double-booking detection for scheduled sessions.
+
+Each user's scheduled sessions (as organizer or participant) are loaded into an
+IntervalIndex: intervals sorted by start with a running maximum of the end
+times, so "does [start, end) overlap anything?" is a binary search instead of a
+scan.
+
+Write paths that put a session on someone's calendar call lock_busy_intervals:
+it locks both users' rows and reads their intervals inside the same
+transaction, so two concurrent accepts for the same user serialize and the
+second one sees the first. find_conflicts answers advisory checks from a short
+per-process cache, dropped by the write paths through invalidate_busy_intervals.
+"""
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.models.database import User, Session as DBSession, SessionStatus
+
+_interval_cache = TTLCache(ttl=60, maxsize=5000)
+
+
+class IntervalIndex:
+    """Immutable set of half-open [start, end) intervals, each tagged with a session id"""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, UUID]]):
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [start for start, _, _ in self._intervals]
+        self._max_ends: List[datetime] = []
+        for _, end, _ in self._intervals:
+            self._max_ends.append(max(end, self._max_ends[-1]) if self._max_ends else end)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def overlapping(self, start: datetime, end: datetime, exclude: Optional[UUID] = None) -> List[UUID]:
+        """Ids of intervals overlapping [start, end), skipping `exclude`"""
+        # Only intervals starting before `end` can overlap; walk back while some
+        # earlier interval still reaches past `start`
+        i = bisect_left(self._starts, end) - 1
+        conflicts = []
+        while i >= 0 and self._max_ends[i] > start:
+            _, interval_end, session_id = self._intervals[i]
+            if interval_end > start and session_id != exclude:
+                conflicts.append(session_id)
+            i -= 1
+        conflicts.reverse()
+        return conflicts
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Drivers without timezone support hand back naive UTC values"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _load_intervals(db: Session, user_id: UUID) -> IntervalIndex:
+    rows = db.query(DBSession.starts_at, DBSession.ends_at, DBSession.id).filter(
+        or_(
+            DBSession.user_id == user_id,
+            DBSession.participant_id == user_id
+        ),
+        DBSession.status == SessionStatus.scheduled,
+        DBSession.starts_at.isnot(None),
+        DBSession.ends_at.isnot(None)
+    ).all()
+    return IntervalIndex((_as_utc(start), _as_utc(end), session_id) for start, end, session_id in rows)
+
+
+def invalidate_busy_intervals(*user_ids: UUID) -> None:
+    for user_id in user_ids:
+        _interval_cache.delete(str(user_id))
+
+
+def get_busy_intervals(db: Session, user_id: UUID) -> IntervalIndex:
+    """Cached index of the user's scheduled sessions; may be up to a minute stale, so only for advisory checks"""
+    key = str(user_id)
+    index = _interval_cache.get(key)
+    if index is None:
+        index = _load_intervals(db, user_id)
+        _interval_cache.set(key, index)
+    return index
+
+
+def lock_busy_intervals(db: Session, user_ids: Iterable[UUID]) -> Dict[UUID, IntervalIndex]:
+    """
+    Lock the users' rows (SELECT ... FOR UPDATE, in id order like the credit
+    ledger, so two writers can't deadlock) and load their scheduled sessions
+    inside this transaction. The locks are held until the caller commits.
+    """
+    ids = sorted(set(user_ids))
+    db.query(User.id).filter(User.id.in_(ids)).order_by(User.id).with_for_update().all()
+    return {user_id: _load_intervals(db, user_id) for user_id in ids}
+
+
+def overlapping_sessions(
+    indexes: Iterable[IntervalIndex],
+    starts_at: datetime,
+    ends_at: datetime,
+    exclude_session_id: Optional[UUID] = None
+) -> List[UUID]:
+    """Ids of sessions in any of `indexes` overlapping [starts_at, ends_at), each once"""
+    conflicts: List[UUID] = []
+    for index in indexes:
+        for session_id in index.overlapping(starts_at, ends_at, exclude_session_id):
+            if session_id not in conflicts:
+                conflicts.append(session_id)
+    return conflicts
+
+
+def find_conflicts(
+    db: Session,
+    user_ids: Iterable[UUID],
+    starts_at: datetime,
+    ends_at: datetime,
+    exclude_session_id: Optional[UUID] = None
+) -> List[UUID]:
+    """Scheduled sessions of any of `user_ids` overlapping the slot, from the cached indexes"""
+    indexes = [get_busy_intervals(db, user_id) for user_id in dict.fromkeys(user_ids)]
+    return overlapping_sessions(indexes, starts_at, ends_at, exclude_session_id)
@@ -0,0 +1,272 @@
+"""
+In-process reminder scheduler for upcoming sessions.
+
+Reminders live in a min-heap keyed by fire time, and a single daemon thread
+sleeps until the earliest one is due. Each session's entries carry a version
+number; rescheduling or cancelling a session just bumps/drops its version, and
+stale heap entries are skipped when they surface (lazy deletion).
+
+Only sessions starting within REMINDER_HORIZON_HOURS are kept in memory. The
+`sessions` table is the source of truth: on start, and again every half
+horizon, the scheduler reloads scheduled sessions in the window with one range
+query on (status, starts_at), so a restarted worker rebuilds its queue without
+any extra persistence. The session routes call schedule_session/unschedule
+after every commit that changes a session's status or time.
+
+Those calls only reach the scheduler in their own process, so a cancel or
+reschedule handled by another worker isn't in the heap until the next reload,
+and a reload can race with an unschedule. Due reminders are therefore
+re-checked against `sessions` (one query per batch) right before they are
+sent: cancelled sessions are dropped and moved ones are requeued for their
+new start time.
+
+Run the scheduler on one worker only (REMINDERS_ENABLED); every enabled worker
+fires its own copy of each reminder.
+"""
+import heapq
+import itertools
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from config import get_settings
+from app.models.database import Session as DBSession, SessionStatus
+
+logger = logging.getLogger(__name__)
+
+
+class Reminder(NamedTuple):
+    session_id: UUID
+    user_ids: Tuple[UUID, UUID]
+    title: str
+    starts_at: datetime
+    lead_minutes: int
+
+
+class ReminderSink(ABC):
+    """Where due reminders go. Subclass and pass to ReminderScheduler to deliver them somewhere real."""
+
+    @abstractmethod
+    def send(self, reminder: Reminder) -> None:
+        ...
+
+
+class LoggingReminderSink(ReminderSink):
+    def send(self, reminder: Reminder) -> None:
+        logger.info(
+            "Reminder: session %s (%s) starts at %s, in %d min, for users %s",
+            reminder.session_id, reminder.title, reminder.starts_at.isoformat(),
+            reminder.lead_minutes, ", ".join(str(user_id) for user_id in reminder.user_ids)
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sink: ReminderSink,
+        lead_minutes: Sequence[int],
+        horizon: timedelta
+    ):
+        self.session_factory = session_factory
+        self.sink = sink
+        self.lead_minutes = sorted(set(lead_minutes), reverse=True)
+        self.horizon = horizon
+        # (fire_at, seq, session_id, version, reminder)
+        self._heap: List[tuple] = []
+        self._versions: Dict[UUID, int] = {}
+        # Live heap entries left per session, so fully fired sessions stop being tracked
+        self._remaining: Dict[UUID, int] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._next_reload: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def schedule_session(self, session: DBSession) -> None:
+        """(Re)schedule reminders for a session, or drop them if it is no longer scheduled"""
+        if session.status != SessionStatus.scheduled or session.starts_at is None:
+            self.unschedule(session.id)
+            return
+
+        starts_at = _as_utc(session.starts_at)
+        now = datetime.now(timezone.utc)
+        if starts_at <= now or starts_at > now + self.horizon:
+            # Past, or picked up by a later reload
+            self.unschedule(session.id)
+            return
+
+        with self._cond:
+            # Globally unique, so entries from an earlier schedule can never match again
+            version = next(self._seq)
+            pushed = 0
+            for lead in self.lead_minutes:
+                fire_at = starts_at - timedelta(minutes=lead)
+                if fire_at <= now:
+                    continue
+                reminder = Reminder(
+                    session.id, (session.user_id, session.participant_id), session.title, starts_at, lead
+                )
+                heapq.heappush(self._heap, (fire_at, next(self._seq), session.id, version, reminder))
+                pushed += 1
+            if pushed:
+                self._versions[session.id] = version
+                self._remaining[session.id] = pushed
+                self._cond.notify()
+            else:
+                self._versions.pop(session.id, None)
+                self._remaining.pop(session.id, None)
+
+    def unschedule(self, session_id: UUID) -> None:
+        with self._cond:
+            self._versions.pop(session_id, None)
+            self._remaining.pop(session_id, None)
+
+    def reload(self, db: Session) -> int:
+        """Load scheduled sessions starting within the horizon. Returns sessions loaded."""
+        now = datetime.now(timezone.utc)
+        sessions = db.query(DBSession).filter(
+            DBSession.status == SessionStatus.scheduled,
+            DBSession.starts_at > now,
+            DBSession.starts_at <= now + self.horizon
+        ).all()
+        for session in sessions:
+            self.schedule_session(session)
+        self._next_reload = now + self.horizon / 2
+        return len(sessions)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop, name="session-reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _reload_from_db(self) -> None:
+        db = self.session_factory()
+        try:
+            loaded = self.reload(db)
+            logger.info("Reminder scheduler loaded %d upcoming sessions", loaded)
+        except Exception:
+            logger.exception("Reminder scheduler reload failed")
+            self._next_reload = datetime.now(timezone.utc) + timedelta(minutes=1)
+        finally:
+            db.close()
+
+    def _pop_due(self, now: datetime) -> List[Reminder]:
+        """Pop every live reminder due at `now`. Caller holds the lock."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, session_id, version, reminder = heapq.heappop(self._heap)
+            if self._versions.get(session_id) == version:
+                due.append(reminder)
+                self._remaining[session_id] -= 1
+                if not self._remaining[session_id]:
+                    del self._versions[session_id]
+                    del self._remaining[session_id]
+        # Drop stale entries at the top so the wait below targets a live one
+        while self._heap and self._versions.get(self._heap[0][2]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+        return due
+
+    def _confirm(self, due: List[Reminder]) -> List[Reminder]:
+        """Keep the reminders whose session is still scheduled at the same start time"""
+        db = self.session_factory()
+        try:
+            sessions = {
+                session.id: session
+                for session in db.query(DBSession).filter(
+                    DBSession.id.in_({reminder.session_id for reminder in due})
+                ).all()
+            }
+            confirmed = []
+            for reminder in due:
+                session = sessions.get(reminder.session_id)
+                if session is None or session.status != SessionStatus.scheduled or session.starts_at is None:
+                    self.unschedule(reminder.session_id)
+                elif _as_utc(session.starts_at) != reminder.starts_at:
+                    # Rescheduled elsewhere: queue reminders for the new time instead
+                    self.schedule_session(session)
+                else:
+                    confirmed.append(reminder)
+            return confirmed
+        finally:
+            db.close()
+
+    def _loop(self) -> None:
+        self._reload_from_db()
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+                now = datetime.now(timezone.utc)
+                due = self._pop_due(now)
+                if not due:
+                    wake_at = self._next_reload
+                    if self._heap:
+                        wake_at = min(wake_at, self._heap[0][0])
+                    timeout = max((wake_at - now).total_seconds(), 0)
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+
+            if due:
+                try:
+                    due = self._confirm(due)
+                except Exception:
+                    logger.exception("Could not re-check %d due reminders, skipping them", len(due))
+                    due = []
+
+            for reminder in due:
+                try:
+                    self.sink.send(reminder)
+                except Exception:
+                    logger.exception("Reminder sink failed for session %s", reminder.session_id)
+
+            if datetime.now(timezone.utc) >= self._next_reload:
+                self._reload_from_db()
+
+
+_scheduler: Optional[ReminderScheduler] = None
+
+
+def get_reminder_scheduler() -> Optional[ReminderScheduler]:
+    """The process-wide scheduler, or None when reminders are disabled"""
+    return _scheduler
+
+
+def init_reminder_scheduler(session_factory: Callable[[], Session], sink: Optional[ReminderSink] = None) -> ReminderScheduler:
+    global _scheduler
+    settings = get_settings()
+    _scheduler = ReminderScheduler(
+        session_factory,
+        sink or LoggingReminderSink(),
+        settings.reminder_lead_minutes,
+        timedelta(hours=settings.reminder_horizon_hours)
+    )
+    return _scheduler
+
+
+def sync_session_reminders(*sessions: DBSession) -> None:
+    """Push committed session state into the scheduler; no-op when reminders are disabled"""
+    scheduler = _scheduler
+    if scheduler is None:
+        return
+    for session in sessions:
+        scheduler.schedule_session(session)
@@ -0,0 +1,105 @@
+"""
+Per-user session dashboard summary.
+
+Counts, minutes and the current-week weekday histogram come from one grouped
+query over `sessions`; credits earned/spent from one aggregate over
+`credit_transactions`. Results are cached per user and invalidated by the
+session and credit write paths.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from uuid import UUID
+from zoneinfo import ZoneInfo
+from sqlalchemy import func, case, or_, and_, extract
+from sqlalchemy.orm import Session
+from config import get_settings
+from app.core.cache import TTLCache
+from app.models.database import Session as DBSession, SessionStatus, CreditTransaction
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_summary_cache = TTLCache(ttl=300, maxsize=5000)
+
+
+def invalidate_session_summary(*user_ids: UUID) -> None:
+    for user_id in user_ids:
+        _summary_cache.delete(str(user_id))
+
+
+def _current_week_bounds(tz: ZoneInfo):
+    """Monday 00:00 to next Monday 00:00 in the session timezone, as UTC"""
+    now = datetime.now(tz)
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    week_end = week_start + timedelta(days=7)
+    return week_start.astimezone(timezone.utc), week_end.astimezone(timezone.utc)
+
+
+def compute_session_summary(db: Session, user_id: UUID) -> dict:
+    tz_name = get_settings().session_timezone
+    week_start, week_end = _current_week_bounds(ZoneInfo(tz_name))
+
+    # Postgres dow: 0 = Sunday. Only this week's scheduled/completed sessions get a bucket.
+    in_week = and_(
+        DBSession.status.in_([SessionStatus.scheduled, SessionStatus.completed]),
+        DBSession.starts_at >= week_start,
+        DBSession.starts_at < week_end
+    )
+    weekday = case(
+        (in_week, extract("dow", func.timezone(tz_name, DBSession.starts_at))),
+        else_=None
+    ).label("weekday")
+
+    rows = db.query(
+        DBSession.status,
+        DBSession.type,
+        weekday,
+        func.count(DBSession.id),
+        func.coalesce(func.sum(DBSession.duration), 0),
+        func.count(DBSession.rating)
+    ).filter(
+        or_(
+            DBSession.user_id == user_id,
+            DBSession.participant_id == user_id
+        )
+    ).group_by(DBSession.status, DBSession.type, weekday).all()
+
+    counts_by_status: Dict[str, int] = {s.value: 0 for s in SessionStatus}
+    counts_by_type: Dict[str, int] = {"teaching": 0, "learning": 0}
+    histogram = {day: 0 for day in WEEKDAYS}
+    completed_minutes = 0
+    rated_sessions = 0
+
+    for status, session_type, dow, count, minutes, rated in rows:
+        counts_by_status[status.value] += count
+        counts_by_type[session_type.value] += count
+        if status == SessionStatus.completed:
+            completed_minutes += int(minutes)
+            rated_sessions += rated
+        if dow is not None:
+            histogram[WEEKDAYS[(int(dow) + 6) % 7]] += count
+
+    earned, spent = db.query(
+        func.coalesce(func.sum(case((CreditTransaction.amount > 0, CreditTransaction.amount), else_=0)), 0),
+        func.coalesce(func.sum(case((CreditTransaction.amount < 0, -CreditTransaction.amount), else_=0)), 0)
+    ).filter(CreditTransaction.user_id == user_id).one()
+
+    weekly_activity: List[dict] = [{"day": day, "sessions": histogram[day]} for day in WEEKDAYS]
+    return {
+        "counts_by_status": counts_by_status,
+        "counts_by_type": counts_by_type,
+        "total_sessions": sum(counts_by_status.values()),
+        "completed_minutes": completed_minutes,
+        "rated_sessions": rated_sessions,
+        "credits_earned": int(earned),
+        "credits_spent": int(spent),
+        "weekly_activity": weekly_activity,
+    }
+
+
+def get_session_summary(db: Session, user_id: UUID) -> dict:
+    key = str(user_id)
+    summary = _summary_cache.get(key)
+    if summary is None:
+        summary = compute_session_summary(db, user_id)
+        _summary_cache.set(key, summary)
+    return summary
@@ -0,0 +1,73 @@
+"""
+Batched loading of the small "user card" (id, name, email, avatar, bio, rating)
+that match, conversation and message responses embed for other users.
+
+A UserCardLoader lives for one request (get_user_cards in app/api/deps.py).
+Routes queue every id they will need with want(), then read cards with
+load()/load_many(): ids not yet known to the request are looked up in a
+process-wide TTL cache, and whatever is still missing goes out as one
+`WHERE id IN (...)` query, so a list of N rows costs at most one user query
+instead of N. Cards are shared between requests; treat them as read-only.
+Profile and rating writes call invalidate_user_cards; other workers can serve
+a card up to CARD_TTL seconds stale.
+"""
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.models.database import User
+
+CARD_TTL = 30
+
+CARD_COLUMNS = [User.id, User.name, User.email, User.avatar, User.bio, User.rating.label("rating")]
+
+_card_cache = TTLCache(ttl=CARD_TTL, maxsize=10000)
+
+
+def invalidate_user_cards(*user_ids: UUID) -> None:
+    for user_id in user_ids:
+        _card_cache.delete(str(user_id))
+
+
+class UserCardLoader:
+    def __init__(self, db: Session):
+        self.db = db
+        # str(user_id) -> card, or None for ids that don't exist
+        self._cards: Dict[str, Optional[dict]] = {}
+        self._pending = set()
+
+    def want(self, *user_ids: UUID) -> None:
+        """Queue ids for the next batch"""
+        for user_id in user_ids:
+            if user_id is not None and str(user_id) not in self._cards:
+                self._pending.add(str(user_id))
+
+    def _resolve(self) -> None:
+        missing = []
+        for key in self._pending:
+            card = _card_cache.get(key)
+            if card is None:
+                missing.append(key)
+            else:
+                self._cards[key] = card
+        self._pending.clear()
+        if not missing:
+            return
+
+        for key in missing:
+            self._cards[key] = None
+        for row in self.db.query(*CARD_COLUMNS).filter(User.id.in_([UUID(key) for key in missing])):
+            card = dict(row._mapping)
+            self._cards[str(row.id)] = card
+            _card_cache.set(str(row.id), card)
+
+    def load_many(self, user_ids: Iterable[UUID]) -> Dict[str, Optional[dict]]:
+        """Cards keyed by str(user_id); ids that don't exist map to None"""
+        user_ids = list(user_ids)
+        self.want(*user_ids)
+        if self._pending:
+            self._resolve()
+        return {str(user_id): self._cards.get(str(user_id)) for user_id in user_ids}
+
+    def load(self, user_id: UUID) -> Optional[dict]:
+        return self.load_many([user_id])[str(user_id)]
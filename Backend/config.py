@@ -1,11 +1,16 @@
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     # Database
     database_url: str
+    # Connection pool per worker process. GET /api/bootstrap
+    # holds one connection per section (4) while it runs, so size for peak page loads.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
     
     # Auth0
     auth0_domain: str
@@ -20,6 +25,54 @@ class Settings(BaseSettings):
     debug: bool = False
     secret_key: str = "your-secret-key-change-in-production"
     frontend_url: str = "http://localhost:5173"
+    # Timezone used to interpret session date/time strings
+    session_timezone: str = "UTC"
+    
+    # Message partitioning / archival
+    message_partitions_ahead: int = 3
+    message_hot_months: int = 12
+    message_archive_dir: str = "archive/messages"
+    
+    # Credit transaction compaction / archival
+    credit_hot_months: int = 12
+    credit_archive_dir: str = "archive/credit_transactions"
+    
+    # Presence ("memory" per process, or "redis" shared across workers)
+    presence_backend: str = "memory"
+    presence_redis_url: Optional[str] = None
+    presence_ttl_seconds: int = 45
+    typing_ttl_seconds: int = 6
+    
+    # Background expiry of stale pending sessions / match requests
+    expiry_sweeper_enabled: bool = True
+    expiry_sweep_interval_seconds: int = 300
+    expiry_batch_size: int = 500
+    match_request_ttl_days: int = 14
+    
+    # Stored responses for Idempotency-Key retries
+    idempotency_ttl_hours: int = 24
+    
+    # Auth0 user ids ("sub", e.g. "auth0|abc123") allowed to call /api/admin endpoints.
+    # Not emails: Auth0 accounts can carry an unverified copy of someone else's address.
+    admin_auth0_ids: List[str] = []
+    
+    # Response compression (brotli needs the optional 'brotli' package)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_content_types: List[str] = ["application/json", "text/"]
+    compression_gzip_level: int = 6
+    compression_brotli: bool = False
+    compression_brotli_quality: int = 4
+    
+    # Resource versions behind ETags ("memory" needs a single worker, "redis" is shared)
+    versions_backend: str = "memory"
+    versions_redis_url: Optional[str] = None
+    etag_max_age_seconds: int = 300
+    
+    # Session reminders (enable on a single worker)
+    reminders_enabled: bool = False
+    reminder_lead_minutes: List[int] = [60, 10]
+    reminder_horizon_hours: int = 48
     
     class Config:
         env_file = ".env"
@@ -3,9 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from config import get_settings
 from app.db.base import Base
-from app.db.session import engine
-from app.api.routes import users, skills, matches, sessions, auth, credits, messages
+from app.db.session import engine, SessionLocal
+from app.api.routes import users, skills, matches, sessions, auth, credits, messages, presence, admin, bootstrap
 from app.models import database, messaging  # Import all models for table creation
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.serialization import FastJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core import singleflight
+from app.services import expiry_sweeper
+from app.services.session_reminders import init_reminder_scheduler
 
 settings = get_settings()
 
@@ -15,7 +21,8 @@ app = FastAPI(
     title=settings.app_name,
     debug=settings.debug,
     description="skillLoop API - A platform for skill exchange and learning",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Session middleware (optional now, but kept for future use)
@@ -28,6 +35,17 @@ app.add_middleware(
     https_only=False
 )
 
+# gzip/brotli for large JSON bodies; streaming responses and WebSockets pass through
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        content_types=settings.compression_content_types,
+        gzip_level=settings.compression_gzip_level,
+        brotli=settings.compression_brotli,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -41,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -50,6 +69,39 @@ app.include_router(matches.router, prefix="/api/matches", tags=["matches"])
 app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
 app.include_router(credits.router, prefix="/api/credits", tags=["credits"])
 app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
+app.include_router(presence.router, prefix="/api/presence", tags=["presence"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(bootstrap.router, prefix="/api/bootstrap", tags=["bootstrap"])
+
+sweeper = expiry_sweeper.ExpirySweeper(SessionLocal, settings.expiry_sweep_interval_seconds)
+reminders = init_reminder_scheduler(SessionLocal) if settings.reminders_enabled else None
+
+
+@app.on_event("startup")
+def start_background_workers():
+    if settings.expiry_sweeper_enabled:
+        sweeper.start()
+    if reminders:
+        reminders.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    sweeper.stop()
+    if reminders:
+        reminders.stop()
+
+
+@app.get("/api/metrics/expiry-sweeper")
+def expiry_sweeper_metrics():
+    """Rows expired and batch timings for this worker's sweeper"""
+    return expiry_sweeper.metrics.snapshot()
+
+
+@app.get("/api/metrics/single-flight")
+def single_flight_metrics():
+    """Per-function call, execution, coalesced and cache-hit counts for this worker"""
+    return singleflight.metrics_snapshot()
 
 
 @app.get("/api/public")
@@ -85,6 +137,9 @@ def root(request: Request):
         "Sessions": [],
         "Credits": [],
         "Messages": [],
+        "Presence": [],
+        "Admin": [],
+        "Bootstrap": [],
         "Other": []
     }
     
@@ -103,6 +158,12 @@ def root(request: Request):
             grouped_routes["Credits"].append(route)
         elif route["path"].startswith("/api/messages"):
             grouped_routes["Messages"].append(route)
+        elif route["path"].startswith("/api/presence"):
+            grouped_routes["Presence"].append(route)
+        elif route["path"].startswith("/api/admin"):
+            grouped_routes["Admin"].append(route)
+        elif route["path"].startswith("/api/bootstrap"):
+            grouped_routes["Bootstrap"].append(route)
         else:
             grouped_routes["Other"].append(route)
     
@@ -0,0 +1,109 @@
+"""
+Measure what response compression saves, and what it costs in CPU, on payloads
+shaped like our typical responses (rendered the same way the API renders them).
+
+    python scripts/benchmark_compression.py --gzip-levels 1 6 9 --brotli-qualities 4 --min-size 1024
+
+Brotli rows are only shown when the optional 'brotli' package is installed.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.compression import gzip_compress
+from app.core.serialization import FastJSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _session(i: int, organizer: uuid.UUID, participant: uuid.UUID) -> dict:
+    starts_at = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc) + timedelta(days=i, hours=i % 8)
+    return {
+        "id": uuid.uuid4(), "title": f"Intro to topic {i}", "user_id": organizer,
+        "participant_id": participant, "participant_name": "Ada Lovelace", "skill": "Python",
+        "date": starts_at.strftime("%Y-%m-%d"), "time": starts_at.strftime("%H:%M"), "duration": 60,
+        "type": "teaching", "status": "completed", "credits_amount": 20,
+        "starts_at": starts_at, "ends_at": starts_at + timedelta(hours=1), "series_id": None,
+        "rating": 4.5, "feedback": "Clear explanations, good pace", "rated_by": participant,
+        "created_at": starts_at - timedelta(days=3), "updated_at": starts_at + timedelta(hours=2),
+    }
+
+
+def _message(i: int, conversation_id: uuid.UUID, sender: dict) -> dict:
+    return {
+        "id": uuid.uuid4(), "conversation_id": conversation_id, "sender_id": sender["id"],
+        "content": f"Message {i}: sounds good, let's go over the exercises from last time before we start.",
+        "is_read": True, "created_at": datetime(2026, 1, 1, 12, 0) + timedelta(minutes=7 * i),
+        "sender": sender,
+    }
+
+
+def typical_payloads() -> dict:
+    me, other = uuid.uuid4(), uuid.uuid4()
+    sender = {"id": other, "name": "Ada Lovelace", "email": "ada@example.com", "avatar": "https://example.com/a.png"}
+    conversation_id = uuid.uuid4()
+    payloads = {
+        "credit balance": {"balance": 120, "total_earned": 340, "total_spent": 220},
+        "session list (20)": [_session(i, me, other) for i in range(20)],
+        "session list (100)": [_session(i, me, other) for i in range(100)],
+        "conversations (30)": [
+            {
+                "id": uuid.uuid4(), "other_user": {**sender, "id": uuid.uuid4()},
+                "last_message": "See you tomorrow!", "last_message_time": datetime(2026, 1, 2, 9, i),
+                "unread_count": i % 3, "created_at": datetime(2025, 6, 1), "updated_at": datetime(2026, 1, 2, 9, i),
+            }
+            for i in range(30)
+        ],
+        "message history (500)": {
+            "id": conversation_id, "other_user": sender, "unread_count": 0,
+            "messages": [_message(i, conversation_id, sender) for i in range(500)],
+        },
+    }
+    return {name: FastJSONResponse(content).body for name, content in payloads.items()}
+
+
+def _cpu_ms(fn, body: bytes, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        fn(body)
+    return (time.process_time() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[4, 11])
+    parser.add_argument("--min-size", type=int, default=1024, help="COMPRESSION_MIN_SIZE to evaluate")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    encoders = [(f"gzip-{level}", lambda body, level=level: gzip_compress(body, level)) for level in args.gzip_levels]
+    if brotli is not None:
+        encoders += [
+            (f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality))
+            for quality in args.brotli_qualities
+        ]
+    else:
+        print("(brotli not installed, gzip only)")
+
+    print(f"{'payload':<24}{'encoding':<10}{'bytes':>10}{'saved':>9}{'cpu ms':>10}")
+    for name, body in typical_payloads().items():
+        print(f"{name:<24}{'identity':<10}{len(body):>10}")
+        if len(body) < args.min_size:
+            print(f"{'':<24}skipped: below the {args.min_size} byte threshold")
+            continue
+        for label, encode in encoders:
+            size = len(encode(body))
+            saved = 100 * (1 - size / len(body))
+            print(f"{'':<24}{label:<10}{size:>10}{saved:>8.1f}%{_cpu_ms(encode, body, args.repeat):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
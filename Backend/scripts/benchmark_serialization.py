@@ -0,0 +1,112 @@
+"""
+Compare per-request CPU time of the two ways a session list page can be serialized:
+
+- orm:  ORM objects -> response_model validation (from_attributes) -> JSON, as FastAPI does it
+- rows: column-selected rows -> orjson, as the list endpoints do via rows_response
+
+Only the Python side is measured (object construction, validation, encoding); the
+database round trip is the same for both and is left out. Both bodies are decoded
+and compared first, so the fast path is checked to return the same document.
+
+    python scripts/benchmark_serialization.py --rows 100 --requests 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+from app.core.serialization import rows_response
+from app.models.database import Session as DBSession, SessionStatus, SessionType
+from app.schemas.schemas import SessionResponse
+
+FIELDS = [
+    "id", "title", "user_id", "participant_id", "participant_name", "skill", "date", "time",
+    "duration", "type", "status", "credits_amount", "starts_at", "ends_at", "series_id",
+    "rating", "feedback", "rated_by", "created_at", "updated_at",
+]
+
+
+def _sample(n: int) -> List[dict]:
+    base = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+    organizer, participant = uuid.uuid4(), uuid.uuid4()
+    samples = []
+    for i in range(n):
+        starts_at = base + timedelta(days=i, hours=i % 8)
+        samples.append({
+            "id": uuid.uuid4(),
+            "title": f"Session {i}",
+            "user_id": organizer,
+            "participant_id": participant,
+            "participant_name": "Ada Lovelace",
+            "skill": "Python",
+            "date": starts_at.strftime("%Y-%m-%d"),
+            "time": starts_at.strftime("%H:%M"),
+            "duration": 60,
+            "type": SessionType.teaching if i % 2 else SessionType.learning,
+            "status": SessionStatus.completed if i % 3 else SessionStatus.scheduled,
+            "credits_amount": 20,
+            "starts_at": starts_at,
+            "ends_at": starts_at + timedelta(minutes=60),
+            "series_id": None,
+            "rating": 4.5 if i % 3 else None,
+            "feedback": "Great session" if i % 3 else None,
+            "rated_by": participant if i % 3 else None,
+            "created_at": datetime(2025, 12, 1, 12, 0, 0, 123456) + timedelta(minutes=i),
+            "updated_at": datetime(2025, 12, 2, 12, 0, 0, 654321) + timedelta(minutes=i),
+        })
+    return samples
+
+
+def orm_request(samples: List[dict], field) -> bytes:
+    sessions = [DBSession(**sample) for sample in samples]
+    # What fastapi.routing.serialize_response does with a response_model
+    value, errors = field.validate(sessions, {}, loc=("response",))
+    if errors:
+        raise ValueError(errors)
+    return JSONResponse(field.serialize(value, mode="json", by_alias=True)).body
+
+
+def rows_request(samples: List[dict]) -> bytes:
+    tuples = [tuple(sample[name] for name in FIELDS) for sample in samples]
+    rows = IteratorResult(SimpleResultMetaData(FIELDS), iter(tuples)).all()
+    return rows_response(rows).body
+
+
+def _cpu_per_request(fn, requests: int) -> float:
+    started = time.process_time()
+    for _ in range(requests):
+        fn()
+    return (time.process_time() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="rows per response (default 100, the page size)")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    samples = _sample(args.rows)
+    field = create_response_field(name="response", type_=List[SessionResponse])
+
+    orm_body, rows_body = orm_request(samples, field), rows_request(samples)
+    if json.loads(orm_body) != json.loads(rows_body):
+        sys.exit("✗ rows path does not produce the same document as the response_model path")
+    print(f"✓ identical documents ({len(rows_body)} bytes, {args.rows} rows)")
+
+    orm_ms = _cpu_per_request(lambda: orm_request(samples, field), args.requests)
+    rows_ms = _cpu_per_request(lambda: rows_request(samples), args.requests)
+    print(f"  orm + response_model: {orm_ms:.3f} ms CPU/request")
+    print(f"  rows + orjson:        {rows_ms:.3f} ms CPU/request")
+    print(f"  speedup:              {orm_ms / rows_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Verify User.rating_sum / rating_count against the rated sessions.
+Reports every user whose stored aggregates drifted; pass --fix to repair them.
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.services.rating_aggregates import find_mismatches, repair_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted aggregates")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = find_mismatches(db)
+        if not mismatches:
+            print("✓ All rating aggregates are consistent")
+            return
+
+        print(f"Found {len(mismatches)} users with drifted rating aggregates:")
+        for m in mismatches:
+            print(f"  {m.user_id}: stored {m.stored_sum}/{m.stored_count}, actual {m.actual_sum}/{m.actual_count}")
+
+        if args.fix:
+            fixed = repair_aggregates(db)
+            print(f"\n✓ Repaired {fixed} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compact old credit transactions.
+- Months older than CREDIT_HOT_MONTHS are folded into per-user monthly credit/debit
+  summary rows that keep balance_after continuous
+- The raw rows are archived to CREDIT_ARCHIVE_DIR as gzipped CSV before deletion
+
+Run monthly (e.g. from cron): python scripts/compact_credit_transactions.py
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_settings
+from app.db.session import SessionLocal
+from app.services.credit_compaction import compact_old_transactions
+
+settings = get_settings()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hot-months", type=int, default=settings.credit_hot_months,
+                        help="months of raw transactions to keep")
+    parser.add_argument("--archive-dir", default=settings.credit_archive_dir,
+                        help="directory for archived transaction dumps")
+    parser.add_argument("--batch-size", type=int, default=500, help="users per transaction and archive file")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Compacting credit transactions older than {args.hot_months} months...")
+        results = compact_old_transactions(db, args.archive_dir, args.hot_months, batch_size=args.batch_size)
+        for month, stats in results.items():
+            print(f"  ✓ {month:%Y-%m}: {stats['rows']} rows for {stats['users']} users -> {stats['files']} archive file(s)")
+        if not results:
+            print("  Nothing to compact")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Maintain monthly partitions of the messages table.
+- Creates partitions for the current month plus MESSAGE_PARTITIONS_AHEAD months
+- Detaches partitions older than MESSAGE_HOT_MONTHS, archives them to
+  MESSAGE_ARCHIVE_DIR as gzipped CSV and drops them
+
+Run daily (e.g. from cron): python scripts/manage_message_partitions.py
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from config import get_settings
+from app.services.message_partitions import create_future_partitions, archive_cold_partitions
+
+settings = get_settings()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=settings.message_partitions_ahead,
+                        help="months of partitions to create ahead of the current month")
+    parser.add_argument("--hot-months", type=int, default=settings.message_hot_months,
+                        help="months to keep attached before archiving")
+    parser.add_argument("--archive-dir", default=settings.message_archive_dir,
+                        help="directory for archived partition dumps")
+    parser.add_argument("--skip-archive", action="store_true", help="only create future partitions")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url)
+
+    print("Creating future partitions...")
+    created = create_future_partitions(engine, args.ahead)
+    for name in created:
+        print(f"  ✓ Created {name}")
+    if not created:
+        print("  All partitions already exist")
+
+    if args.skip_archive:
+        return
+
+    print(f"\nArchiving partitions older than {args.hot_months} months...")
+    archived = archive_cold_partitions(engine, args.archive_dir, args.hot_months)
+    for path in archived:
+        print(f"  ✓ Archived to {path}")
+    if not archived:
+        print("  Nothing to archive")
+
+
+if __name__ == "__main__":
+    main()
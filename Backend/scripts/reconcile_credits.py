@@ -0,0 +1,37 @@
+"""
+Reconcile users.credits against the credit ledger.
+Only transactions since each user's last checkpoint are verified; checkpoints
+advance past every transaction found consistent. Exits 1 if anything drifted.
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.services.credit_reconciliation import reconcile_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500, help="users per committed batch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_all(db, args.batch_size)
+        if not mismatches:
+            print("✓ Credit ledger is consistent")
+            return
+
+        print(f"Found {len(mismatches)} ledger mismatches:")
+        for m in mismatches:
+            where = f"transaction {m.transaction_id}" if m.transaction_id else "users.credits"
+            print(f"  {m.user_id}: {m.kind} at {where}: expected {m.expected}, found {m.actual}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Bring the daily_rollups table up to date.
+Only rows added since each source's watermark are aggregated; safe to run from cron.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.services.rollups import run_rollups
+
+
+def main():
+    db = SessionLocal()
+    try:
+        processed = run_rollups(db)
+        for source, windows in processed.items():
+            print(f"✓ {source}: {windows} window(s) processed")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
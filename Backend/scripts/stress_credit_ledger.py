@@ -0,0 +1,180 @@
+"""
+Stress the credit ledger with concurrent spends and transfers.
+Creates throwaway users, hammers them from many threads, then checks that no
+balance ever went negative and that every user's ledger sums to users.credits.
+Run against a development or staging database, never production.
+
+    python scripts/stress_credit_ledger.py --users 8 --threads 16 --ops 50
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app.db.session import SessionLocal
+from app.models.database import User, CreditTransaction
+from app.services import credit_ledger
+from app.services.credit_ledger import InsufficientCreditsError
+
+TAG = "stress-ledger"
+
+
+def _create_users(count: int, seed_credits: int) -> list:
+    db = SessionLocal()
+    try:
+        user_ids = []
+        for _ in range(count):
+            marker = uuid.uuid4().hex
+            user = User(email=f"{TAG}-{marker}@example.invalid", auth0_id=f"{TAG}|{marker}", name=TAG, credits=0)
+            db.add(user)
+            db.flush()
+            credit_ledger.earn(db, user.id, seed_credits, "welcome_bonus", description=TAG)
+            user_ids.append(user.id)
+        db.commit()
+        return user_ids
+    finally:
+        db.close()
+
+
+def _worker(user_ids: list, ops: int, max_amount: int, seed: int, stats: dict, lock: threading.Lock) -> None:
+    rng = random.Random(seed)
+    counts = {"spends": 0, "transfers": 0, "rejected": 0, "errors": 0}
+    db = SessionLocal()
+    try:
+        for _ in range(ops):
+            amount = rng.randint(1, max_amount)
+            try:
+                if rng.random() < 0.3:
+                    credit_ledger.spend(db, rng.choice(user_ids), amount, description=TAG)
+                    counts["spends"] += 1
+                else:
+                    sender, receiver = rng.sample(user_ids, 2)
+                    credit_ledger.transfer(db, sender, receiver, amount, "session_payment", "session_earned")
+                    counts["transfers"] += 1
+                db.commit()
+            except InsufficientCreditsError:
+                db.rollback()
+                counts["rejected"] += 1
+            except Exception as exc:
+                db.rollback()
+                counts["errors"] += 1
+                print(f"  ✗ {type(exc).__name__}: {exc}")
+    finally:
+        db.close()
+    with lock:
+        for key, value in counts.items():
+            stats[key] += value
+
+
+def _watch_balances(user_ids: list, stop: threading.Event, lowest: list) -> None:
+    """Sample the lowest balance while the workers run"""
+    db = SessionLocal()
+    try:
+        while not stop.is_set():
+            value = db.query(func.min(User.credits)).filter(User.id.in_(user_ids)).scalar()
+            db.rollback()
+            lowest[0] = min(lowest[0], value)
+            stop.wait(0.01)
+    finally:
+        db.close()
+
+
+def _check(user_ids: list, seed_credits: int) -> list:
+    """Return a list of problems; empty means the ledger is consistent"""
+    problems = []
+    db = SessionLocal()
+    try:
+        balances = dict(db.query(User.id, User.credits).filter(User.id.in_(user_ids)).all())
+        sums = dict(db.query(CreditTransaction.user_id, func.sum(CreditTransaction.amount)).filter(
+            CreditTransaction.user_id.in_(user_ids)
+        ).group_by(CreditTransaction.user_id).all())
+        for user_id in user_ids:
+            balance, ledger = balances[user_id], sums.get(user_id, 0)
+            if balance < 0:
+                problems.append(f"{user_id}: negative balance {balance}")
+            if balance != ledger:
+                problems.append(f"{user_id}: users.credits {balance} != ledger sum {ledger}")
+            negative_after = db.query(func.count(CreditTransaction.id)).filter(
+                CreditTransaction.user_id == user_id,
+                CreditTransaction.balance_after < 0
+            ).scalar()
+            if negative_after:
+                problems.append(f"{user_id}: {negative_after} transactions with negative balance_after")
+
+        spent = -(db.query(func.sum(CreditTransaction.amount)).filter(
+            CreditTransaction.user_id.in_(user_ids),
+            CreditTransaction.transaction_type == "spent"
+        ).scalar() or 0)
+        expected_total = seed_credits * len(user_ids) - spent
+        if sum(balances.values()) != expected_total:
+            problems.append(f"total balance {sum(balances.values())} != seeded minus spent {expected_total}")
+    finally:
+        db.close()
+    return problems
+
+
+def _cleanup(user_ids: list) -> None:
+    db = SessionLocal()
+    try:
+        db.query(CreditTransaction).filter(CreditTransaction.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=50, help="operations per thread")
+    parser.add_argument("--seed-credits", type=int, default=100)
+    parser.add_argument("--max-amount", type=int, default=40)
+    parser.add_argument("--keep", action="store_true", help="keep the test users for inspection")
+    args = parser.parse_args()
+
+    user_ids = _create_users(args.users, args.seed_credits)
+    print(f"Created {len(user_ids)} users with {args.seed_credits} credits each")
+
+    stats = {"spends": 0, "transfers": 0, "rejected": 0, "errors": 0}
+    lock, stop, lowest = threading.Lock(), threading.Event(), [args.seed_credits]
+    watcher = threading.Thread(target=_watch_balances, args=(user_ids, stop, lowest))
+    workers = [
+        threading.Thread(target=_worker, args=(user_ids, args.ops, args.max_amount, seed, stats, lock))
+        for seed in range(args.threads)
+    ]
+    try:
+        watcher.start()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stop.set()
+        watcher.join()
+
+        print(f"  {stats['spends']} spends, {stats['transfers']} transfers, "
+              f"{stats['rejected']} rejected for insufficient credits, {stats['errors']} errors")
+        problems = _check(user_ids, args.seed_credits)
+        if lowest[0] < 0:
+            problems.append(f"a balance was observed at {lowest[0]} during the run")
+        if stats["errors"]:
+            problems.append(f"{stats['errors']} operations failed unexpectedly")
+    finally:
+        stop.set()
+        if not args.keep:
+            _cleanup(user_ids)
+
+    if problems:
+        print(f"✗ Found {len(problems)} problems:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("✓ Balances never went negative and every ledger matches users.credits")
+
+
+if __name__ == "__main__":
+    main()
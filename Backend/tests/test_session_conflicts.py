@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from app.services.session_conflicts import IntervalIndex, overlapping_sessions
+
+BASE = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def at(hours: float) -> datetime:
+    return BASE + timedelta(hours=hours)
+
+
+def test_empty_index_has_no_overlaps():
+    assert IntervalIndex([]).overlapping(at(0), at(1)) == []
+
+
+def test_touching_edges_do_not_overlap():
+    before, after = uuid4(), uuid4()
+    index = IntervalIndex([(at(0), at(1), before), (at(2), at(3), after)])
+    assert index.overlapping(at(1), at(2)) == []
+
+
+def test_partial_overlap_on_either_side():
+    before, after = uuid4(), uuid4()
+    index = IntervalIndex([(at(0), at(2), before), (at(3), at(5), after)])
+    assert index.overlapping(at(1), at(4)) == [before, after]
+    assert index.overlapping(at(1.5), at(2.5)) == [before]
+
+
+def test_nested_intervals():
+    outer, inner = uuid4(), uuid4()
+    index = IntervalIndex([(at(0), at(10), outer), (at(4), at(5), inner)])
+    # A slot inside the outer interval but after the inner one still hits the outer one
+    assert index.overlapping(at(6), at(7)) == [outer]
+    assert index.overlapping(at(4.5), at(4.75)) == [outer, inner]
+    # A slot enclosing both
+    assert index.overlapping(at(-1), at(11)) == [outer, inner]
+
+
+def test_long_interval_found_behind_short_ones():
+    long, short = uuid4(), uuid4()
+    index = IntervalIndex([(at(0), at(24), long), (at(1), at(2), short)])
+    assert index.overlapping(at(20), at(21)) == [long]
+
+
+def test_exclude_skips_only_that_session():
+    moved, other = uuid4(), uuid4()
+    index = IntervalIndex([(at(0), at(1), moved), (at(0.5), at(1.5), other)])
+    assert index.overlapping(at(0), at(1), exclude=moved) == [other]
+    assert index.overlapping(at(0), at(0.25), exclude=moved) == []
+
+
+def test_overlapping_sessions_reports_shared_sessions_once():
+    shared, mine = uuid4(), uuid4()
+    organizer = IntervalIndex([(at(0), at(1), shared), (at(1), at(2), mine)])
+    participant = IntervalIndex([(at(0), at(1), shared)])
+    assert overlapping_sessions([organizer, participant], at(0.5), at(1.5)) == [shared, mine]
@@ -6,7 +6,8 @@ import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { Badge } from "@/components/ui/badge";
 import { ScrollArea } from "@/components/ui/scroll-area";
 import { Send, Loader2, MessageCircle, Users } from "lucide-react";
-import { useConversations, useConversation, useSendMessage, useConnections, useStartConversation } from "@/hooks/useApi";
+import { useConversations, useConversation, useSendMessage, useConnections, useStartConversation, useMarkConversationRead, usePresence } from "@/hooks/useApi";
+import { presenceApi } from "@/lib/api";
 import { useAuth } from "@/contexts/AuthContext";
 import { useToast } from "@/hooks/use-toast";
 
@@ -23,6 +24,9 @@ const Chat = () => {
   const { data: conversationData, isLoading: messagesLoading } = useConversation(selectedConversationId || '');
   const sendMessage = useSendMessage();
   const startConversation = useStartConversation();
+  const { mutate: markReadMutate } = useMarkConversationRead();
+  const { data: presence } = usePresence();
+  const lastTypingPing = useRef(0);
 
   // Find connections that don't have conversations yet
   const connectionsWithoutConversations = connections?.filter(conn => {
@@ -40,6 +44,23 @@ const Chat = () => {
     }
   }, [conversations, connectionsWithoutConversations, selectedConversationId, selectedConnectionId]);
 
+  // Advance the read watermark when unread messages from the other user arrive
+  useEffect(() => {
+    if (!selectedConversationId || !conversationData?.messages?.length) return;
+    const hasUnread = conversationData.messages.some(m => m.sender_id !== user?.id && !m.is_read);
+    if (!hasUnread) return;
+    const lastMessage = conversationData.messages[conversationData.messages.length - 1];
+    markReadMutate({ conversationId: selectedConversationId, upToMessageId: lastMessage.id });
+  }, [conversationData?.messages, selectedConversationId, user?.id, markReadMutate]);
+
+  // Heartbeat while the chat is open so connections see us online
+  useEffect(() => {
+    const ping = () => presenceApi.heartbeat().catch(() => undefined);
+    ping();
+    const interval = setInterval(ping, 20000);
+    return () => clearInterval(interval);
+  }, []);
+
   // Scroll to bottom when messages change
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -63,6 +84,20 @@ const Chat = () => {
     }
   };
 
+  const handleMessageChange = (value: string) => {
+    setNewMessage(value);
+    if (!selectedConversationId) return;
+    const now = Date.now();
+    // Typing state expires server-side after a few seconds, so refresh it at most every 3s
+    if (value && now - lastTypingPing.current > 3000) {
+      lastTypingPing.current = now;
+      presenceApi.heartbeat(selectedConversationId, true).catch(() => undefined);
+    } else if (!value && lastTypingPing.current) {
+      lastTypingPing.current = 0;
+      presenceApi.heartbeat(selectedConversationId, false).catch(() => undefined);
+    }
+  };
+
   const handleSendMessage = async () => {
     if (!newMessage.trim() || !selectedConversationId) return;
     
@@ -71,7 +106,7 @@ const Chat = () => {
         conversationId: selectedConversationId,
         content: newMessage.trim()
       });
-      setNewMessage("");
+      handleMessageChange("");
     } catch (error) {
       console.error("Failed to send message:", error);
     }
@@ -123,6 +158,7 @@ const Chat = () => {
   };
 
   const selectedConversation = conversations?.find(c => c.id === selectedConversationId);
+  const selectedPresence = presence?.find(p => p.user_id === selectedConversation?.other_user.id);
   const selectedConnection = connectionsWithoutConversations.find(c => c.user.id === selectedConnectionId);
 
   const isLoading = conversationsLoading || connectionsLoading;
@@ -255,7 +291,11 @@ const Chat = () => {
                   <div>
                     <p className="font-medium">{selectedConversation.other_user.name}</p>
                     <p className="text-xs text-muted-foreground">
-                      {selectedConversation.other_user.email}
+                      {selectedPresence?.typing
+                        ? "typing…"
+                        : selectedPresence?.online
+                          ? "Online"
+                          : selectedConversation.other_user.email}
                     </p>
                   </div>
                 </div>
@@ -322,7 +362,7 @@ const Chat = () => {
                   <Input
                     placeholder="Type a message..."
                     value={newMessage}
-                    onChange={(e) => setNewMessage(e.target.value)}
+                    onChange={(e) => handleMessageChange(e.target.value)}
                     onKeyPress={(e) => e.key === "Enter" && !e.shiftKey && handleSendMessage()}
                     className="flex-1"
                     disabled={sendMessage.isPending}
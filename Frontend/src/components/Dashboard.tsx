@@ -5,30 +5,35 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { useNavigate } from "react-router-dom";
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from "recharts";
 import { TrendingUp, Users, Clock, Star, Award, Loader2 } from "lucide-react";
-import { useState, useMemo } from "react";
+import { useState } from "react";
 import { useAuth } from "@/contexts/AuthContext";
-import { useSessions, useMatches, useMySkills, useCreditBalance, useCreditHistory } from "@/hooks/useApi";
+import { useSessionSummary, useScheduledSessions, useSessionHistory, useBootstrap } from "@/hooks/useApi";
+
+// Sessions shown in the upcoming and recent activity previews
+const PREVIEW_SIZE = 3;
 
 const Dashboard = () => {
   const navigate = useNavigate();
   const [activeTab, setActiveTab] = useState("overview");
   const { user } = useAuth();
   
-  const { data: sessions, isLoading: sessionsLoading } = useSessions();
-  const { data: matches, isLoading: matchesLoading } = useMatches();
-  const { data: skills, isLoading: skillsLoading } = useMySkills();
-  const { data: creditBalance } = useCreditBalance();
-  const { data: creditHistory } = useCreditHistory();
+  const { data: summary, isLoading: summaryLoading } = useSessionSummary();
+  const { data: upcomingSessions = [] } = useScheduledSessions(PREVIEW_SIZE);
+  const { data: completedSessions = [] } = useSessionHistory(PREVIEW_SIZE);
+  // Skills, matches and balance come from the one bootstrap request
+  const { data: bootstrap, isLoading: bootstrapLoading } = useBootstrap();
+  const matches = bootstrap?.matches;
+  const skills = bootstrap?.skills;
+  const creditBalance = bootstrap?.credits;
 
-  const upcomingSessions = sessions?.filter(s => s.status === 'scheduled') || [];
-  const completedSessions = sessions?.filter(s => s.status === 'completed') || [];
   const activeMatches = matches?.filter(m => m.status === 'accepted') || [];
   const teachingSkills = skills?.filter(s => s.type === 'teaching') || [];
   const learningSkills = skills?.filter(s => s.type === 'learning') || [];
-  const totalHours = completedSessions.reduce((acc, s) => acc + (s.duration / 60), 0);
+  const totalHours = (summary?.completed_minutes || 0) / 60;
+  const completedCount = summary?.counts_by_status.completed || 0;
 
-  const earnedCredits = creditHistory?.filter(t => t.amount > 0).reduce((acc, t) => acc + t.amount, 0) || 0;
-  const spentCredits = Math.abs(creditHistory?.filter(t => t.amount < 0).reduce((acc, t) => acc + t.amount, 0) || 0);
+  const earnedCredits = summary?.credits_earned || 0;
+  const spentCredits = summary?.credits_spent || 0;
   
   const creditsData = [
     { name: 'Earned', value: earnedCredits, color: '#3b82f6' },
@@ -36,42 +41,10 @@ const Dashboard = () => {
     { name: 'Balance', value: creditBalance?.credits || 0, color: '#f59e0b' }
   ];
 
-  // Calculate weekly activity (Mon–Sun) from session data
-  const weeklyActivityData = useMemo(() => {
-    // Helper to get start of current week (Monday)
-    const now = new Date();
-    const dayOfWeek = now.getDay(); // 0 = Sun, 1 = Mon, ...
-    const diffToMonday = (dayOfWeek + 6) % 7; // days since Monday
-    const weekStart = new Date(now);
-    weekStart.setDate(now.getDate() - diffToMonday);
-    weekStart.setHours(0, 0, 0, 0);
-
-    // End of week (Sunday 23:59:59.999)
-    const weekEnd = new Date(weekStart);
-    weekEnd.setDate(weekStart.getDate() + 6);
-    weekEnd.setHours(23, 59, 59, 999);
-
-    const orderedDays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
-    const dayCounts: Record<string, number> = Object.fromEntries(
-      orderedDays.map((d) => [d, 0])
-    );
-
-    sessions?.forEach((session) => {
-      if (session.status === 'completed' || session.status === 'scheduled') {
-        // `session.date` is stored as YYYY-MM-DD string; construct Date
-        const sessionDate = new Date(session.date);
-        if (sessionDate >= weekStart && sessionDate <= weekEnd) {
-          const idx = sessionDate.getDay(); // 0 = Sun ... 6 = Sat
-          const dayName = orderedDays[(idx + 6) % 7]; // map 0->Sun to end
-          dayCounts[dayName] += 1;
-        }
-      }
-    });
-
-    return orderedDays.map((day) => ({ day, sessions: dayCounts[day] }));
-  }, [sessions]);
+  // Weekly activity (Mon–Sun) is aggregated server-side
+  const weeklyActivityData = summary?.weekly_activity || [];
 
-  if (sessionsLoading || matchesLoading || skillsLoading) {
+  if (summaryLoading || bootstrapLoading) {
     return (
       <div className="container max-w-7xl mx-auto px-4 py-8 flex items-center justify-center min-h-[60vh]">
         <Loader2 className="h-8 w-8 animate-spin text-indigo" />
@@ -134,7 +107,7 @@ const Dashboard = () => {
               <CardTitle className="text-3xl font-bold">{totalHours.toFixed(1)}</CardTitle>
             </CardHeader>
             <CardContent>
-              <p className="text-sm text-muted-foreground">{completedSessions.length} sessions</p>
+              <p className="text-sm text-muted-foreground">{completedCount} sessions</p>
             </CardContent>
           </Card>
 
@@ -147,7 +120,7 @@ const Dashboard = () => {
               <CardTitle className="text-3xl font-bold">{user?.rating?.toFixed(1) || 'N/A'}</CardTitle>
             </CardHeader>
             <CardContent>
-              <p className="text-sm text-muted-foreground">{completedSessions.filter(s => s.rating).length} reviews</p>
+              <p className="text-sm text-muted-foreground">{summary?.rated_sessions || 0} reviews</p>
             </CardContent>
           </Card>
         </div>
@@ -219,7 +192,7 @@ const Dashboard = () => {
                 <CardHeader><CardTitle>Recent Activity</CardTitle></CardHeader>
                 <CardContent>
                   <div className="space-y-3 text-sm">
-                    {completedSessions.slice(0, 3).map((session) => (
+                    {completedSessions.slice(0, PREVIEW_SIZE).map((session) => (
                       <div key={session.id} className="flex items-center gap-2">
                         <div className="w-2 h-2 bg-green-500 rounded-full"></div>
                         <span>Completed {session.skill}</span>
@@ -274,7 +247,7 @@ const Dashboard = () => {
                 <CardContent className="space-y-4">
                   <div className="flex justify-between">
                     <span className="text-muted-foreground">Sessions</span>
-                    <span className="font-semibold">{sessions?.filter(s => s.type === 'teaching').length || 0}</span>
+                    <span className="font-semibold">{summary?.counts_by_type.teaching || 0}</span>
                   </div>
                   <div className="flex justify-between">
                     <span className="text-muted-foreground">Rating</span>
@@ -309,7 +282,7 @@ const Dashboard = () => {
                 <CardContent className="space-y-4">
                   <div className="flex justify-between">
                     <span className="text-muted-foreground">Sessions</span>
-                    <span className="font-semibold">{sessions?.filter(s => s.type === 'learning').length || 0}</span>
+                    <span className="font-semibold">{summary?.counts_by_type.learning || 0}</span>
                   </div>
                   <div className="flex justify-between">
                     <span className="text-muted-foreground">Skills</span>
@@ -341,7 +314,7 @@ const Dashboard = () => {
               </div>
             ) : (
               <div className="space-y-4">
-                {upcomingSessions.slice(0, 3).map((session) => (
+                {upcomingSessions.slice(0, PREVIEW_SIZE).map((session) => (
                   <div key={session.id} className="flex items-center justify-between p-4 border rounded-lg">
                     <div>
                       <div className="font-medium">{session.title}</div>
@@ -11,7 +11,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { Loader2, X } from "lucide-react";
 import { useAuth } from "@/contexts/AuthContext";
-import { useMySkills, useCreateSkill, useDeleteSkill, useUpdateUser, useCreditBalance, useSessions } from "@/hooks/useApi";
+import { useMySkills, useCreateSkill, useDeleteSkill, useUpdateUser, useCreditBalance, useSessionSummary } from "@/hooks/useApi";
 import { useToast } from "@/hooks/use-toast";
 import AIAdvisor from "./AIAdvisor";
 
@@ -20,7 +20,7 @@ const Profile = () => {
   const { toast } = useToast();
   const { data: skills, isLoading: skillsLoading } = useMySkills();
   const { data: creditBalance } = useCreditBalance();
-  const { data: sessions } = useSessions();
+  const { data: sessionSummary } = useSessionSummary();
   
   const updateUser = useUpdateUser();
   const createSkill = useCreateSkill();
@@ -35,7 +35,6 @@ const Profile = () => {
 
   const teachingSkills = skills?.filter(s => s.type === 'teaching') || [];
   const learningSkills = skills?.filter(s => s.type === 'learning') || [];
-  const completedSessions = sessions?.filter(s => s.status === 'completed') || [];
 
   const getInitials = (name?: string) => {
     if (!name) return 'U';
@@ -182,11 +181,11 @@ const Profile = () => {
                   <CardContent className="space-y-4">
                     <div className="flex justify-between">
                       <span className="text-sm text-muted-foreground">Sessions Taught</span>
-                      <span className="font-medium">{sessions?.filter(s => s.type === 'teaching').length || 0}</span>
+                      <span className="font-medium">{sessionSummary?.counts_by_type.teaching || 0}</span>
                     </div>
                     <div className="flex justify-between">
                       <span className="text-sm text-muted-foreground">Sessions Attended</span>
-                      <span className="font-medium">{sessions?.filter(s => s.type === 'learning').length || 0}</span>
+                      <span className="font-medium">{sessionSummary?.counts_by_type.learning || 0}</span>
                     </div>
                     <div className="flex justify-between">
                       <span className="text-sm text-muted-foreground">Average Rating</span>
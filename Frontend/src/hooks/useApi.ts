@@ -22,6 +22,7 @@ export const queryKeys = {
   matches: ['matches'] as const,
   sessions: ['sessions'] as const,
   sessionHistory: ['sessions', 'history'] as const,
+  sessionSummary: ['sessions', 'summary'] as const,
   creditBalance: ['credits', 'balance'] as const,
   creditHistory: ['credits', 'history'] as const,
 };
@@ -189,6 +190,16 @@ export function useSessions(status?: string) {
   });
 }
 
+export function useSessionSummary() {
+  return useQuery({
+    queryKey: queryKeys.sessionSummary,
+    queryFn: sessionsApi.getSummary,
+    // Server-side aggregate, cheap to poll for dashboard charts
+    refetchInterval: 60000,
+    refetchOnWindowFocus: true,
+  });
+}
+
 export function usePendingSessionRequests() {
   return useQuery({
     queryKey: ['sessionsPending'],
@@ -203,17 +214,18 @@ export function useSentSessionRequests() {
   });
 }
 
-export function useScheduledSessions() {
+// Pass a limit to fetch only the first `limit` sessions instead of the full list
+export function useScheduledSessions(limit?: number) {
   return useQuery({
-    queryKey: ['sessionsScheduled'],
-    queryFn: sessionsApi.getScheduledSessions,
+    queryKey: ['sessionsScheduled', limit],
+    queryFn: () => sessionsApi.getScheduledSessions(limit),
   });
 }
 
-export function useSessionHistory() {
+export function useSessionHistory(limit?: number) {
   return useQuery({
-    queryKey: queryKeys.sessionHistory,
-    queryFn: sessionsApi.getHistory,
+    queryKey: [...queryKeys.sessionHistory, limit],
+    queryFn: () => sessionsApi.getHistory(limit),
   });
 }
 
@@ -398,6 +410,20 @@ export function useSendMessage() {
   });
 }
 
+export function useMarkConversationRead() {
+  const queryClient = useQueryClient();
+  return useMutation({
+    mutationFn: ({ conversationId, upToMessageId }: { conversationId: string; upToMessageId: string }) =>
+      messagesApi.markRead(conversationId, upToMessageId),
+    onSuccess: (receipt) => {
+      if (receipt.marked_count > 0) {
+        queryClient.invalidateQueries({ queryKey: messageQueryKeys.conversations });
+        queryClient.invalidateQueries({ queryKey: messageQueryKeys.unreadCount });
+      }
+    },
+  });
+}
+
 export function useUnreadCount() {
   return useQuery({
     queryKey: messageQueryKeys.unreadCount,
@@ -405,3 +431,43 @@ export function useUnreadCount() {
     refetchInterval: 30000,
   });
 }
+
+// Presence
+import { presenceApi } from '@/lib/api';
+
+export const presenceQueryKeys = {
+  presence: ['presence'] as const,
+};
+
+export function usePresence() {
+  return useQuery({
+    queryKey: presenceQueryKeys.presence,
+    queryFn: presenceApi.getPresence,
+    refetchInterval: 5000,
+  });
+}
+
+// Bootstrap
+import { bootstrapApi } from '@/lib/api';
+
+// The dashboard's initial reads in one request; also seeds the per-resource
+// queries so other screens render this data while they refetch
+export function useBootstrap() {
+  const queryClient = useQueryClient();
+  return useQuery({
+    queryKey: ['bootstrap'],
+    queryFn: async () => {
+      const data = await bootstrapApi.get();
+      queryClient.setQueryData(queryKeys.user, data.user);
+      queryClient.setQueryData(queryKeys.skills, data.skills);
+      queryClient.setQueryData(queryKeys.matches, data.matches);
+      queryClient.setQueryData(queryKeys.creditBalance, data.credits);
+      queryClient.setQueryData(messageQueryKeys.unreadCount, { unread_count: data.unread_count });
+      // useSessions() holds every page, so only seed it when the first page is all there is
+      if (!data.sessions_next_cursor) {
+        queryClient.setQueryData([...queryKeys.sessions, undefined], data.sessions);
+      }
+      return data;
+    },
+  });
+}
@@ -19,11 +19,11 @@ export const clearTokens = () => {
   localStorage.removeItem('skillloop_user');
 };
 
-// Generic fetch wrapper with auth
-async function fetchWithAuth<T>(
+// Fetch with auth, redirecting on 401 and throwing on error responses
+async function authorizedFetch(
   endpoint: string,
   options: RequestInit = {}
-): Promise<T> {
+): Promise<Response> {
   const token = getAccessToken();
   
   const headers: HeadersInit = {
@@ -51,6 +51,16 @@ async function fetchWithAuth<T>(
     throw new Error(error.detail || 'Request failed');
   }
 
+  return response;
+}
+
+// Generic fetch wrapper with auth
+async function fetchWithAuth<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const response = await authorizedFetch(endpoint, options);
+
   if (response.status === 204) {
     return {} as T;
   }
@@ -58,6 +68,25 @@ async function fetchWithAuth<T>(
   return response.json();
 }
 
+// Largest page the cursor-paginated list endpoints accept
+const MAX_PAGE_SIZE = 200;
+
+// Fetch every page of a cursor-paginated list by following X-Next-Cursor
+async function fetchAllPages<T>(endpoint: string): Promise<T[]> {
+  const separator = endpoint.includes('?') ? '&' : '?';
+  const items: T[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await authorizedFetch(`${endpoint}${separator}limit=${MAX_PAGE_SIZE}${page}`);
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+
+  return items;
+}
+
 // Types
 export interface User {
   id: string;
@@ -89,7 +118,7 @@ export interface Match {
   matched_user_id: string;
   match_score: number;
   common_skills: string[];
-  status: 'pending' | 'accepted' | 'rejected';
+  status: 'pending' | 'accepted' | 'rejected' | 'expired';
   created_at: string;
   updated_at: string;
   matched_user?: User;
@@ -106,7 +135,10 @@ export interface Session {
   time: string;
   duration: number;
   credits_amount: number;
-  status: 'pending' | 'scheduled' | 'completed' | 'cancelled' | 'rejected';
+  starts_at?: string;
+  ends_at?: string;
+  series_id?: string;
+  status: 'pending' | 'scheduled' | 'completed' | 'cancelled' | 'rejected' | 'expired';
   type: 'teaching' | 'learning';
   rating?: number;
   feedback?: string;
@@ -115,6 +147,36 @@ export interface Session {
   updated_at: string;
 }
 
+export interface SessionSummary {
+  counts_by_status: Record<Session['status'], number>;
+  counts_by_type: Record<Session['type'], number>;
+  total_sessions: number;
+  completed_minutes: number;
+  rated_sessions: number;
+  credits_earned: number;
+  credits_spent: number;
+  weekly_activity: { day: string; sessions: number }[];
+}
+
+export interface RecurrenceRule {
+  frequency: 'daily' | 'weekly';
+  interval?: number;
+  count: number;
+}
+
+export interface ProposedSlot {
+  date: string;
+  time: string;
+  duration: number;
+  participant_id?: string;
+}
+
+export interface SlotConflict extends ProposedSlot {
+  starts_at: string | null;
+  ends_at: string | null;
+  conflicting_session_ids: string[];
+}
+
 // Credit rates for sessions
 export const CREDIT_RATES: Record<number, number> = {
   15: 5,   // 15 min = 5 credits
@@ -276,25 +338,58 @@ export const matchesApi = {
 export const sessionsApi = {
   getSessions: (status?: string) => {
     const params = status ? `?status_filter=${status}` : '';
-    return fetchWithAuth<Session[]>(`/api/sessions/${params ? params : ''}`);
+    return fetchAllPages<Session>(`/api/sessions/${params ? params : ''}`);
   },
   
-  getPendingRequests: () => fetchWithAuth<Session[]>('/api/sessions/pending'),
+  getPendingRequests: () => fetchAllPages<Session>('/api/sessions/pending'),
+  
+  getSentRequests: () => fetchAllPages<Session>('/api/sessions/sent'),
   
-  getSentRequests: () => fetchWithAuth<Session[]>('/api/sessions/sent'),
+  // With a limit, only the first page (e.g. a dashboard preview); otherwise every page
+  getScheduledSessions: (limit?: number) =>
+    limit
+      ? fetchWithAuth<Session[]>(`/api/sessions/scheduled?limit=${limit}`)
+      : fetchAllPages<Session>('/api/sessions/scheduled'),
   
-  getScheduledSessions: () => fetchWithAuth<Session[]>('/api/sessions/scheduled'),
+  getSummary: () => fetchWithAuth<SessionSummary>('/api/sessions/summary'),
   
-  getHistory: () => fetchWithAuth<Session[]>('/api/sessions/history'),
+  getHistory: (limit?: number) =>
+    limit
+      ? fetchWithAuth<Session[]>(`/api/sessions/history?limit=${limit}`)
+      : fetchAllPages<Session>('/api/sessions/history'),
   
   getCreditRates: () => fetchWithAuth<{ rates: Record<number, number> }>('/api/sessions/credit-rates'),
   
+  checkConflicts: (slots: ProposedSlot[]) =>
+    fetchWithAuth<SlotConflict[]>('/api/sessions/conflicts', {
+      method: 'POST',
+      body: JSON.stringify({ slots }),
+    }),
+  
   createSession: (data: Omit<Session, 'id' | 'user_id' | 'status' | 'credits_amount' | 'rating' | 'feedback' | 'rated_by' | 'created_at' | 'updated_at'>) =>
     fetchWithAuth<Session>('/api/sessions', {
       method: 'POST',
       body: JSON.stringify(data),
     }),
   
+  createSeries: (data: Omit<Session, 'id' | 'user_id' | 'status' | 'credits_amount' | 'rating' | 'feedback' | 'rated_by' | 'created_at' | 'updated_at'> & { recurrence: RecurrenceRule }) =>
+    fetchWithAuth<Session[]>('/api/sessions/series', {
+      method: 'POST',
+      body: JSON.stringify(data),
+    }),
+  
+  acceptSeries: (seriesId: string) =>
+    fetchWithAuth<Session[]>(`/api/sessions/series/${seriesId}/accept`, { method: 'POST' }),
+  
+  cancelSeries: (seriesId: string) =>
+    fetchWithAuth<Session[]>(`/api/sessions/series/${seriesId}/cancel`, { method: 'POST' }),
+  
+  rescheduleSeries: (seriesId: string, changes: { time?: string; duration?: number; shift_days?: number }) =>
+    fetchWithAuth<Session[]>(`/api/sessions/series/${seriesId}/reschedule`, {
+      method: 'POST',
+      body: JSON.stringify(changes),
+    }),
+  
   acceptSession: (sessionId: string) =>
     fetchWithAuth<Session>(`/api/sessions/${sessionId}/accept`, { method: 'POST' }),
   
@@ -376,6 +471,14 @@ export interface ConversationWithMessages extends Conversation {
   messages: Message[];
 }
 
+export interface ReadReceipt {
+  conversation_id: string;
+  user_id: string;
+  last_read_message_id?: string;
+  last_read_at: string;
+  marked_count: number;
+}
+
 // Messages API
 export const messagesApi = {
   getConversations: () => fetchWithAuth<Conversation[]>('/api/messages/conversations'),
@@ -395,5 +498,48 @@ export const messagesApi = {
       body: JSON.stringify({ content }),
     }),
   
+  markRead: (conversationId: string, upToMessageId: string) =>
+    fetchWithAuth<ReadReceipt>(`/api/messages/conversations/${conversationId}/read`, {
+      method: 'POST',
+      body: JSON.stringify({ up_to_message_id: upToMessageId }),
+    }),
+  
   getUnreadCount: () => fetchWithAuth<{ unread_count: number }>('/api/messages/unread-count'),
 };
+
+// Presence Types
+export interface UserPresence {
+  user_id: string;
+  online: boolean;
+  last_seen?: string;
+  conversation_id?: string;
+  typing: boolean;
+}
+
+// Presence API
+export const presenceApi = {
+  heartbeat: (conversationId?: string, typing = false) =>
+    fetchWithAuth<{ user_id: string; last_seen: string }>('/api/presence/heartbeat', {
+      method: 'POST',
+      body: JSON.stringify({ conversation_id: conversationId, typing }),
+    }),
+  
+  getPresence: () => fetchWithAuth<UserPresence[]>('/api/presence/'),
+};
+
+// Bootstrap Types
+export interface Bootstrap {
+  user: User;
+  skills: Skill[];
+  matches: Match[];
+  sessions: Session[];
+  sessions_next_cursor: string | null;
+  credits: { user_id: string; credits: number };
+  unread_count: number;
+  timings_ms?: Record<string, number>;
+}
+
+// Bootstrap API - everything the dashboard loads on page load, in one request
+export const bootstrapApi = {
+  get: () => fetchWithAuth<Bootstrap>('/api/bootstrap'),
+};